@@ -1,18 +1,128 @@
-from flask import Flask, request, jsonify, render_template, make_response
+from flask import Flask, Blueprint, current_app, request, jsonify, render_template, make_response, Response, stream_with_context, g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_restful import Api, Resource
-from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from werkzeug.local import LocalProxy
+from datetime import datetime, date, timedelta
 import os
 import uuid
 import json
+import base64
+import binascii
+import sqlite3
+import csv
+import io
+import gzip
+import mimetypes
+import hashlib
+import threading
+import time
+import queue
+import atexit
+import hmac
+import html
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import wraps
 
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///crm.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SECRET_KEY'] = 'enterprise-demo-secret-key'
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
-db = SQLAlchemy(app)
-api = Api(app)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# SQLite pragma profiles applied to every new database connection.
+# "production" trades a little durability on power loss (synchronous=NORMAL
+# under WAL) for much cheaper commits and readers that never block writers.
+SQLITE_PROFILES = {
+    'default': {},
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 268435456,  # 256 MiB
+        'cache_size': -65536,  # 64 MiB, negative values are KiB
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,  # milliseconds
+        'foreign_keys': 'ON',
+    },
+}
+
+class Config:
+    """Default settings, read from the environment. create_app() takes overrides for any of them."""
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///crm.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SECRET_KEY = 'enterprise-demo-secret-key'
+    SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'production')
+    SQLITE_PRAGMAS = {}  # per-pragma overrides on top of the profile
+    CUSTOMER_CACHE_SIZE = int(os.environ.get('CUSTOMER_CACHE_SIZE', 10000))
+    CUSTOMER_CACHE_TTL = float(os.environ.get('CUSTOMER_CACHE_TTL', 30))  # seconds
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')  # memory, sqlite or none
+    RESPONSE_CACHE_PATH = os.environ.get('RESPONSE_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'response_cache.db'))
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 1000))
+    RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 60))  # seconds
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 10))  # queries per request
+    # How POST /api/interactions writes: "direct" commits in the request, "group"
+    # waits for the background writer's next group commit, and "async" returns
+    # 202 as soon as the row is queued (rows still queued are lost on a crash)
+    INTERACTION_WRITE_MODE = os.environ.get('INTERACTION_WRITE_MODE', 'direct')
+    WRITE_BEHIND_BATCH_SIZE = int(os.environ.get('WRITE_BEHIND_BATCH_SIZE', 200))  # rows per commit
+    WRITE_BEHIND_FLUSH_MS = float(os.environ.get('WRITE_BEHIND_FLUSH_MS', 20))  # max wait for a batch to fill
+    WRITE_BEHIND_QUEUE_SIZE = int(os.environ.get('WRITE_BEHIND_QUEUE_SIZE', 10000))  # producers block when full
+    WRITE_BEHIND_TIMEOUT = float(os.environ.get('WRITE_BEHIND_TIMEOUT', 30))  # seconds a "group" request waits for its commit
+    EVENT_POLL_INTERVAL = float(os.environ.get('EVENT_POLL_INTERVAL', 1))  # seconds between change_log checks for other workers' writes
+    EVENT_HEARTBEAT = float(os.environ.get('EVENT_HEARTBEAT', 15))  # seconds between keep-alive comments
+    # Create missing tables and apply pending migrations on the first request
+    AUTO_INIT_DB = os.environ.get('AUTO_INIT_DB', 'true').lower() == 'true'
+    WEBHOOK_DISPATCHER = os.environ.get('WEBHOOK_DISPATCHER', 'true').lower() == 'true'
+    WEBHOOK_WORKERS = int(os.environ.get('WEBHOOK_WORKERS', 4))  # endpoints delivered to concurrently
+    WEBHOOK_BATCH_SIZE = int(os.environ.get('WEBHOOK_BATCH_SIZE', 100))  # events per POST
+    WEBHOOK_POLL_INTERVAL = float(os.environ.get('WEBHOOK_POLL_INTERVAL', 1))  # seconds between checks for new changes
+    WEBHOOK_TIMEOUT = float(os.environ.get('WEBHOOK_TIMEOUT', 5))  # seconds per delivery request
+    WEBHOOK_RETRY_BASE = float(os.environ.get('WEBHOOK_RETRY_BASE', 1))  # seconds, doubled per consecutive failure
+    WEBHOOK_RETRY_MAX = float(os.environ.get('WEBHOOK_RETRY_MAX', 300))  # longest wait between retries
+
+db = SQLAlchemy()
+api = Api()
+bp = Blueprint('crm', __name__, cli_group=None)
+
+def app_extension(name):
+    """Proxy to the current app's instance of an object that create_app() builds per app"""
+    return LocalProxy(lambda: current_app.extensions['onix'][name])
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    """Run PRAGMA statements for each name/value pair on a raw sqlite3 connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+def configure_sqlite_engine(app):
+    """Apply app's SQLite profile to each new connection of its engine.
+    
+    The listener is bound to this app's engine and reads this app's config,
+    so it needs no app context and other engines in the process are untouched.
+    """
+    engine = db.get_engine(app)
+    if engine.dialect.name != 'sqlite':
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def configure_sqlite_connection(dbapi_connection, connection_record):
+        profile = app.config['SQLITE_PROFILE']
+        if profile not in SQLITE_PROFILES:
+            raise ValueError(f"Unknown SQLite profile: {profile}")
+        
+        pragmas = dict(SQLITE_PROFILES[profile])
+        pragmas.update(app.config['SQLITE_PRAGMAS'])
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
 
 # Database Models
 class Customer(db.Model):
@@ -53,15 +163,517 @@ class Interaction(db.Model):
             'created_at': self.created_at.isoformat()
         }
 
-# Create database tables
-with app.app_context():
-    db.create_all()
+# Secondary indexes. Existing databases pick these up through the
+# migrations below, since db.create_all() never alters existing tables.
+db.Index('ix_customer_created_at_id', Customer.created_at, Customer.id)
+db.Index('ix_customer_status_created_at', Customer.status, Customer.created_at)
+db.Index('ix_customer_company', Customer.company)
+db.Index('ix_interaction_customer_id_created_at', Interaction.customer_id, Interaction.created_at.desc())
+db.Index('ix_interaction_created_at', Interaction.created_at)
+
+# Full-text search over customers and interaction notes. The FTS5 tables
+# use the base tables as external content and triggers keep them in sync,
+# so bulk Core inserts are indexed as well as ORM writes.
+CUSTOMER_SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS customer_fts USING fts5(
+        first_name, last_name, email, company,
+        content='customer', content_rowid='rowid'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS customer_fts_ai AFTER INSERT ON customer BEGIN
+        INSERT INTO customer_fts (rowid, first_name, last_name, email, company)
+        VALUES (new.rowid, new.first_name, new.last_name, new.email, new.company);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS customer_fts_ad AFTER DELETE ON customer BEGIN
+        INSERT INTO customer_fts (customer_fts, rowid, first_name, last_name, email, company)
+        VALUES ('delete', old.rowid, old.first_name, old.last_name, old.email, old.company);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS customer_fts_au AFTER UPDATE OF first_name, last_name, email, company ON customer BEGIN
+        INSERT INTO customer_fts (customer_fts, rowid, first_name, last_name, email, company)
+        VALUES ('delete', old.rowid, old.first_name, old.last_name, old.email, old.company);
+        INSERT INTO customer_fts (rowid, first_name, last_name, email, company)
+        VALUES (new.rowid, new.first_name, new.last_name, new.email, new.company);
+    END""",
+]
+INTERACTION_SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS interaction_fts USING fts5(
+        notes, content='interaction', content_rowid='rowid'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS interaction_fts_ai AFTER INSERT ON interaction BEGIN
+        INSERT INTO interaction_fts (rowid, notes) VALUES (new.rowid, new.notes);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS interaction_fts_ad AFTER DELETE ON interaction BEGIN
+        INSERT INTO interaction_fts (interaction_fts, rowid, notes) VALUES ('delete', old.rowid, old.notes);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS interaction_fts_au AFTER UPDATE OF notes ON interaction BEGIN
+        INSERT INTO interaction_fts (interaction_fts, rowid, notes) VALUES ('delete', old.rowid, old.notes);
+        INSERT INTO interaction_fts (rowid, notes) VALUES (new.rowid, new.notes);
+    END""",
+]
+
+for statement in CUSTOMER_SEARCH_DDL:
+    event.listen(Customer.__table__, 'after_create', db.DDL(statement).execute_if(dialect='sqlite'))
+event.listen(Customer.__table__, 'after_drop', db.DDL('DROP TABLE IF EXISTS customer_fts').execute_if(dialect='sqlite'))
+for statement in INTERACTION_SEARCH_DDL:
+    event.listen(Interaction.__table__, 'after_create', db.DDL(statement).execute_if(dialect='sqlite'))
+event.listen(Interaction.__table__, 'after_drop', db.DDL('DROP TABLE IF EXISTS interaction_fts').execute_if(dialect='sqlite'))
+
+# The FTS tables point at base rows by their implicit rowid, which VACUUM
+# may renumber because neither base table has an INTEGER PRIMARY KEY. Run
+# VACUUM through `flask vacuum`, which rebuilds both indexes afterwards.
+def rebuild_search_index():
+    db.session.execute(db.text("INSERT INTO customer_fts (customer_fts) VALUES ('rebuild')"))
+    db.session.execute(db.text("INSERT INTO interaction_fts (interaction_fts) VALUES ('rebuild')"))
+    db.session.commit()
+
+@bp.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Rebuild the full-text search indexes from the customer and interaction tables."""
+    rebuild_search_index()
+    print("Rebuilt the search indexes.")
+
+@bp.cli.command('vacuum')
+def vacuum_command():
+    """VACUUM the database, then rebuild the search indexes whose rowids it may have changed."""
+    db.session.remove()
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        connection.exec_driver_sql('VACUUM')
+    rebuild_search_index()
+    print("Vacuumed the database and rebuilt the search indexes.")
+
+# Table-level change counters used as HTTP validators. Triggers bump the
+# counter on every insert, update and delete, whichever code path wrote.
+class TableVersion(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+VERSIONED_TABLES = ['customer', 'interaction']
+
+def table_version_seed_ddl(table):
+    return f"INSERT OR IGNORE INTO table_version (name, version, updated_at) VALUES ('{table}', 0, datetime('now'))"
+
+def table_version_trigger_ddl(table):
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_version_{operation.lower()} AFTER {operation} ON {table} BEGIN
+        UPDATE table_version SET version = version + 1, updated_at = datetime('now') WHERE name = '{table}';
+    END"""
+        for operation in ('INSERT', 'UPDATE', 'DELETE')
+    ]
+
+TABLE_VERSION_DDL = (
+    [table_version_seed_ddl(table) for table in VERSIONED_TABLES]
+    + [statement for table in VERSIONED_TABLES for statement in table_version_trigger_ddl(table)]
+)
+
+for table in VERSIONED_TABLES:
+    event.listen(TableVersion.__table__, 'after_create', db.DDL(table_version_seed_ddl(table)).execute_if(dialect='sqlite'))
+for model in (Customer, Interaction):
+    for statement in table_version_trigger_ddl(model.__tablename__):
+        event.listen(model.__table__, 'after_create', db.DDL(statement).execute_if(dialect='sqlite'))
+
+# Report counters: customers by status and company, interactions by type
+# and the two totals. Triggers keep them current inside the writing
+# transaction, so the reports endpoint reads a handful of rows instead of
+# scanning both tables. Rebuild them with `flask rebuild-report-counters`.
+class ReportCounter(db.Model):
+    dimension = db.Column(db.String(30), primary_key=True)
+    key = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+db.Index('ix_report_counter_dimension_count', ReportCounter.dimension, ReportCounter.count.desc(), ReportCounter.key)
+
+# (dimension, column, condition) counted for each row of a table
+REPORT_COUNTER_COLUMNS = {
+    'customer': [
+        ('customer_status', 'status', '{row}.status IS NOT NULL'),
+        ('company', 'company', "{row}.company IS NOT NULL AND {row}.company != ''"),
+    ],
+    'interaction': [
+        ('interaction_type', 'type', '{row}.type IS NOT NULL'),
+    ],
+}
+
+def report_counter_trigger_ddl(table):
+    counted = REPORT_COUNTER_COLUMNS[table]
+    increment = """INSERT INTO report_counter (dimension, key, count) SELECT '{dimension}', {key}, 1 WHERE {condition}
+        ON CONFLICT (dimension, key) DO UPDATE SET count = count + 1;"""
+    decrement = "UPDATE report_counter SET count = count - 1 WHERE dimension = '{dimension}' AND key = {key};"
+    
+    increments = [
+        increment.format(dimension=dimension, key=f'new.{column}', condition=condition.format(row='new'))
+        for dimension, column, condition in counted
+    ]
+    decrements = [decrement.format(dimension=dimension, key=f'old.{column}') for dimension, column, _ in counted]
+    total_increment = increment.format(dimension='total', key=f"'{table}s'", condition='1')
+    total_decrement = decrement.format(dimension='total', key=f"'{table}s'")
+    columns = ', '.join(column for _, column, _ in counted)
+    
+    separator = '\n        '
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_report_{name} AFTER {operation} ON {table} BEGIN
+        {separator.join(statements)}
+    END"""
+        for name, operation, statements in (
+            ('insert', 'INSERT', [total_increment] + increments),
+            ('delete', 'DELETE', [total_decrement] + decrements),
+            ('update', f'UPDATE OF {columns}', decrements + increments),
+        )
+    ]
+
+REPORT_COUNTER_REBUILD_SQL = ["DELETE FROM report_counter"] + [
+    f"""INSERT INTO report_counter (dimension, key, count)
+        SELECT 'total', '{table}s', COUNT(*) FROM {table}"""
+    for table in REPORT_COUNTER_COLUMNS
+] + [
+    f"""INSERT INTO report_counter (dimension, key, count)
+        SELECT '{dimension}', {column}, COUNT(*) FROM {table} WHERE {condition.format(row=table)} GROUP BY {column}"""
+    for table, counted in REPORT_COUNTER_COLUMNS.items()
+    for dimension, column, condition in counted
+]
+
+REPORT_COUNTER_DDL = [
+    """CREATE TABLE IF NOT EXISTS report_counter (
+        dimension VARCHAR(30) NOT NULL,
+        key VARCHAR(100) NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (dimension, key)
+    )""",
+    'CREATE INDEX IF NOT EXISTS ix_report_counter_dimension_count ON report_counter (dimension, count DESC, key)',
+] + [statement for table in REPORT_COUNTER_COLUMNS for statement in report_counter_trigger_ddl(table)]
+
+for model in (Customer, Interaction):
+    for statement in report_counter_trigger_ddl(model.__tablename__):
+        event.listen(model.__table__, 'after_create', db.DDL(statement).execute_if(dialect='sqlite'))
+
+# Interaction activity rolled up per day and per ISO week (buckets start on
+# Monday), by interaction type and by the customer's current status. Like
+# the report counters, triggers maintain the rollups in the writing
+# transaction; `flask backfill-activity-rollups` recomputes them.
+class InteractionRollup(db.Model):
+    granularity = db.Column(db.String(10), primary_key=True)
+    bucket = db.Column(db.String(10), primary_key=True)  # YYYY-MM-DD of the bucket start
+    dimension = db.Column(db.String(20), primary_key=True)
+    key = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+# SQL expression for the bucket start of a created_at column, per granularity
+ROLLUP_BUCKETS = {
+    'day': "date({column})",
+    'week': "date({column}, 'weekday 0', '-6 days')",
+}
+
+def interaction_rollup_trigger_ddl():
+    upsert = """INSERT INTO interaction_rollup (granularity, bucket, dimension, key, count)
+        SELECT '{granularity}', {bucket}, '{dimension}', {key}, {delta} WHERE {key} IS NOT NULL
+        ON CONFLICT (granularity, bucket, dimension, key) DO UPDATE SET count = count + {delta};"""
+    status = "(SELECT status FROM customer WHERE id = {row}.customer_id)"
+    
+    def changes(row, delta):
+        return [
+            upsert.format(granularity=granularity, bucket=expression.format(column=f'{row}.created_at'),
+                          dimension=dimension, key=key, delta=delta)
+            for granularity, expression in ROLLUP_BUCKETS.items()
+            for dimension, key in (('type', f'{row}.type'), ('customer_status', status.format(row=row)))
+        ]
+    
+    # A status change moves all of that customer's activity to the new status
+    moves = []
+    for granularity, expression in ROLLUP_BUCKETS.items():
+        bucket = expression.format(column='created_at')
+        moves.append(f"""UPDATE interaction_rollup SET count = count - (
+            SELECT COUNT(*) FROM interaction WHERE customer_id = old.id AND {bucket} = interaction_rollup.bucket
+        ) WHERE granularity = '{granularity}' AND dimension = 'customer_status' AND key = old.status
+            AND bucket IN (SELECT {bucket} FROM interaction WHERE customer_id = old.id);""")
+        moves.append(f"""INSERT INTO interaction_rollup (granularity, bucket, dimension, key, count)
+            SELECT '{granularity}', {bucket}, 'customer_status', new.status, COUNT(*)
+            FROM interaction WHERE customer_id = new.id AND new.status IS NOT NULL GROUP BY {bucket}
+            ON CONFLICT (granularity, bucket, dimension, key) DO UPDATE SET count = count + excluded.count;""")
+    
+    separator = '\n        '
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_rollup_{name} AFTER {operation} ON {table} BEGIN
+        {separator.join(statements)}
+    END"""
+        for table, name, operation, statements in (
+            ('interaction', 'insert', 'INSERT', changes('new', 1)),
+            ('interaction', 'delete', 'DELETE', changes('old', -1)),
+            ('customer', 'status', 'UPDATE OF status', moves),
+        )
+    ]
+
+INTERACTION_ROLLUP_BACKFILL_SQL = ["DELETE FROM interaction_rollup"] + [
+    f"""INSERT INTO interaction_rollup (granularity, bucket, dimension, key, count)
+        SELECT '{granularity}', {expression.format(column='i.created_at')}, '{dimension}', {key}, COUNT(*)
+        FROM interaction i JOIN customer c ON c.id = i.customer_id
+        WHERE {key} IS NOT NULL GROUP BY 2, 4"""
+    for granularity, expression in ROLLUP_BUCKETS.items()
+    for dimension, key in (('type', 'i.type'), ('customer_status', 'c.status'))
+]
+
+INTERACTION_ROLLUP_DDL = [
+    """CREATE TABLE IF NOT EXISTS interaction_rollup (
+        granularity VARCHAR(10) NOT NULL,
+        bucket VARCHAR(10) NOT NULL,
+        dimension VARCHAR(20) NOT NULL,
+        key VARCHAR(20) NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (granularity, bucket, dimension, key)
+    )""",
+] + interaction_rollup_trigger_ddl()
+
+for statement in interaction_rollup_trigger_ddl():
+    table = Interaction.__table__ if ' ON interaction ' in statement else Customer.__table__
+    event.listen(table, 'after_create', db.DDL(statement).execute_if(dialect='sqlite'))
+
+# Append-only change log for incremental sync. Triggers record every
+# insert, update and delete of a customer or interaction in the writing
+# transaction, with the row as JSON (the old row for deletes), so
+# consumers can page through GET /api/changes in seq order.
+class ChangeLog(db.Model):
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    table_name = db.Column(db.String(30), nullable=False)
+    operation = db.Column(db.String(10), nullable=False)
+    row_id = db.Column(db.String(36), nullable=False)
+    data = db.Column(db.Text)
+    changed_at = db.Column(db.DateTime, nullable=False)
+    
+    __table_args__ = {'sqlite_autoincrement': True}  # seq values are never reused
+    
+    def to_dict(self):
+        return {
+            'seq': self.seq,
+            'table': self.table_name,
+            'operation': self.operation,
+            'id': self.row_id,
+            'data': json.loads(self.data) if self.data else None,
+            'changed_at': self.changed_at.isoformat()
+        }
+
+# Datetime text as datetime.isoformat() gives it, like datetime_text() below
+ISO_DATETIME_SQL = "replace(replace({column}, '.000000', ''), ' ', 'T')"
+CHANGE_LOG_DATETIME_FIELDS = {'customer': ['created_at', 'updated_at'], 'interaction': ['created_at']}
+
+# JSON for a row, with datetimes in the same ISO format as the API
+CHANGE_LOG_ROW_JSON = {
+    'customer': """json_object('id', {row}.id, 'first_name', {row}.first_name, 'last_name', {row}.last_name,
+            'email', {row}.email, 'company', {row}.company, 'status', {row}.status,
+            'created_at', """ + ISO_DATETIME_SQL.format(column='{row}.created_at') + """,
+            'updated_at', """ + ISO_DATETIME_SQL.format(column='{row}.updated_at') + """)""",
+    'interaction': """json_object('id', {row}.id, 'customer_id', {row}.customer_id, 'type', {row}.type,
+            'notes', {row}.notes, 'created_at', """ + ISO_DATETIME_SQL.format(column='{row}.created_at') + """)""",
+}
+
+CHANGE_LOG_OPERATIONS = (('INSERT', 'new'), ('UPDATE', 'new'), ('DELETE', 'old'))
+
+# The current time with six fractional digits, as SQLAlchemy stores and
+# parses SQLite datetimes; it would read strftime's '.123' as 123 microseconds
+CHANGE_LOG_NOW = "strftime('%Y-%m-%d %H:%M:%S', 'now') || substr(strftime('%f', 'now'), 3) || '000'"
+
+def change_log_trigger_ddl(table):
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_change_log_{operation.lower()} AFTER {operation} ON {table} BEGIN
+        INSERT INTO change_log (table_name, operation, row_id, data, changed_at)
+        VALUES ('{table}', '{operation.lower()}', {row}.id, {CHANGE_LOG_ROW_JSON[table].format(row=row)},
+            {CHANGE_LOG_NOW});
+    END"""
+        for operation, row in CHANGE_LOG_OPERATIONS
+    ]
+
+CHANGE_LOG_DDL = [
+    """CREATE TABLE IF NOT EXISTS change_log (
+        seq INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+        table_name VARCHAR(30) NOT NULL,
+        operation VARCHAR(10) NOT NULL,
+        row_id VARCHAR(36) NOT NULL,
+        data TEXT,
+        changed_at DATETIME NOT NULL
+    )""",
+] + [statement for table in CHANGE_LOG_ROW_JSON for statement in change_log_trigger_ddl(table)]
+
+def change_log_trigger_rebuild_ddl():
+    """Replace the change_log triggers of an existing database with the current ones"""
+    return [
+        f"DROP TRIGGER IF EXISTS {table}_change_log_{operation.lower()}"
+        for table in CHANGE_LOG_ROW_JSON for operation, _ in CHANGE_LOG_OPERATIONS
+    ] + [statement for table in CHANGE_LOG_ROW_JSON for statement in change_log_trigger_ddl(table)]
+
+# For databases migrated before CHANGE_LOG_NOW: pad the millisecond times
+# the old triggers wrote to microseconds
+CHANGE_LOG_TIME_FIX_DDL = change_log_trigger_rebuild_ddl() + [
+    "UPDATE change_log SET changed_at = changed_at || '000' WHERE length(changed_at) = 23",
+]
+
+# For databases migrated before ISO_DATETIME_SQL was used in the row JSON:
+# drop the zero fraction from whole-second datetimes already logged
+CHANGE_LOG_ROW_DATETIME_FIX_DDL = change_log_trigger_rebuild_ddl() + [
+    f"""UPDATE change_log SET data = json_set(data, {', '.join(
+        f"'$.{field}', replace(json_extract(data, '$.{field}'), '.000000', '')" for field in fields
+    )}) WHERE table_name = '{table}' AND data IS NOT NULL"""
+    for table, fields in CHANGE_LOG_DATETIME_FIELDS.items()
+]
+
+for model in (Customer, Interaction):
+    for statement in change_log_trigger_ddl(model.__tablename__):
+        # DDL() applies %-formatting, so the strftime pattern needs escaping
+        event.listen(model.__table__, 'after_create', db.DDL(statement.replace('%', '%%')).execute_if(dialect='sqlite'))
+
+# Outbound webhook subscriptions. Deliveries are driven from the change
+# log: each subscription keeps the seq it has delivered through, so events
+# that are not yet delivered survive restarts, and retry state and the
+# dispatcher lease live on the same row.
+class WebhookSubscription(db.Model):
+    id = db.Column(db.String(36), primary_key=True)
+    url = db.Column(db.String(500), nullable=False)
+    events = db.Column(db.String(500), nullable=False, default='*')  # comma-separated event types or *
+    secret = db.Column(db.String(100))
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    last_seq = db.Column(db.Integer, nullable=False, default=0)  # change_log seq delivered through
+    failures = db.Column(db.Integer, nullable=False, default=0)  # consecutive failed deliveries
+    next_attempt_at = db.Column(db.DateTime)
+    last_error = db.Column(db.String(500))
+    lease_owner = db.Column(db.String(50))
+    lease_until = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'url': self.url,
+            'events': self.events.split(','),
+            'active': self.active,
+            'last_seq': self.last_seq,
+            'failures': self.failures,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat()
+        }
+
+def backfill_activity_rollups():
+    """Recompute the interaction rollups from the interaction table and return the number of rows written"""
+    try:
+        for statement in INTERACTION_ROLLUP_BACKFILL_SQL:
+            db.session.execute(db.text(statement))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return InteractionRollup.query.count()
+
+@bp.cli.command('backfill-activity-rollups')
+def backfill_activity_rollups_command():
+    """Recompute the daily and weekly interaction rollups."""
+    print(f"Backfilled {backfill_activity_rollups()} activity rollup rows.")
+
+def rebuild_report_counters():
+    """Recompute every report counter from the base tables and return the number of rows written"""
+    try:
+        for statement in REPORT_COUNTER_REBUILD_SQL:
+            db.session.execute(db.text(statement))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return ReportCounter.query.count()
+
+@bp.cli.command('rebuild-report-counters')
+def rebuild_report_counters_command():
+    """Recompute the report counters to repair any drift."""
+    print(f"Rebuilt {rebuild_report_counters()} report counters.")
+
+class SchemaMigration(db.Model):
+    version = db.Column(db.Integer, primary_key=True)
+    description = db.Column(db.String(200), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Versioned schema migrations, applied in order and recorded in the
+# schema_migration table. Statements must be idempotent so that they are
+# safe on databases freshly created by db.create_all().
+MIGRATIONS = [
+    (1, 'Add secondary indexes on customer and interaction', [
+        'CREATE INDEX IF NOT EXISTS ix_customer_created_at_id ON customer (created_at, id)',
+        'CREATE INDEX IF NOT EXISTS ix_customer_status_created_at ON customer (status, created_at)',
+        'CREATE INDEX IF NOT EXISTS ix_customer_company ON customer (company)',
+        'CREATE INDEX IF NOT EXISTS ix_interaction_customer_id_created_at ON interaction (customer_id, created_at DESC)',
+        'CREATE INDEX IF NOT EXISTS ix_interaction_created_at ON interaction (created_at)',
+    ]),
+    (2, 'Add FTS5 search over customers and interaction notes',
+        CUSTOMER_SEARCH_DDL + INTERACTION_SEARCH_DDL + [
+            "INSERT INTO customer_fts (customer_fts) VALUES ('rebuild')",
+            "INSERT INTO interaction_fts (interaction_fts) VALUES ('rebuild')",
+        ]),
+    (3, 'Add table change counters for HTTP validators', TABLE_VERSION_DDL),
+    (4, 'Add incrementally maintained report counters', REPORT_COUNTER_DDL + REPORT_COUNTER_REBUILD_SQL),
+    (5, 'Add daily and weekly interaction activity rollups', INTERACTION_ROLLUP_DDL + INTERACTION_ROLLUP_BACKFILL_SQL),
+    (6, 'Add append-only change log for incremental sync', CHANGE_LOG_DDL),
+    (7, 'Write change log times with microseconds', CHANGE_LOG_TIME_FIX_DDL),
+    (8, 'Drop zero fractions from datetimes in change log rows', CHANGE_LOG_ROW_DATETIME_FIX_DDL),
+]
+
+def pending_migrations(connection):
+    """Return the MIGRATIONS entries not yet recorded, on a session or connection"""
+    applied = {version for (version,) in connection.execute(db.select(SchemaMigration.version))}
+    return [migration for migration in MIGRATIONS if migration[0] not in applied]
+
+def apply_migration(connection, version, description, statements):
+    for statement in statements:
+        connection.execute(db.text(statement))
+    connection.execute(SchemaMigration.__table__.insert(), {
+        'version': version, 'description': description, 'applied_at': datetime.utcnow()
+    })
+
+def run_migrations():
+    """Apply any pending migrations and return the versions that were applied"""
+    newly_applied = []
+    
+    for migration in pending_migrations(db.session):
+        try:
+            apply_migration(db.session, *migration)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        newly_applied.append(migration[0])
+    
+    return newly_applied
+
+def init_db():
+    """Create any missing tables and apply pending migrations, returning the versions applied.
+    
+    Every worker may run this on its first request. On SQLite the whole setup
+    is one BEGIN IMMEDIATE transaction, so the first worker builds the schema
+    while the others wait on the write lock and then find nothing to do.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        db.create_all()
+        return run_migrations()
+    
+    # AUTOCOMMIT stops pysqlite issuing its own deferred BEGIN before ours
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        with connection.begin():
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+            db.Model.metadata.create_all(connection)
+            pending = pending_migrations(connection)
+            for migration in pending:
+                apply_migration(connection, *migration)
+    return [version for version, _, _ in pending]
+
+@bp.cli.command('init-db')
+def init_db_command():
+    """Create the database tables and apply pending migrations."""
+    applied = init_db()
+    print(f"Applied migrations {', '.join(map(str, applied))}." if applied else "The database is up to date.")
+
+@bp.before_app_first_request
+def initialize_database():
+    # Deferred from import time so that workers start without touching the database
+    if current_app.config['AUTO_INIT_DB']:
+        init_db()
 
 # Sample data initialization
 def initialize_sample_data():
     # Check if we already have data
     if Customer.query.count() > 0:
-        return
+        return False
         
     # Add sample customers
     customers = [
@@ -106,1116 +718,794 @@ def initialize_sample_data():
         )
         db.session.add(interaction)
         db.session.commit()
+    
+    return True
 
-# Initialize sample data
-with app.app_context():
-    initialize_sample_data()
+@bp.cli.command('load-sample-data')
+def load_sample_data_command():
+    """Add demo customers and an interaction to an empty database."""
+    init_db()
+    if initialize_sample_data():
+        print("Loaded sample data.")
+    else:
+        print("The database already has customers, so no sample data was loaded.")
 
-@app.route('/')
+# Static dashboard assets. Each file is served under a content-hashed name
+# with a long-lived Cache-Control header, and is compressed once per process
+# when the first page or asset is requested.
+ASSET_MAX_AGE = 31536000  # one year, safe because the name changes with the content
+
+class Asset:
+    def __init__(self, path, name):
+        with open(path, 'rb') as f:
+            self.body = f.read()
+        digest = hashlib.sha256(self.body).hexdigest()[:12]
+        stem, extension = os.path.splitext(name)
+        self.hashed_name = f"{stem}.{digest}{extension}"
+        self.etag = digest
+        self.mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        self.encodings = {'gzip': gzip.compress(self.body, compresslevel=9)}
+        if brotli is not None:
+            self.encodings['br'] = brotli.compress(self.body)
+
+def load_assets(static_folder):
+    """Build the asset manifest, keyed by the file's path relative to static_folder"""
+    assets = {}
+    for directory, _, filenames in os.walk(static_folder):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, static_folder).replace(os.sep, '/')
+            assets[name] = Asset(path, name)
+    return assets
+
+_asset_manifests = {}  # static folder -> (assets by name, assets by hashed name)
+_asset_lock = threading.Lock()
+
+def get_assets():
+    static_folder = current_app.static_folder
+    with _asset_lock:
+        if static_folder not in _asset_manifests:
+            assets = load_assets(static_folder)
+            _asset_manifests[static_folder] = (assets, {asset.hashed_name: asset for asset in assets.values()})
+        return _asset_manifests[static_folder]
+
+@bp.app_template_global()
+def asset_url(name):
+    assets, _ = get_assets()
+    return f"/assets/{assets[name].hashed_name}"
+
+@bp.route('/assets/<path:hashed_name>')
+def serve_asset(hashed_name):
+    _, assets_by_hashed_name = get_assets()
+    asset = assets_by_hashed_name.get(hashed_name)
+    if asset is None:
+        return jsonify({"error": "Asset not found"}), 404
+    
+    encoding = request.accept_encodings.best_match([name for name in ('br', 'gzip') if name in asset.encodings])
+    response = current_app.response_class(asset.encodings[encoding] if encoding else asset.body, mimetype=asset.mimetype)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+    response.set_etag(f"{asset.etag}-{encoding}" if encoding else asset.etag)
+    return response.make_conditional(request)
+
+@bp.route('/')
 def home():
-    return """
-    <html>
-        <head>
-            <title>Onix CRM</title>
-            <style>
-                /* ServiceNow-inspired styles */
-                :root {
-                    --servicenow-blue: #2e51bb;
-                    --servicenow-light-blue: #3a7cda;
-                    --servicenow-dark-blue: #1e3c8c;
-                    --servicenow-green: #6eb056;
-                    --servicenow-yellow: #f2af43;
-                    --servicenow-red: #e74c3c;
-                    --servicenow-gray: #e8e8e8;
-                    --servicenow-dark-gray: #4a4a4a;
-                    --servicenow-border: #d9d9d9;
-                }
-                body { 
-                    font-family: 'Source Sans Pro', 'Helvetica Neue', Arial, sans-serif; 
-                    margin: 0; 
-                    padding: 0; 
-                    background-color: #f6f7f9; 
-                    color: #2e2e2e;
-                }
-                .main-container {
-                    max-width: 1400px;
-                    margin: 0 auto;
-                    padding: 0 20px;
-                }
-                .global-header {
-                    background-color: var(--servicenow-blue);
-                    color: white;
-                    padding: 0 20px;
-                    height: 50px;
-                    display: flex;
-                    align-items: center;
-                    justify-content: space-between;
-                    position: sticky;
-                    top: 0;
-                    z-index: 1000;
-                    box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-                }
-                h1 { 
-                    color: var(--servicenow-dark-blue); 
-                    margin: 20px 0; 
-                    font-weight: 400;
-                    font-size: 24px;
-                }
-                .header { 
-                    display: flex; 
-                    justify-content: space-between; 
-                    align-items: center; 
-                    margin-bottom: 20px; 
-                    padding: 15px 0;
-                    border-bottom: 1px solid var(--servicenow-border);
-                }
-                .card { 
-                    background-color: white; 
-                    border-radius: 4px; 
-                    box-shadow: 0 1px 3px rgba(0,0,0,0.08); 
-                    padding: 16px; 
-                    margin-bottom: 16px; 
-                    border: 1px solid var(--servicenow-border);
-                }
-                .customer-list { 
-                    display: grid; 
-                    grid-template-columns: repeat(auto-fill, minmax(300px, 1fr)); 
-                    gap: 16px; 
-                }
-                .customer-card { 
-                    cursor: pointer; 
-                    transition: all 0.2s; 
-                    border-left: 4px solid transparent;
-                }
-                .customer-card:hover { 
-                    border-left: 4px solid var(--servicenow-light-blue); 
-                    box-shadow: 0 2px 6px rgba(0,0,0,0.1); 
-                }
-                .customer-name { 
-                    font-size: 16px; 
-                    font-weight: 600; 
-                    color: var(--servicenow-blue); 
-                }
-                .customer-email { 
-                    color: var(--servicenow-dark-gray); 
-                    margin-bottom: 8px; 
-                    font-size: 14px;
-                }
-                .customer-company { 
-                    font-weight: 500; 
-                    font-size: 14px;
-                }
-                .status { 
-                    display: inline-block; 
-                    padding: 3px 8px; 
-                    border-radius: 12px; 
-                    font-size: 12px; 
-                    font-weight: 600; 
-                    text-transform: uppercase; 
-                }
-                .status-customer { 
-                    background-color: var(--servicenow-green); 
-                    color: white; 
-                }
-                .status-prospect { 
-                    background-color: var(--servicenow-yellow); 
-                    color: white; 
-                }
-                .status-lead { 
-                    background-color: var(--servicenow-light-blue); 
-                    color: white; 
-                }
-                .modal { 
-                    display: none; 
-                    position: fixed; 
-                    top: 0; 
-                    left: 0; 
-                    width: 100%; 
-                    height: 100%; 
-                    background-color: rgba(0,0,0,0.4); 
-                    z-index: 1001; 
-                }
-                .modal-content { 
-                    background-color: #fff; 
-                    margin: 10% auto; 
-                    padding: 20px; 
-                    border-radius: 4px; 
-                    width: 70%; 
-                    max-width: 700px; 
-                    position: relative; 
-                    box-shadow: 0 4px 20px rgba(0,0,0,0.15);
-                }
-                .modal-header {
-                    border-bottom: 1px solid var(--servicenow-border);
-                    padding-bottom: 10px;
-                    margin-bottom: 15px;
-                }
-                .close { 
-                    position: absolute; 
-                    right: 15px; 
-                    top: 10px; 
-                    font-size: 24px; 
-                    font-weight: normal; 
-                    cursor: pointer; 
-                    color: #888;
-                }
-                .action-buttons { 
-                    margin: 15px 0; 
-                    display: flex;
-                    gap: 10px;
-                }
-                .delete-btn { 
-                    background-color: var(--servicenow-red); 
-                    color: white; 
-                    border: none; 
-                    padding: 8px 12px; 
-                    border-radius: 4px; 
-                    cursor: pointer; 
-                }
-                .delete-btn:hover { 
-                    background-color: #c82333; 
-                }
-                .close:hover { 
-                    color: #444; 
-                }
-                .form-group { 
-                    margin-bottom: 15px; 
-                }
-                label { 
-                    display: block; 
-                    margin-bottom: 5px; 
-                    font-weight: 500; 
-                    font-size: 14px;
-                    color: var(--servicenow-dark-gray);
-                }
-                input, select, textarea { 
-                    width: 100%; 
-                    padding: 8px 10px; 
-                    border: 1px solid var(--servicenow-border); 
-                    border-radius: 4px; 
-                    font-family: inherit; 
-                    font-size: 14px;
-                }
-                input:focus, select:focus, textarea:focus {
-                    outline: none;
-                    border-color: var(--servicenow-light-blue);
-                    box-shadow: 0 0 0 2px rgba(58, 124, 218, 0.2);
-                }
-                button { 
-                    background-color: var(--servicenow-blue); 
-                    color: white; 
-                    border: none; 
-                    padding: 8px 16px; 
-                    border-radius: 4px; 
-                    cursor: pointer; 
-                    font-weight: 600; 
-                    font-size: 14px;
-                }
-                button:hover { 
-                    background-color: var(--servicenow-dark-blue); 
-                }
-                .error { 
-                    color: var(--servicenow-red); 
-                    margin-top: 5px; 
-                    font-size: 13px;
-                }
-                .interactions { 
-                    margin-top: 20px; 
-                }
-                .interaction-item { 
-                    padding: 10px; 
-                    border-left: 3px solid var(--servicenow-light-blue); 
-                    margin-bottom: 10px; 
-                    background-color: #f9f9f9; 
-                }
-                .interaction-type { 
-                    font-weight: 600; 
-                    color: var(--servicenow-dark-blue);
-                }
-                .interaction-date { 
-                    color: var(--servicenow-dark-gray); 
-                    font-size: 12px; 
-                }
-                .api-section { 
-                    margin-top: 30px; 
-                }
-                .endpoint { 
-                    background-color: #f6f7f9; 
-                    padding: 10px; 
-                    border-radius: 4px; 
-                    font-family: monospace; 
-                    margin-bottom: 10px; 
-                    border: 1px solid var(--servicenow-border);
-                }
-                pre { 
-                    background-color: #f5f5f5; 
-                    padding: 10px; 
-                    border-radius: 4px; 
-                    overflow-x: auto; 
-                    border: 1px solid var(--servicenow-border);
-                    font-size: 13px;
-                }
-                .tabs { 
-                    display: flex; 
-                    margin-bottom: 20px; 
-                    border-bottom: 1px solid var(--servicenow-border);
-                }
-                .tab { 
-                    padding: 10px 20px; 
-                    cursor: pointer; 
-                    border-bottom: 2px solid transparent; 
-                    color: var(--servicenow-dark-gray);
-                }
-                .tab.active { 
-                    border-bottom: 2px solid var(--servicenow-blue); 
-                    font-weight: 600; 
-                    color: var(--servicenow-blue);
-                }
-                .tab-content { 
-                    display: none; 
-                }
-                .tab-content.active { 
-                    display: block; 
-                }
-                
-                /* Main view styles */
-                .main-view {
-                    display: none;
-                }
-                
-                .main-view.active {
-                    display: block;
-                }
-            </style>
-        </head>
-        <body>
-            <div class="global-header">
-                <div style="display: flex; align-items: center;">
-                    <span style="font-size: 18px; font-weight: 600; margin-right: 30px;">Onix CRM</span>
-                    <nav style="display: flex;">
-                        <a href="#" id="nav-dashboard" onclick="switchMainView('dashboard')" style="color: white; text-decoration: none; padding: 0 15px; height: 50px; display: flex; align-items: center; border-bottom: 3px solid white;">Dashboard</a>
-                        <a href="#" id="nav-customers" onclick="switchMainView('customers')" style="color: white; text-decoration: none; padding: 0 15px; height: 50px; display: flex; align-items: center;">Customers</a>
-                        <a href="#" id="nav-reports" onclick="switchMainView('reports')" style="color: white; text-decoration: none; padding: 0 15px; height: 50px; display: flex; align-items: center;">Reports</a>
-                    </nav>
-                </div>
-                <div>
-                    <span style="font-size: 14px;">Admin</span>
-                </div>
-            </div>
+    return render_template('index.html')
+
+# Request timing and SQL instrumentation, exposed on /metrics and in a
+# Server-Timing header. Metrics are kept per app in each worker process.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}  # (method, endpoint, status) -> count
+        self.latency = {}  # (method, endpoint) -> [bucket counts..., +Inf count, sum]
+        self.queries = {}  # endpoint -> [query count, sql seconds]
+        self.n_plus_one = {}  # endpoint -> requests over the query threshold
+    
+    def observe(self, method, endpoint, status, duration, query_count, sql_time, n_plus_one):
+        with self._lock:
+            key = (method, endpoint, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            
+            histogram = self.latency.setdefault((method, endpoint), [0] * (len(LATENCY_BUCKETS) + 2))
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    histogram[i] += 1
+            histogram[len(LATENCY_BUCKETS)] += 1
+            histogram[-1] += duration
             
-            <div class="main-container" id="main-view-container">
-                <!-- DASHBOARD VIEW -->
-                <div id="main-dashboard" class="main-view active">
-                    <div class="header">
-                        <h1>Dashboard</h1>
-                        <button onclick="openNewCustomerModal()">Add New Customer</button>
-                    </div>
-                    
-                    <div class="tabs">
-                        <div class="tab active" onclick="switchTab('dashboard')">Dashboard</div>
-                        <div class="tab" onclick="switchTab('api')">API Documentation</div>
-                    </div>
-                
-                    <div id="dashboard" class="tab-content active">
-                        <div class="card">
-                            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 15px;">
-                                <h2 style="margin: 0; font-weight: 400; color: var(--servicenow-dark-blue);">Recent Customers</h2>
-                                <div style="display: flex; gap: 10px; align-items: center;">
-                                    <input type="text" placeholder="Search customers..." style="width: 250px; padding: 6px 10px; margin-right: 10px;">
-                                    <select style="width: auto; padding: 6px 10px;">
-                                        <option>All Statuses</option>
-                                        <option>Customer</option>
-                                        <option>Prospect</option>
-                                        <option>Lead</option>
-                                    </select>
-                                </div>
-                            </div>
-                            <div class="customer-list" id="customerList">
-                                <!-- Customer cards will be populated here -->
-                                <div class="card customer-card">
-                                    <p class="customer-name">Loading customers...</p>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-                
-                <!-- CUSTOMERS VIEW -->
-                <div id="main-customers" class="main-view">
-                    <div class="header">
-                        <h1>Customer Management</h1>
-                        <button onclick="openNewCustomerModal()">Add New Customer</button>
-                    </div>
-                    
-                    <div class="card">
-                        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 15px;">
-                            <h2 style="margin: 0; font-weight: 400; color: var(--servicenow-dark-blue);">All Customers</h2>
-                            <div style="display: flex; gap: 10px; align-items: center;">
-                                <input type="text" id="customer-search" placeholder="Search customers..." style="width: 250px; padding: 6px 10px; margin-right: 10px;">
-                                <select id="status-filter" style="width: auto; padding: 6px 10px;">
-                                    <option value="all">All Statuses</option>
-                                    <option value="customer">Customer</option>
-                                    <option value="prospect">Prospect</option>
-                                    <option value="lead">Lead</option>
-                                </select>
-                            </div>
-                        </div>
-                        <table style="width: 100%; border-collapse: collapse;">
-                            <thead>
-                                <tr style="background-color: #f6f7f9; border-bottom: 1px solid var(--servicenow-border);">
-                                    <th style="text-align: left; padding: 10px; font-weight: 500;">Name</th>
-                                    <th style="text-align: left; padding: 10px; font-weight: 500;">Email</th>
-                                    <th style="text-align: left; padding: 10px; font-weight: 500;">Company</th>
-                                    <th style="text-align: left; padding: 10px; font-weight: 500;">Status</th>
-                                    <th style="text-align: left; padding: 10px; font-weight: 500;">Created</th>
-                                    <th style="text-align: center; padding: 10px; font-weight: 500;">Actions</th>
-                                </tr>
-                            </thead>
-                            <tbody id="customers-table-body">
-                                <tr>
-                                    <td colspan="6" style="text-align: center; padding: 20px;">Loading customers...</td>
-                                </tr>
-                            </tbody>
-                        </table>
-                    </div>
-                </div>
-                
-                <!-- REPORTS VIEW -->
-                <div id="main-reports" class="main-view">
-                    <div class="header">
-                        <h1>Reports & Analytics</h1>
-                    </div>
-                    
-                    <div style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 20px;">
-                        <div class="card">
-                            <h2 style="margin-top: 0; font-weight: 400; color: var(--servicenow-dark-blue);">Customer Status Distribution</h2>
-                            <div style="height: 200px; display: flex; align-items: flex-end; gap: 20px; padding: 20px 0;">
-                                <div style="display: flex; flex-direction: column; align-items: center; flex: 1;">
-                                    <div style="background-color: var(--servicenow-yellow); width: 100%; height: 120px;"></div>
-                                    <p style="margin-top: 10px; font-weight: 500;">Prospects</p>
-                                    <p id="prospect-count" style="margin: 0;">0</p>
-                                </div>
-                                <div style="display: flex; flex-direction: column; align-items: center; flex: 1;">
-                                    <div style="background-color: var(--servicenow-light-blue); width: 100%; height: 80px;"></div>
-                                    <p style="margin-top: 10px; font-weight: 500;">Leads</p>
-                                    <p id="lead-count" style="margin: 0;">0</p>
-                                </div>
-                                <div style="display: flex; flex-direction: column; align-items: center; flex: 1;">
-                                    <div style="background-color: var(--servicenow-green); width: 100%; height: 150px;"></div>
-                                    <p style="margin-top: 10px; font-weight: 500;">Customers</p>
-                                    <p id="customer-count" style="margin: 0;">0</p>
-                                </div>
-                            </div>
-                        </div>
-                        
-                        <div class="card">
-                            <h2 style="margin-top: 0; font-weight: 400; color: var(--servicenow-dark-blue);">Interaction Types</h2>
-                            <div style="height: 200px; display: flex; align-items: flex-end; gap: 20px; padding: 20px 0;">
-                                <div style="display: flex; flex-direction: column; align-items: center; flex: 1;">
-                                    <div style="background-color: #6eb0d4; width: 100%; height: 100px;"></div>
-                                    <p style="margin-top: 10px; font-weight: 500;">Calls</p>
-                                    <p id="call-count" style="margin: 0;">0</p>
-                                </div>
-                                <div style="display: flex; flex-direction: column; align-items: center; flex: 1;">
-                                    <div style="background-color: #d49a6e; width: 100%; height: 130px;"></div>
-                                    <p style="margin-top: 10px; font-weight: 500;">Emails</p>
-                                    <p id="email-count" style="margin: 0;">0</p>
-                                </div>
-                                <div style="display: flex; flex-direction: column; align-items: center; flex: 1;">
-                                    <div style="background-color: #a16ed4; width: 100%; height: 70px;"></div>
-                                    <p style="margin-top: 10px; font-weight: 500;">Meetings</p>
-                                    <p id="meeting-count" style="margin: 0;">0</p>
-                                </div>
-                            </div>
-                        </div>
-                        
-                        <div class="card">
-                            <h2 style="margin-top: 0; font-weight: 400; color: var(--servicenow-dark-blue);">Recent Activity</h2>
-                            <div id="recent-activity" style="max-height: 250px; overflow-y: auto;">
-                                <p style="text-align: center; color: var(--servicenow-dark-gray);">Loading recent activity...</p>
-                            </div>
-                        </div>
-                        
-                        <div class="card">
-                            <h2 style="margin-top: 0; font-weight: 400; color: var(--servicenow-dark-blue);">Top Companies</h2>
-                            <div id="top-companies" style="max-height: 250px; overflow-y: auto;">
-                                <p style="text-align: center; color: var(--servicenow-dark-gray);">Loading company data...</p>
-                            </div>
-                        </div>
-                    </div>
-                </div>
+            totals = self.queries.setdefault(endpoint, [0, 0.0])
+            totals[0] += query_count
+            totals[1] += sql_time
             
-            <div id="api" class="tab-content">
-                <div class="card api-section">
-                    <h2>API Documentation</h2>
-                    <p>This CRM system provides a RESTful API for managing customers and interactions.</p>
-                    
-                    <h3>Customer Endpoints</h3>
-                    <div class="endpoint">
-                        <strong>GET /api/customers</strong> - List all customers
-                    </div>
-                    <div class="endpoint">
-                        <strong>GET /api/customers/:id</strong> - Get customer details
-                    </div>
-                    <div class="endpoint">
-                        <strong>POST /api/customers</strong> - Create a new customer
-                    </div>
-                    <div class="endpoint">
-                        <strong>PUT /api/customers/:id</strong> - Update a customer
-                    </div>
-                    <div class="endpoint">
-                        <strong>DELETE /api/customers/:id</strong> - Delete a customer
-                    </div>
-                    
-                    <h3>Interaction Endpoints</h3>
-                    <div class="endpoint">
-                        <strong>GET /api/customers/:id/interactions</strong> - List customer interactions
-                    </div>
-                    <div class="endpoint">
-                        <strong>POST /api/interactions</strong> - Create a new interaction
-                    </div>
-                </div>
-            </div>
+            if n_plus_one:
+                self.n_plus_one[endpoint] = self.n_plus_one.get(endpoint, 0) + 1
+    
+    def render(self):
+        """Render the metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            lines.append('# HELP onix_http_requests_total HTTP requests by method, endpoint and status.')
+            lines.append('# TYPE onix_http_requests_total counter')
+            for (method, endpoint, status), count in sorted(self.requests.items()):
+                lines.append(f'onix_http_requests_total{{method="{method}",endpoint="{endpoint}",status="{status}"}} {count}')
             
-            <!-- Customer Modal -->
-            <div id="customerModal" class="modal">
-                <div class="modal-content">
-                    <div class="modal-header">
-                        <h2 style="margin: 0; font-weight: 400; color: var(--servicenow-dark-blue);">Customer Details</h2>
-                        <span class="close" onclick="closeCustomerModal()">&times;</span>
-                    </div>
-                    <div id="customerDetails" style="margin-bottom: 20px;">
-                        <!-- Customer details will be populated here -->
-                    </div>
-                    <div class="action-buttons">
-                        <button onclick="editCustomer()">Edit</button>
-                        <button class="delete-btn" onclick="deleteCustomer()">Delete Customer</button>
-                    </div>
-                    
-                    <div style="margin-top: 30px; border-top: 1px solid var(--servicenow-border); padding-top: 20px;">
-                        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 15px;">
-                            <h3 style="margin: 0; font-weight: 400; color: var(--servicenow-dark-blue);">Interactions</h3>
-                            <button onclick="toggleAddInteraction()" style="background-color: transparent; color: var(--servicenow-blue); border: 1px solid var(--servicenow-blue); padding: 6px 12px;">New Interaction</button>
-                        </div>
-                        <div id="customerInteractions"></div>
-                        
-                        <div class="add-interaction" id="addInteractionForm" style="display: none; background-color: #f9f9f9; padding: 15px; border-radius: 4px; margin-top: 15px; border: 1px solid var(--servicenow-border);">
-                            <h3 style="margin-top: 0; font-weight: 400; color: var(--servicenow-dark-blue);">Add Interaction</h3>
-                            <div class="form-group">
-                                <label for="interactionType">Type</label>
-                                <select id="interactionType">
-                                    <option value="call">Call</option>
-                                    <option value="email">Email</option>
-                                    <option value="meeting">Meeting</option>
-                                </select>
-                            </div>
-                            <div class="form-group">
-                                <label for="interactionNotes">Notes</label>
-                                <textarea id="interactionNotes" placeholder="Notes" rows="3"></textarea>
-                            </div>
-                            <div style="display: flex; gap: 10px; justify-content: flex-end;">
-                                <button onclick="cancelAddInteraction()" style="background-color: transparent; color: var(--servicenow-dark-gray); border: 1px solid var(--servicenow-border);">Cancel</button>
-                                <button onclick="addInteraction()">Add Interaction</button>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
+            lines.append('# HELP onix_http_request_duration_seconds Request latency by method and endpoint.')
+            lines.append('# TYPE onix_http_request_duration_seconds histogram')
+            for (method, endpoint), histogram in sorted(self.latency.items()):
+                labels = f'method="{method}",endpoint="{endpoint}"'
+                for bound, count in zip(LATENCY_BUCKETS, histogram):
+                    lines.append(f'onix_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'onix_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram[len(LATENCY_BUCKETS)]}')
+                lines.append(f'onix_http_request_duration_seconds_sum{{{labels}}} {histogram[-1]:.6f}')
+                lines.append(f'onix_http_request_duration_seconds_count{{{labels}}} {histogram[len(LATENCY_BUCKETS)]}')
             
-            <!-- New Customer Modal -->
-            <div id="newCustomerModal" class="modal">
-                <div class="modal-content">
-                    <div class="modal-header">
-                        <h2 style="margin: 0; font-weight: 400; color: var(--servicenow-dark-blue);">Add New Customer</h2>
-                        <span class="close" onclick="closeNewCustomerModal()">&times;</span>
-                    </div>
-                    
-                    <div style="padding: 10px 0;">
-                        <div style="display: flex; gap: 15px; margin-bottom: 15px;">
-                            <div class="form-group" style="flex: 1;">
-                                <label for="firstName">First Name</label>
-                                <input type="text" id="firstName" required>
-                            </div>
-                            <div class="form-group" style="flex: 1;">
-                                <label for="lastName">Last Name</label>
-                                <input type="text" id="lastName" required>
-                            </div>
-                        </div>
-                        
-                        <div class="form-group">
-                            <label for="email">Email</label>
-                            <input type="email" id="email" required>
-                        </div>
-                        
-                        <div class="form-group">
-                            <label for="company">Company</label>
-                            <input type="text" id="company">
-                        </div>
-                        
-                        <div class="form-group">
-                            <label for="status">Status</label>
-                            <select id="status">
-                                <option value="prospect">Prospect</option>
-                                <option value="lead">Lead</option>
-                                <option value="customer">Customer</option>
-                            </select>
-                        </div>
-                    </div>
-                    
-                    <div style="display: flex; justify-content: flex-end; gap: 10px; margin-top: 20px; padding-top: 15px; border-top: 1px solid var(--servicenow-border);">
-                        <button onclick="closeNewCustomerModal()" style="background-color: transparent; color: var(--servicenow-dark-gray); border: 1px solid var(--servicenow-border);">Cancel</button>
-                        <button onclick="createCustomer()">Create Customer</button>
-                    </div>
-                </div>
-            </div>
+            lines.append('# HELP onix_sql_queries_total SQL statements executed while handling requests.')
+            lines.append('# TYPE onix_sql_queries_total counter')
+            for endpoint, (count, _) in sorted(self.queries.items()):
+                lines.append(f'onix_sql_queries_total{{endpoint="{endpoint}"}} {count}')
             
-            <script>
-                let currentCustomerId = null;
-                
-                // Load all data when the page loads
-                window.onload = function() {
-                    loadCustomers();
-                    loadCustomersTable();
-                    loadReportsData();
-                };
-                
-                function switchMainView(viewId) {
-                    // Hide all main views
-                    document.querySelectorAll('.main-view').forEach(view => {
-                        view.classList.remove('active');
-                    });
-                    
-                    // Deactivate all navigation links
-                    document.querySelectorAll('#nav-dashboard, #nav-customers, #nav-reports').forEach(nav => {
-                        nav.style.borderBottom = 'none';
-                    });
-                    
-                    // Activate the selected view and navigation link
-                    document.getElementById(`main-${viewId}`).classList.add('active');
-                    document.getElementById(`nav-${viewId}`).style.borderBottom = '3px solid white';
-                    
-                    // Refresh data for the selected view
-                    if (viewId === 'customers') {
-                        loadCustomersTable();
-                    } else if (viewId === 'reports') {
-                        loadReportsData();
-                    } else if (viewId === 'dashboard') {
-                        loadCustomers();
-                    }
-                }
-                
-                function switchTab(tabId) {
-                    // Hide all tab contents
-                    document.querySelectorAll('.tab-content').forEach(content => {
-                        content.classList.remove('active');
-                    });
-                    
-                    // Deactivate all tabs
-                    document.querySelectorAll('.tab').forEach(tab => {
-                        tab.classList.remove('active');
-                    });
-                    
-                    // Activate the selected tab and content
-                    document.getElementById(tabId).classList.add('active');
-                    document.querySelector(`.tab[onclick="switchTab('${tabId}')"]`).classList.add('active');
-                }
-                
-                function loadCustomers() {
-                    fetch('/api/customers')
-                        .then(response => response.json())
-                        .then(data => {
-                            const customerList = document.getElementById('customerList');
-                            customerList.innerHTML = '';
-                            
-                            if (data.error) {
-                                customerList.innerHTML = `<p class="error">${data.error}</p>`;
-                                return;
-                            }
-                            
-                            data.forEach(customer => {
-                                const card = document.createElement('div');
-                                card.className = 'card customer-card';
-                                card.onclick = () => openCustomerModal(customer.id);
-                                
-                                const statusClass = `status-${customer.status}`;
-                                
-                                card.innerHTML = `
-                                    <p class="customer-name">${customer.first_name} ${customer.last_name}</p>
-                                    <p class="customer-email">${customer.email}</p>
-                                    <p class="customer-company">${customer.company}</p>
-                                    <span class="status ${statusClass}">${customer.status}</span>
-                                `;
-                                
-                                customerList.appendChild(card);
-                            });
-                        })
-                        .catch(error => {
-                            document.getElementById('customerList').innerHTML = 
-                                `<p class="error">Error loading customers: ${error.message}</p>`;
-                        });
-                }
-                
-                function openCustomerModal(customerId) {
-                    currentCustomerId = customerId;
-                    document.getElementById('customerModal').style.display = 'block';
-                    
-                    // Fetch customer details
-                    fetch(`/api/customers/${customerId}`)
-                        .then(response => response.json())
-                        .then(customer => {
-                            document.getElementById('customerDetails').innerHTML = `
-                                <div style="display: flex; align-items: center; margin-bottom: 15px;">
-                                    <div style="width: 40px; height: 40px; border-radius: 50%; background-color: var(--servicenow-light-blue); color: white; display: flex; align-items: center; justify-content: center; margin-right: 15px; font-size: 18px;">
-                                        ${customer.first_name.charAt(0)}${customer.last_name.charAt(0)}
-                                    </div>
-                                    <div>
-                                        <h3 style="margin: 0; font-weight: 500; color: var(--servicenow-dark-blue);">${customer.first_name} ${customer.last_name}</h3>
-                                        <p style="margin: 3px 0 0 0; color: var(--servicenow-dark-gray);">${customer.company}</p>
-                                    </div>
-                                </div>
-                                <div style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 15px; margin-bottom: 20px;">
-                                    <div class="card" style="margin-bottom: 0;">
-                                        <p style="margin: 0 0 5px 0; color: var(--servicenow-dark-gray); font-size: 12px;">Email</p>
-                                        <p style="margin: 0; font-weight: 500;">${customer.email}</p>
-                                    </div>
-                                    <div class="card" style="margin-bottom: 0;">
-                                        <p style="margin: 0 0 5px 0; color: var(--servicenow-dark-gray); font-size: 12px;">Status</p>
-                                        <p style="margin: 0;"><span class="status status-${customer.status}">${customer.status}</span></p>
-                                    </div>
-                                    <div class="card" style="margin-bottom: 0;">
-                                        <p style="margin: 0 0 5px 0; color: var(--servicenow-dark-gray); font-size: 12px;">Created</p>
-                                        <p style="margin: 0; font-weight: 500;">${new Date(customer.created_at).toLocaleDateString()}</p>
-                                    </div>
-                                    <div class="card" style="margin-bottom: 0;">
-                                        <p style="margin: 0 0 5px 0; color: var(--servicenow-dark-gray); font-size: 12px;">Last Updated</p>
-                                        <p style="margin: 0; font-weight: 500;">${new Date(customer.updated_at).toLocaleDateString()}</p>
-                                    </div>
-                                </div>
-                            `;
-                            
-                            loadInteractions(customerId);
-                        });
-                    
-                    // Hide the interaction form by default
-                    document.getElementById('addInteractionForm').style.display = 'none';
-                    document.getElementById('customerModal').style.display = 'block';
-                }
-                
-                function loadInteractions(customerId) {
-                    fetch(`/api/customers/${customerId}/interactions`)
-                        .then(response => response.json())
-                        .then(interactions => {
-                            const interactionsList = document.getElementById('customerInteractions');
-                            
-                            if (interactions.error) {
-                                interactionsList.innerHTML = `<p class="error">${interactions.error}</p>`;
-                                return;
-                            }
-                            
-                            if (interactions.length === 0) {
-                                interactionsList.innerHTML = '<div style="padding: 15px; text-align: center; color: var(--servicenow-dark-gray);">No interactions recorded yet.</div>';
-                                return;
-                            }
-                            
-                            interactionsList.innerHTML = '';
-                            
-                            interactions.forEach(interaction => {
-                                const item = document.createElement('div');
-                                item.className = 'interaction-item';
-                                
-                                // Get icon based on interaction type
-                                let icon = '📞'; // default phone icon
-                                if (interaction.type === 'email') icon = '✉️';
-                                if (interaction.type === 'meeting') icon = '👥';
-                                
-                                item.innerHTML = `
-                                    <div style="display: flex; align-items: flex-start;">
-                                        <div style="font-size: 18px; margin-right: 10px;">${icon}</div>
-                                        <div style="flex: 1;">
-                                            <p class="interaction-type">${interaction.type}</p>
-                                            <p style="margin: 5px 0;">${interaction.notes}</p>
-                                            <p class="interaction-date">${new Date(interaction.created_at).toLocaleString()}</p>
-                                        </div>
-                                    </div>
-                                `;
-                                interactionsList.appendChild(item);
-                            });
-                        })
-                        .catch(error => {
-                            document.getElementById('customerInteractions').innerHTML = 
-                                `<p class="error">Error loading interactions: ${error.message}</p>`;
-                        });
-                }
-                
-                function toggleAddInteraction() {
-                    const form = document.getElementById('addInteractionForm');
-                    form.style.display = form.style.display === 'none' ? 'block' : 'none';
-                }
-                
-                function cancelAddInteraction() {
-                    document.getElementById('addInteractionForm').style.display = 'none';
-                    document.getElementById('interactionNotes').value = '';
-                    document.getElementById('interactionType').selectedIndex = 0;
-                }
-                
-                function editCustomer() {
-                    // This would be implemented in a real application
-                    alert('Edit customer functionality would be implemented here');
-                }
-                
-                function closeCustomerModal() {
-                    document.getElementById('customerModal').style.display = 'none';
-                    currentCustomerId = null;
-                }
-                
-                function deleteCustomer() {
-                    if (!currentCustomerId) return;
-                    
-                    if (confirm('Are you sure you want to delete this customer? This action cannot be undone.')) {
-                        fetch(`/api/customers/${currentCustomerId}`, {
-                            method: 'DELETE'
-                        })
-                        .then(response => {
-                            if (response.ok) {
-                                alert('Customer deleted successfully');
-                                closeCustomerModal();
-                                loadCustomers(); // Refresh the customer list
-                            } else {
-                                return response.json().then(data => {
-                                    throw new Error(data.error || 'Failed to delete customer');
-                                });
-                            }
-                        })
-                        .catch(error => {
-                            console.error('Error:', error);
-                            alert('Error: ' + error.message);
-                        });
-                    }
-                }
-                
-                function addInteraction() {
-                    const type = document.getElementById('interactionType').value;
-                    const notes = document.getElementById('interactionNotes').value;
-                    
-                    if (!notes.trim()) {
-                        alert('Please enter interaction notes');
-                        return;
-                    }
-                    
-                    fetch('/api/interactions', {
-                        method: 'POST',
-                        headers: {
-                            'Content-Type': 'application/json'
-                        },
-                        body: JSON.stringify({
-                            customer_id: currentCustomerId,
-                            type: type,
-                            notes: notes
-                        })
-                    })
-                    .then(response => response.json())
-                    .then(data => {
-                        if (data.error) {
-                            alert(`Error: ${data.error}`);
-                            return;
-                        }
-                        
-                        // Clear the form
-                        document.getElementById('interactionNotes').value = '';
-                        
-                        // Reload interactions
-                        loadInteractions(currentCustomerId);
-                    })
-                    .catch(error => {
-                        alert(`Error adding interaction: ${error.message}`);
-                    });
-                }
-                
-                function openNewCustomerModal() {
-                    document.getElementById('newCustomerModal').style.display = 'block';
-                    document.getElementById('newCustomerError').textContent = '';
-                    
-                    // Clear the form
-                    document.getElementById('firstName').value = '';
-                    document.getElementById('lastName').value = '';
-                    document.getElementById('email').value = '';
-                    document.getElementById('company').value = '';
-                    document.getElementById('status').value = 'lead';
-                }
-                
-                function closeNewCustomerModal() {
-                    document.getElementById('newCustomerModal').style.display = 'none';
-                }
-                
-                function createCustomer() {
-                    const firstName = document.getElementById('firstName').value;
-                    const lastName = document.getElementById('lastName').value;
-                    const email = document.getElementById('email').value;
-                    const company = document.getElementById('company').value;
-                    const status = document.getElementById('status').value;
-                    
-                    // Simple validation
-                    if (!firstName || !lastName || !email) {
-                        document.getElementById('newCustomerError').textContent = 'Please fill in all required fields';
-                        return;
-                    }
-                    
-                    fetch('/api/customers', {
-                        method: 'POST',
-                        headers: {
-                            'Content-Type': 'application/json'
-                        },
-                        body: JSON.stringify({
-                            first_name: firstName,
-                            last_name: lastName,
-                            email: email,
-                            company: company,
-                            status: status
-                        })
-                    })
-                    .then(response => response.json())
-                    .then(data => {
-                        if (data.error) {
-                            document.getElementById('newCustomerError').textContent = data.error;
-                            return;
-                        }
-                        
-                        // Close the modal and reload customers
-                        closeNewCustomerModal();
-                        loadCustomers();
-                    })
-                    .catch(error => {
-                        document.getElementById('newCustomerError').textContent = `Error: ${error.message}`;
-                    });
-                }
-                // Function to load customers table for the Customers view
-                function loadCustomersTable() {
-                    fetch('/api/customers')
-                        .then(response => response.json())
-                        .then(data => {
-                            const tableBody = document.getElementById('customers-table-body');
-                            tableBody.innerHTML = '';
-                            
-                            if (data.error) {
-                                tableBody.innerHTML = `<tr><td colspan="6" style="text-align: center; padding: 20px;">${data.error}</td></tr>`;
-                                return;
-                            }
-                            
-                            if (data.length === 0) {
-                                tableBody.innerHTML = `<tr><td colspan="6" style="text-align: center; padding: 20px;">No customers found</td></tr>`;
-                                return;
-                            }
-                            
-                            data.forEach(customer => {
-                                const row = document.createElement('tr');
-                                row.style.borderBottom = '1px solid var(--servicenow-border)';
-                                
-                                row.innerHTML = `
-                                    <td style="padding: 10px;">${customer.first_name} ${customer.last_name}</td>
-                                    <td style="padding: 10px;">${customer.email}</td>
-                                    <td style="padding: 10px;">${customer.company || '-'}</td>
-                                    <td style="padding: 10px;"><span class="status status-${customer.status}">${customer.status}</span></td>
-                                    <td style="padding: 10px;">${new Date(customer.created_at).toLocaleDateString()}</td>
-                                    <td style="padding: 10px; text-align: center;">
-                                        <button onclick="openCustomerModal('${customer.id}')" style="background-color: transparent; color: var(--servicenow-blue); border: none; cursor: pointer;">View</button>
-                                    </td>
-                                `;
-                                
-                                tableBody.appendChild(row);
-                            });
-                        })
-                        .catch(error => {
-                            document.getElementById('customers-table-body').innerHTML = 
-                                `<tr><td colspan="6" style="text-align: center; padding: 20px;">Error loading customers: ${error.message}</td></tr>`;
-                        });
-                }
-                
-                // Function to load reports data
-                function loadReportsData() {
-                    // Load customer status counts
-                    fetch('/api/customers')
-                        .then(response => response.json())
-                        .then(data => {
-                            if (data.error) return;
-                            
-                            let prospectCount = 0;
-                            let leadCount = 0;
-                            let customerCount = 0;
-                            
-                            data.forEach(customer => {
-                                if (customer.status === 'prospect') prospectCount++;
-                                if (customer.status === 'lead') leadCount++;
-                                if (customer.status === 'customer') customerCount++;
-                            });
-                            
-                            document.getElementById('prospect-count').textContent = prospectCount;
-                            document.getElementById('lead-count').textContent = leadCount;
-                            document.getElementById('customer-count').textContent = customerCount;
-                            
-                            // Update chart heights based on counts
-                            const maxHeight = 180;
-                            const maxCount = Math.max(prospectCount, leadCount, customerCount) || 1;
-                            
-                            const prospectHeight = (prospectCount / maxCount) * maxHeight;
-                            const leadHeight = (leadCount / maxCount) * maxHeight;
-                            const customerHeight = (customerCount / maxCount) * maxHeight;
-                            
-                            document.querySelector('#main-reports .card:first-child div div:nth-child(1) div').style.height = `${prospectHeight}px`;
-                            document.querySelector('#main-reports .card:first-child div div:nth-child(2) div').style.height = `${leadHeight}px`;
-                            document.querySelector('#main-reports .card:first-child div div:nth-child(3) div').style.height = `${customerHeight}px`;
-                            
-                            // Generate top companies list
-                            const companies = {};
-                            data.forEach(customer => {
-                                if (customer.company) {
-                                    companies[customer.company] = (companies[customer.company] || 0) + 1;
-                                }
-                            });
-                            
-                            const topCompanies = Object.entries(companies)
-                                .sort((a, b) => b[1] - a[1])
-                                .slice(0, 5);
-                            
-                            const topCompaniesEl = document.getElementById('top-companies');
-                            topCompaniesEl.innerHTML = '';
-                            
-                            if (topCompanies.length === 0) {
-                                topCompaniesEl.innerHTML = '<p style="text-align: center; color: var(--servicenow-dark-gray);">No company data available</p>';
-                                return;
-                            }
-                            
-                            topCompanies.forEach(([company, count]) => {
-                                const item = document.createElement('div');
-                                item.style.padding = '10px';
-                                item.style.borderBottom = '1px solid var(--servicenow-border)';
-                                item.style.display = 'flex';
-                                item.style.justifyContent = 'space-between';
-                                
-                                item.innerHTML = `
-                                    <span>${company}</span>
-                                    <span style="font-weight: 500;">${count} customer${count > 1 ? 's' : ''}</span>
-                                `;
-                                
-                                topCompaniesEl.appendChild(item);
-                            });
-                        });
-                    
-                    // Load interaction counts
-                    let callCount = 0;
-                    let emailCount = 0;
-                    let meetingCount = 0;
-                    let recentActivity = [];
-                    
-                    // This is a simplified approach since we don't have an API endpoint for all interactions
-                    // In a real app, we would have a dedicated endpoint for this data
-                    fetch('/api/customers')
-                        .then(response => response.json())
-                        .then(customers => {
-                            if (customers.error) return;
-                            
-                            // Process each customer's interactions
-                            const promises = customers.map(customer => {
-                                return fetch(`/api/customers/${customer.id}/interactions`)
-                                    .then(response => response.json())
-                                    .then(interactions => {
-                                        if (interactions.error) return;
-                                        
-                                        interactions.forEach(interaction => {
-                                            if (interaction.type === 'call') callCount++;
-                                            if (interaction.type === 'email') emailCount++;
-                                            if (interaction.type === 'meeting') meetingCount++;
-                                            
-                                            recentActivity.push({
-                                                ...interaction,
-                                                customer: `${customer.first_name} ${customer.last_name}`
-                                            });
-                                        });
-                                    });
-                            });
-                            
-                            // When all interaction data is loaded
-                            Promise.all(promises).then(() => {
-                                document.getElementById('call-count').textContent = callCount;
-                                document.getElementById('email-count').textContent = emailCount;
-                                document.getElementById('meeting-count').textContent = meetingCount;
-                                
-                                // Update chart heights based on counts
-                                const maxHeight = 180;
-                                const maxCount = Math.max(callCount, emailCount, meetingCount) || 1;
-                                
-                                const callHeight = (callCount / maxCount) * maxHeight;
-                                const emailHeight = (emailCount / maxCount) * maxHeight;
-                                const meetingHeight = (meetingCount / maxCount) * maxHeight;
-                                
-                                document.querySelector('#main-reports .card:nth-child(2) div div:nth-child(1) div').style.height = `${callHeight}px`;
-                                document.querySelector('#main-reports .card:nth-child(2) div div:nth-child(2) div').style.height = `${emailHeight}px`;
-                                document.querySelector('#main-reports .card:nth-child(2) div div:nth-child(3) div').style.height = `${meetingHeight}px`;
-                                
-                                // Sort recent activity by date
-                                recentActivity.sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
-                                
-                                // Display recent activity
-                                const recentActivityEl = document.getElementById('recent-activity');
-                                recentActivityEl.innerHTML = '';
-                                
-                                if (recentActivity.length === 0) {
-                                    recentActivityEl.innerHTML = '<p style="text-align: center; color: var(--servicenow-dark-gray);">No recent activity</p>';
-                                    return;
-                                }
-                                
-                                recentActivity.slice(0, 10).forEach(activity => {
-                                    const item = document.createElement('div');
-                                    item.style.padding = '10px';
-                                    item.style.borderBottom = '1px solid var(--servicenow-border)';
-                                    
-                                    // Get icon based on interaction type
-                                    let icon = '📞'; // default phone icon
-                                    if (activity.type === 'email') icon = '✉️';
-                                    if (activity.type === 'meeting') icon = '👥';
-                                    
-                                    item.innerHTML = `
-                                        <div style="display: flex; align-items: flex-start;">
-                                            <div style="font-size: 18px; margin-right: 10px;">${icon}</div>
-                                            <div>
-                                                <p style="margin: 0; font-weight: 500;">${activity.customer}</p>
-                                                <p style="margin: 5px 0 0 0;">${activity.notes}</p>
-                                                <p style="margin: 5px 0 0 0; font-size: 12px; color: var(--servicenow-dark-gray);">${new Date(activity.created_at).toLocaleString()}</p>
-                                            </div>
-                                        </div>
-                                    `;
-                                    
-                                    recentActivityEl.appendChild(item);
-                                });
-                            });
-                        });
-                }
-            </script>
-        </body>
-    </html>
+            lines.append('# HELP onix_sql_duration_seconds_total Time spent executing SQL while handling requests.')
+            lines.append('# TYPE onix_sql_duration_seconds_total counter')
+            for endpoint, (_, seconds) in sorted(self.queries.items()):
+                lines.append(f'onix_sql_duration_seconds_total{{endpoint="{endpoint}"}} {seconds:.6f}')
+            
+            lines.append('# HELP onix_n_plus_one_requests_total Requests that ran more SQL statements than N_PLUS_ONE_THRESHOLD.')
+            lines.append('# TYPE onix_n_plus_one_requests_total counter')
+            for endpoint, count in sorted(self.n_plus_one.items()):
+                lines.append(f'onix_n_plus_one_requests_total{{endpoint="{endpoint}"}} {count}')
+        return lines
+    
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+            self.latency.clear()
+            self.queries.clear()
+            self.n_plus_one.clear()
+
+request_metrics = app_extension('request_metrics')
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    if has_request_context() and 'sql_count' in g:
+        g.sql_count += 1
+        g.sql_time += elapsed
+
+@event.listens_for(Engine, 'handle_error')
+def discard_query_timer(exception_context):
+    # after_cursor_execute does not run for a failed statement, so drop its start time here
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_start'):
+        connection.info['query_start'].pop()
+
+@bp.before_app_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.sql_count = 0
+    g.sql_time = 0.0
+
+@bp.after_app_request
+def record_request_metrics(response):
+    if 'request_start' not in g:
+        return response
+    
+    duration = time.perf_counter() - g.request_start
+    # Label by view name, without the blueprint prefix
+    endpoint = request.endpoint.rpartition('.')[2] if request.endpoint else 'unmatched'
+    n_plus_one = g.sql_count > current_app.config['N_PLUS_ONE_THRESHOLD']
+    if n_plus_one:
+        current_app.logger.warning(
+            "Possible N+1 query pattern: %s %s ran %d SQL statements",
+            request.method, request.path, g.sql_count
+        )
+    
+    request_metrics.observe(
+        request.method, endpoint, response.status_code, duration, g.sql_count, g.sql_time, n_plus_one
+    )
+    response.headers['Server-Timing'] = (
+        f'app;dur={duration * 1000:.2f}, '
+        f'db;dur={g.sql_time * 1000:.2f};desc="{g.sql_count} queries"'
+    )
+    return response
+
+@bp.route('/metrics', methods=['GET'])
+def metrics():
+    lines = request_metrics.render()
+    
+    caches = [('customers', customer_cache.stats())]
+    if response_cache.backend is not None:
+        caches.append(('responses', response_cache.stats()))
+    for counter in ('hits', 'misses'):
+        lines.append(f'# HELP onix_cache_{counter}_total Cache {counter} by cache.')
+        lines.append(f'# TYPE onix_cache_{counter}_total counter')
+        for name, stats in caches:
+            lines.append(f'onix_cache_{counter}_total{{cache="{name}"}} {stats[counter]}')
+    
+    webhook_stats = webhook_dispatcher.stats()
+    lines.append('# HELP onix_webhook_events_delivered_total Events delivered to webhook endpoints.')
+    lines.append('# TYPE onix_webhook_events_delivered_total counter')
+    lines.append(f"onix_webhook_events_delivered_total {webhook_stats['delivered']}")
+    lines.append('# HELP onix_webhook_delivery_failures_total Webhook batches that failed and were scheduled for retry.')
+    lines.append('# TYPE onix_webhook_delivery_failures_total counter')
+    lines.append(f"onix_webhook_delivery_failures_total {webhook_stats['failed']}")
+    
+    writer_stats = interaction_writer.stats()
+    lines.append('# HELP onix_write_behind_queued Interactions waiting for the background writer.')
+    lines.append('# TYPE onix_write_behind_queued gauge')
+    lines.append(f"onix_write_behind_queued {writer_stats['queued']}")
+    for counter, description in (
+        ('written', 'Queued interactions committed by the background writer.'),
+        ('failed', 'Queued interactions dropped after a failed write.'),
+        ('batches', 'Group commits by the background writer.'),
+    ):
+        lines.append(f'# HELP onix_write_behind_{counter}_total {description}')
+        lines.append(f'# TYPE onix_write_behind_{counter}_total counter')
+        lines.append(f'onix_write_behind_{counter}_total {writer_stats[counter]}')
+    
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+# Compress larger JSON and HTML responses for clients that accept gzip
+COMPRESS_MIN_SIZE = 1024  # bytes
+COMPRESS_MIMETYPES = {'application/json', 'text/html'}
+
+@bp.after_app_request
+def compress_response(response):
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in COMPRESS_MIMETYPES
+        or not request.accept_encodings['gzip']
+    ):
+        return response
+    
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+    
+    response.set_data(gzip.compress(body, compresslevel=6))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+# In-process customer cache
+class LRUCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds"""
+    
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+    
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl
+            }
+
+# Customer dicts by id. Only existing customers are cached; write routes
+# invalidate after committing and the TTL bounds staleness from other workers.
+# On routes that send validators, entries are also keyed by the shared
+# customer table version that @conditional read, so a body served under an
+# ETag is never older than that ETag, whichever worker made the last write.
+customer_cache = app_extension('customer_cache')
+
+def customer_cache_key(customer_id):
+    versions = g.get('table_versions', {}) if has_request_context() else {}
+    return (customer_id, versions.get('customer'))
+
+def get_customer_dict(customer_id):
+    """Return a customer as a dict (treat it as read-only), or None if it does not exist"""
+    key = customer_cache_key(customer_id)
+    data = customer_cache.get(key)
+    if data is not None:
+        return data
+    
+    customer = Customer.query.get(customer_id)
+    if not customer:
+        return None
+    data = customer.to_dict()
+    customer_cache.set(key, data)
+    return data
+
+# Shared response cache. Entries are keyed by a namespace version that
+# write endpoints bump, so stale entries are simply never read again.
+class MemoryCacheBackend:
+    """Response cache private to one worker process"""
+    
+    def __init__(self, maxsize, ttl):
+        self._entries = LRUCache(maxsize, ttl)
+        self._versions = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        return self._entries.get(key)
+    
+    def set(self, key, value):
+        self._entries.set(key, value)
+    
+    def version(self, namespace):
+        with self._lock:
+            return self._versions.get(namespace, 0)
+    
+    def bump(self, namespace):
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+    
+    def clear(self):
+        self._entries.clear()
+        with self._lock:
+            self._versions.clear()
+    
+    def stats(self):
+        return dict(self._entries.stats(), backend='memory')
+
+class SQLiteCacheBackend:
+    """Response cache in a SQLite file shared by every worker process on the host"""
+    
+    PURGE_EVERY = 100  # sets between purges of expired entries
+    
+    def __init__(self, path, ttl):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._sets = 0
+        self._local = threading.local()
+        connection = self._connection()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS cache_entry (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)'
+        )
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS cache_version (namespace TEXT PRIMARY KEY, version INTEGER NOT NULL)'
+        )
+    
+    def _connection(self):
+        # One connection per thread, reopened after a fork so workers never
+        # share a connection inherited from the master process
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            apply_sqlite_pragmas(connection, {'journal_mode': 'WAL', 'synchronous': 'NORMAL'})
+            self._local.connection = connection
+            self._local.pid = pid
+        return self._local.connection
+    
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT value FROM cache_entry WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+    
+    def set(self, key, value):
+        connection = self._connection()
+        connection.execute(
+            'INSERT OR REPLACE INTO cache_entry (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, value, time.time() + self.ttl)
+        )
+        self._sets += 1
+        if self._sets % self.PURGE_EVERY == 0:
+            connection.execute('DELETE FROM cache_entry WHERE expires_at <= ?', (time.time(),))
+    
+    def version(self, namespace):
+        row = self._connection().execute(
+            'SELECT version FROM cache_version WHERE namespace = ?', (namespace,)
+        ).fetchone()
+        return row[0] if row else 0
+    
+    def bump(self, namespace):
+        self._connection().execute(
+            'INSERT INTO cache_version (namespace, version) VALUES (?, 1) '
+            'ON CONFLICT (namespace) DO UPDATE SET version = version + 1',
+            (namespace,)
+        )
+    
+    def clear(self):
+        connection = self._connection()
+        connection.execute('DELETE FROM cache_entry')
+        connection.execute('DELETE FROM cache_version')
+    
+    def stats(self):
+        size = self._connection().execute('SELECT COUNT(*) FROM cache_entry').fetchone()[0]
+        return {'backend': 'sqlite', 'hits': self.hits, 'misses': self.misses, 'size': size, 'ttl': self.ttl}
+
+def create_response_cache(config):
+    backend = config['RESPONSE_CACHE_BACKEND']
+    if backend == 'none':
+        return None
+    if backend == 'memory':
+        return MemoryCacheBackend(config['RESPONSE_CACHE_SIZE'], config['RESPONSE_CACHE_TTL'])
+    if backend == 'sqlite':
+        return SQLiteCacheBackend(config['RESPONSE_CACHE_PATH'], config['RESPONSE_CACHE_TTL'])
+    raise ValueError(f"Unknown response cache backend: {backend}")
+
+class ResponseCache:
+    """An app's response cache, using the backend chosen by its config"""
+    
+    def __init__(self, app):
+        self.backend = create_response_cache(app.config)
+    
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+response_cache = app_extension('response_cache')
+
+def cached_response(namespace):
+    """Cache successful JSON responses of a GET view under a versioned namespace.
+    
+    namespace may reference the view's URL arguments, e.g. 'customer:{customer_id}'.
+    Namespace versions are bumped by this worker's writes only, so under
+    @conditional the key also carries the shared table versions it read, and
+    a write made by any worker retires the entry.
     """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if response_cache.backend is None:
+                return view(*args, **kwargs)
+            
+            resolved = namespace.format(**kwargs)
+            tables = ','.join(f"{name}{version}" for name, version in sorted(g.get('table_versions', {}).items()))
+            key = f"{resolved}:v{response_cache.version(resolved)}:t{tables}:{request.full_path}"
+            body = response_cache.get(key)
+            if body is not None:
+                return current_app.response_class(body, mimetype='application/json')
+            
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and response.mimetype == 'application/json':
+                response_cache.set(key, response.get_data())
+            return response
+        return wrapper
+    return decorator
+
+def invalidate_responses(*namespaces):
+    """Bump namespace versions after a write has committed"""
+    if response_cache.backend is None:
+        return
+    for namespace in namespaces:
+        response_cache.bump(namespace)
+
+# Change notifications. /api/events and the webhook dispatcher read the
+# durable change_log, which every worker shares; write routes notify after
+# their commit so that this process's readers look at it straight away
+# instead of waiting for their next poll.
+class ChangeNotifier:
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._last_seq = 0
+    
+    def notify(self):
+        with self._condition:
+            self._last_seq += 1
+            self._condition.notify_all()
+    
+    @property
+    def last_seq(self):
+        with self._condition:
+            return self._last_seq
+    
+    def wait(self, seq, timeout):
+        """Wait up to timeout seconds for a notification after seq"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._last_seq > seq, timeout)
+
+change_events = ChangeNotifier()
 
 # API Endpoints
 
+def conditional(*tables):
+    """Answer GET requests with 304 Not Modified while the given tables are unchanged.
+    
+    The validators come from the table_version counters, so a matching
+    If-None-Match or If-Modified-Since costs one primary key lookup and the
+    view is not run at all.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = TableVersion.query.filter(TableVersion.name.in_(tables)).order_by(TableVersion.name).all()
+            if len(versions) != len(tables):
+                return view(*args, **kwargs)
+            # Shared across workers, so caches can key on them (see get_customer_dict)
+            g.table_versions = {v.name: v.version for v in versions}
+            
+            fingerprint = '|'.join([request.full_path] + [f"{v.name}:{v.version}" for v in versions])
+            etag = hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+            last_modified = max(v.updated_at for v in versions)
+            # Last-Modified has one-second resolution, so until the second of
+            # the latest write is over, another write could land in it unseen.
+            # Until then only the ETag is sent and trusted.
+            last_modified_final = last_modified.replace(microsecond=0) + timedelta(seconds=1) <= datetime.utcnow()
+            
+            # If-None-Match takes precedence over If-Modified-Since (RFC 9110, section 13.2.2)
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            elif request.if_modified_since and last_modified_final:
+                not_modified = last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+            else:
+                not_modified = False
+            
+            if not_modified:
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            
+            response.set_etag(etag, weak=True)
+            if last_modified_final:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
 # Customer endpoints
-@app.route('/api/customers', methods=['GET'])
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+CUSTOMER_FIELDS = ['id', 'first_name', 'last_name', 'email', 'company', 'status', 'created_at', 'updated_at']
+CUSTOMER_SORT_FIELDS = ['created_at', 'updated_at', 'first_name', 'last_name', 'email', 'company', 'status']
+CUSTOMER_DATETIME_FIELDS = {'created_at', 'updated_at'}
+# NULLs never satisfy a keyset comparison, so these sort as ''
+CUSTOMER_NULLABLE_SORT_FIELDS = {'company', 'status'}
+INTERACTION_FIELDS = ['id', 'customer_id', 'type', 'notes', 'created_at']
+
+def encode_cursor(sort, value, customer_id):
+    """Encode the position of a customer in a sort order as an opaque cursor"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, customer_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor, sort):
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        cursor_sort, value, customer_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if sort.lstrip('-') in CUSTOMER_DATETIME_FIELDS:
+            value = datetime.fromisoformat(value)
+    except (TypeError, ValueError, UnicodeError, binascii.Error):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort:
+        raise ValueError("Cursor does not match the requested sort")
+    # The values go straight into the keyset comparison, so only scalars are accepted
+    nullable = sort.lstrip('-') in CUSTOMER_NULLABLE_SORT_FIELDS
+    if not (isinstance(value, (str, int, float, datetime)) or (value is None and nullable)):
+        raise ValueError("Invalid cursor")
+    if not isinstance(customer_id, str):
+        raise ValueError("Invalid cursor")
+    return value, customer_id
+
+# Serialisation for list endpoints. Rows come from Core select()s that
+# have SQLite format datetime columns as ISO 8601 text, so no ORM objects
+# or datetime values are built and rows go straight to the JSON encoder.
+LIST_FORMATS = ['objects', 'columnar']
+
+def json_response(data, status=200):
+    """Encode data with orjson when it is installed, or the stdlib encoder otherwise"""
+    if orjson is not None:
+        body = orjson.dumps(data)
+    else:
+        body = json.dumps(data, separators=(',', ':'))
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+def datetime_text(column):
+    """Select a DateTime column as the text datetime.isoformat() would give.
+    
+    SQLAlchemy stores SQLite datetimes as '2024-01-01 09:30:00.000000', so
+    dropping a zero fraction and the space separator is all that is needed,
+    and SQLite does it for the whole result set.
+    """
+    return db.func.replace(db.func.replace(column, '.000000', ''), ' ', 'T').label(column.name)
+
+def serialize_rows(rows, fields, columnar=False):
+    """Serialise the leading `fields` of each row as dicts, or as one array per field if columnar"""
+    if columnar:
+        return dict(zip(fields, list(zip(*rows)) or [()] * len(fields)))
+    return [dict(zip(fields, row)) for row in rows]
+
+def list_format(args):
+    """Return whether the list should be columnar, raising ValueError for an unknown format"""
+    value = args.get('format', 'objects')
+    if value not in LIST_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(LIST_FORMATS)}")
+    return value == 'columnar'
+
+def build_customer_list_query(args):
+    """Build the column query for the customer list from filter, sort and fields parameters"""
+    fields = CUSTOMER_FIELDS
+    if args.get('fields'):
+        fields = [field.strip() for field in args['fields'].split(',') if field.strip()]
+        unknown = [field for field in fields if field not in CUSTOMER_FIELDS]
+        if unknown or not fields:
+            raise ValueError(f"fields must be a comma-separated subset of {', '.join(CUSTOMER_FIELDS)}")
+    
+    sort = args.get('sort', 'created_at')
+    sort_field = sort.lstrip('-')
+    if sort_field not in CUSTOMER_SORT_FIELDS or sort.count('-') > 1:
+        raise ValueError(f"sort must be one of {', '.join(CUSTOMER_SORT_FIELDS)}, optionally prefixed with -")
+    
+    # The id and sort columns are always needed to build the next cursor
+    selected = fields + [field for field in ('id', sort_field) if field not in fields]
+    columns = Customer.__table__.c
+    query = db.select(*[
+        datetime_text(columns[field]) if field in CUSTOMER_DATETIME_FIELDS else columns[field]
+        for field in selected
+    ])
+    
+    if args.get('status'):
+        query = query.where(Customer.status.in_(args['status'].split(',')))
+    if args.get('company'):
+        query = query.where(Customer.company == args['company'])
+    if args.get('created_after'):
+        try:
+            created_after = datetime.fromisoformat(args['created_after'])
+        except ValueError:
+            raise ValueError("created_after must be an ISO 8601 datetime")
+        query = query.where(Customer.created_at > created_after)
+    
+    return query, fields, sort
+
+def customer_sort_column(sort_field):
+    column = getattr(Customer, sort_field)
+    if sort_field in CUSTOMER_NULLABLE_SORT_FIELDS:
+        return db.func.coalesce(column, '')
+    return column
+
+@bp.route('/api/customers', methods=['GET'])
+@conditional('customer')
+@cached_response('customers')
 def get_customers():
     try:
-        customers = Customer.query.all()
-        return jsonify([customer.to_dict() for customer in customers])
+        try:
+            query, fields, sort = build_customer_list_query(request.args)
+            columnar = list_format(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        sort_field = sort.lstrip('-')
+        descending = sort.startswith('-')
+        sort_column = customer_sort_column(sort_field)
+        if descending:
+            query = query.order_by(sort_column.desc(), Customer.id.desc())
+        else:
+            query = query.order_by(sort_column, Customer.id)
+        
+        # The full unpaginated list is only returned when explicitly requested
+        if request.args.get('all', 'false').lower() == 'true':
+            rows = db.session.execute(query).all()
+            return json_response(serialize_rows(rows, fields, columnar))
+        
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        if limit < 1 or limit > MAX_PAGE_SIZE:
+            return jsonify({"error": f"limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+        
+        after = request.args.get('after')
+        if after:
+            try:
+                after_value, after_id = decode_cursor(after, sort)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            if descending:
+                query = query.where(db.or_(
+                    sort_column < after_value,
+                    db.and_(sort_column == after_value, Customer.id < after_id)
+                ))
+            else:
+                query = query.where(db.or_(
+                    sort_column > after_value,
+                    db.and_(sort_column == after_value, Customer.id > after_id)
+                ))
+        
+        # Fetch one extra row to find out whether another page exists
+        rows = db.session.execute(query.limit(limit + 1)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        next_cursor = None
+        if has_more:
+            last_value = getattr(rows[-1], sort_field)
+            if sort_field in CUSTOMER_NULLABLE_SORT_FIELDS and last_value is None:
+                last_value = ''
+            next_cursor = encode_cursor(sort, last_value, rows[-1].id)
+        
+        return json_response({
+            'customers': serialize_rows(rows, fields, columnar),
+            'next_cursor': next_cursor
+        })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/customers/<customer_id>', methods=['GET'])
+@bp.route('/api/customers/<customer_id>', methods=['GET'])
+@conditional('customer', 'interaction')
+@cached_response('customer:{customer_id}')
 def get_customer(customer_id):
     try:
-        customer = Customer.query.get(customer_id)
-        if not customer:
+        include = [name for name in request.args.get('include', '').split(',') if name]
+        if any(name != 'interactions' for name in include):
+            return jsonify({"error": "include only supports interactions"}), 400
+        
+        if not include:
+            customer = get_customer_dict(customer_id)
+            if not customer:
+                return jsonify({"error": "Customer not found"}), 404
+            return jsonify(customer)
+        
+        interactions_limit = request.args.get('interactions_limit', type=int)
+        if interactions_limit is not None and interactions_limit < 1:
+            return jsonify({"error": "interactions_limit must be a positive integer"}), 400
+        
+        # Load the customer and its latest interactions in one outer-joined query
+        query = (
+            db.session.query(Customer, Interaction)
+            .outerjoin(Interaction, Interaction.customer_id == Customer.id)
+            .filter(Customer.id == customer_id)
+            .order_by(Interaction.created_at.desc())
+        )
+        if interactions_limit is not None:
+            query = query.limit(interactions_limit)
+        rows = query.all()
+        
+        if not rows:
             return jsonify({"error": "Customer not found"}), 404
-        return jsonify(customer.to_dict())
+        
+        result = rows[0][0].to_dict()
+        result['interactions'] = [interaction.to_dict() for _, interaction in rows if interaction is not None]
+        return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/customers', methods=['POST'])
+@bp.route('/api/customers', methods=['POST'])
 def create_customer():
     try:
         data = request.get_json()
@@ -1244,12 +1534,147 @@ def create_customer():
         db.session.add(new_customer)
         db.session.commit()
         
-        return jsonify(new_customer.to_dict()), 201
+        customer_data = new_customer.to_dict()
+        customer_cache.set(customer_cache_key(new_customer.id), customer_data)
+        invalidate_responses('customers', 'reports')
+        change_events.notify()
+        return jsonify(customer_data), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+BULK_CHUNK_SIZE = 500
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+def iter_bulk_items():
+    """Yield (index, item, error) for each record of a JSON array or NDJSON request body"""
+    if request.mimetype in NDJSON_MIMETYPES:
+        index = 0
+        for line in request.stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield index, json.loads(line), None
+            except ValueError as e:
+                yield index, None, f"Invalid JSON: {e}"
+            index += 1
+        return
+    
+    items = request.get_json(silent=True)
+    if not isinstance(items, list):
+        raise ValueError("Request body must be a JSON array or NDJSON stream")
+    for index, item in enumerate(items):
+        yield index, item, None
+
+def chunked(iterable, size):
+    """Yield lists of up to size items from iterable"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def import_customer_chunk(chunk, seen_emails):
+    """Validate and insert one chunk of bulk customer records in a single transaction"""
+    results = {}
+    candidates = []
+    
+    for index, data, error in chunk:
+        if error is None and not isinstance(data, dict):
+            error = "Each record must be a JSON object"
+        if error is None:
+            for field in ['first_name', 'last_name', 'email']:
+                if field not in data or not data[field]:
+                    error = f"{field} is required"
+                    break
+                if not isinstance(data[field], str):
+                    error = f"{field} must be a string"
+                    break
+        if error is None and data['email'] in seen_emails:
+            error = "Duplicate email in import"
+        if error is not None:
+            results[index] = {'index': index, 'status': 'error', 'error': error}
+            continue
+        seen_emails.add(data['email'])
+        candidates.append((index, data))
+    
+    # One IN query checks uniqueness for the whole chunk
+    emails = [data['email'] for _, data in candidates]
+    existing = {
+        email for (email,) in
+        db.session.query(Customer.email).filter(Customer.email.in_(emails))
+    } if emails else set()
+    
+    now = datetime.utcnow()
+    rows = []
+    for index, data in candidates:
+        if data['email'] in existing:
+            results[index] = {'index': index, 'status': 'error', 'error': "A customer with this email already exists"}
+            continue
+        row = {
+            'id': str(uuid.uuid4()),
+            'first_name': data['first_name'],
+            'last_name': data['last_name'],
+            'email': data['email'],
+            'company': data.get('company', ''),
+            'status': data.get('status', 'lead'),
+            'created_at': now,
+            'updated_at': now
+        }
+        rows.append((index, row))
+    
+    if rows:
+        try:
+            db.session.execute(Customer.__table__.insert(), [row for _, row in rows])
+            db.session.commit()
+            for index, row in rows:
+                results[index] = {'index': index, 'status': 'created', 'id': row['id']}
+        except Exception:
+            # Something in the chunk conflicted (e.g. a concurrent insert),
+            # so fall back to row-by-row inserts to report each failure
+            db.session.rollback()
+            for index, row in rows:
+                try:
+                    db.session.execute(Customer.__table__.insert(), row)
+                    db.session.commit()
+                    results[index] = {'index': index, 'status': 'created', 'id': row['id']}
+                except Exception as e:
+                    db.session.rollback()
+                    results[index] = {'index': index, 'status': 'error', 'error': str(e)}
+    
+    if any(results[index]['status'] == 'created' for index, _ in rows):
+        change_events.notify()
+    
+    return [results[index] for index, _, _ in chunk]
+
+@bp.route('/api/customers/bulk', methods=['POST'])
+def bulk_create_customers():
+    try:
+        results = []
+        seen_emails = set()
+        try:
+            for chunk in chunked(iter_bulk_items(), BULK_CHUNK_SIZE):
+                results.extend(import_customer_chunk(chunk, seen_emails))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        created = sum(1 for result in results if result['status'] == 'created')
+        if created:
+            invalidate_responses('customers', 'reports')
+        return jsonify({
+            'created': created,
+            'failed': len(results) - created,
+            'results': results
+        })
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/customers/<customer_id>', methods=['PUT'])
+@bp.route('/api/customers/<customer_id>', methods=['PUT'])
 def update_customer(customer_id):
     try:
         customer = Customer.query.get(customer_id)
@@ -1276,13 +1701,17 @@ def update_customer(customer_id):
         
         customer.updated_at = datetime.utcnow()
         db.session.commit()
+        customer_cache.invalidate(customer_cache_key(customer_id))
+        invalidate_responses('customers', f'customer:{customer_id}', 'reports')
         
-        return jsonify(customer.to_dict())
+        change_events.notify()
+        customer_data = customer.to_dict()
+        return jsonify(customer_data)
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/customers/<customer_id>', methods=['DELETE'])
+@bp.route('/api/customers/<customer_id>', methods=['DELETE'])
 def delete_customer(customer_id):
     try:
         customer = Customer.query.get(customer_id)
@@ -1294,6 +1723,9 @@ def delete_customer(customer_id):
         
         db.session.delete(customer)
         db.session.commit()
+        customer_cache.invalidate(customer_cache_key(customer_id))
+        invalidate_responses('customers', f'customer:{customer_id}', 'reports')
+        change_events.notify()
         
         return jsonify({"message": "Customer deleted successfully"})
     except Exception as e:
@@ -1301,20 +1733,175 @@ def delete_customer(customer_id):
         return jsonify({"error": str(e)}), 500
 
 # Interaction endpoints
-@app.route('/api/customers/<customer_id>/interactions', methods=['GET'])
+@bp.route('/api/customers/<customer_id>/interactions', methods=['GET'])
+@conditional('customer', 'interaction')
+@cached_response('customer:{customer_id}')
 def get_customer_interactions(customer_id):
     try:
-        # Check if customer exists
-        customer = Customer.query.get(customer_id)
-        if not customer:
+        try:
+            columnar = list_format(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        columns = Interaction.__table__.c
+        rows = db.session.execute(
+            db.select(columns.id, columns.customer_id, columns.type, columns.notes, datetime_text(columns.created_at))
+            .where(columns.customer_id == customer_id)
+            .order_by(columns.created_at.desc())
+        ).all()
+        
+        # Only an empty result needs the extra query to tell a customer
+        # without interactions apart from a missing customer
+        if not rows and not get_customer_dict(customer_id):
             return jsonify({"error": "Customer not found"}), 404
         
-        interactions = Interaction.query.filter_by(customer_id=customer_id).order_by(Interaction.created_at.desc()).all()
-        return jsonify([interaction.to_dict() for interaction in interactions])
+        return json_response(serialize_rows(rows, INTERACTION_FIELDS, columnar))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/interactions', methods=['POST'])
+class InteractionWriter:
+    """Background thread that group-commits queued interactions.
+    
+    A batch is written in one transaction once WRITE_BEHIND_BATCH_SIZE rows
+    are queued or WRITE_BEHIND_FLUSH_MS has passed since its first row,
+    whichever comes first. The writer starts on first use, and again in a
+    forked worker, since threads do not survive a fork.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+        self._queue = queue.Queue(maxsize=app.config['WRITE_BEHIND_QUEUE_SIZE'])
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+    
+    def submit(self, row):
+        """Queue an interaction row and return a Future resolved once it is committed"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((row, future))  # blocks while the queue is full
+        return future
+    
+    def flush(self):
+        """Block until every row queued so far has been written"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+    
+    def stop(self, timeout=30):
+        """Write the remaining rows and stop the writer thread"""
+        with self._lock:
+            thread = self._thread
+            if thread is None or not thread.is_alive() or self._pid != os.getpid():
+                return
+            self._queue.put(None)
+        thread.join(timeout)
+    
+    def stats(self):
+        return {
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'failed': self.failed,
+            'batches': self.batches
+        }
+    
+    def _ensure_started(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.app.config['WRITE_BEHIND_QUEUE_SIZE'])
+            elif self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='interaction-writer', daemon=True)
+            self._thread.start()
+    
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            
+            batch = [item]
+            batch_size = self.app.config['WRITE_BEHIND_BATCH_SIZE']
+            deadline = time.monotonic() + self.app.config['WRITE_BEHIND_FLUSH_MS'] / 1000
+            while len(batch) < batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            try:
+                self._write(batch)
+            except Exception as e:
+                # Keep the writer alive; fail whatever the batch left unresolved
+                self.app.logger.error("Interaction writer batch failed: %s", e)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for _ in range(len(batch) + stopping):
+                    self._queue.task_done()
+    
+    def _write(self, batch):
+        rows = [row for row, _ in batch]
+        try:
+            with self.app.app_context():
+                try:
+                    db.session.execute(Interaction.__table__.insert(), rows)
+                    db.session.commit()
+                    errors = [None] * len(rows)
+                except Exception:
+                    # A customer was deleted after its row was queued, so
+                    # retry row by row to keep the rest of the batch
+                    db.session.rollback()
+                    errors = []
+                    for row in rows:
+                        try:
+                            db.session.execute(Interaction.__table__.insert(), row)
+                            db.session.commit()
+                            errors.append(None)
+                        except Exception as e:
+                            db.session.rollback()
+                            errors.append(e)
+        except Exception as e:
+            errors = [e] * len(rows)
+        
+        self.batches += 1
+        
+        # Resolve the futures first, so waiting requests never depend on the
+        # cache invalidation and change notification below
+        for (row, future), error in zip(batch, errors):
+            if error is None:
+                self.written += 1
+                future.set_result(row)
+            else:
+                self.failed += 1
+                self.app.logger.error("Dropped queued interaction %s: %s", row['id'], error)
+                future.set_exception(error)
+        
+        written = [row for row, error in zip(rows, errors) if error is None]
+        try:
+            if written:
+                with self.app.app_context():
+                    invalidate_responses(*{f"customer:{row['customer_id']}" for row in written}, 'reports')
+                change_events.notify()
+        except Exception as e:
+            self.app.logger.error("Post-commit work for %d queued interactions failed: %s", len(written), e)
+
+interaction_writer = app_extension('interaction_writer')
+
+@bp.route('/api/interactions', methods=['POST'])
 def create_interaction():
     try:
         data = request.get_json()
@@ -1326,10 +1913,27 @@ def create_interaction():
                 return jsonify({"error": f"{field} is required"}), 400
         
         # Check if customer exists
-        customer = Customer.query.get(data['customer_id'])
-        if not customer:
+        if not get_customer_dict(data['customer_id']):
             return jsonify({"error": "Customer not found"}), 404
         
+        write_mode = current_app.config['INTERACTION_WRITE_MODE']
+        if write_mode != 'direct':
+            row = {
+                'id': str(uuid.uuid4()),
+                'customer_id': data['customer_id'],
+                'type': data['type'],
+                'notes': data['notes'],
+                'created_at': datetime.utcnow()
+            }
+            future = interaction_writer.submit(row)
+            if write_mode == 'async':
+                return jsonify(Interaction(**row).to_dict()), 202
+            try:
+                future.result(timeout=current_app.config['WRITE_BEHIND_TIMEOUT'])
+            except FutureTimeoutError:
+                return jsonify({"error": "Timed out waiting for the interaction to be written"}), 503
+            return jsonify(Interaction(**row).to_dict()), 201
+        
         # Create new interaction
         new_interaction = Interaction(
             id=str(uuid.uuid4()),
@@ -1340,11 +1944,758 @@ def create_interaction():
         
         db.session.add(new_interaction)
         db.session.commit()
+        invalidate_responses(f"customer:{data['customer_id']}", 'reports')
         
-        return jsonify(new_interaction.to_dict()), 201
+        change_events.notify()
+        interaction_data = new_interaction.to_dict()
+        return jsonify(interaction_data), 201
+    except IntegrityError:
+        # The cache still had a customer that another worker deleted
+        db.session.rollback()
+        customer_cache.invalidate(customer_cache_key(data['customer_id']))
+        return jsonify({"error": "Customer not found"}), 404
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
+def import_interaction_chunk(chunk):
+    """Validate and insert one chunk of batch interaction records in a single transaction"""
+    results = {}
+    candidates = []
+
+    for index, data, error in chunk:
+        if error is None and not isinstance(data, dict):
+            error = "Each record must be a JSON object"
+        if error is None:
+            for field in ['customer_id', 'type', 'notes']:
+                if field not in data or not data[field]:
+                    error = f"{field} is required"
+                    break
+                if not isinstance(data[field], str):
+                    error = f"{field} must be a string"
+                    break
+        if error is not None:
+            results[index] = {'index': index, 'status': 'error', 'error': error}
+            continue
+        candidates.append((index, data))
+
+    # One IN query checks every referenced customer in the chunk
+    customer_ids = {data['customer_id'] for _, data in candidates}
+    existing = {
+        customer_id for (customer_id,) in
+        db.session.query(Customer.id).filter(Customer.id.in_(customer_ids))
+    } if customer_ids else set()
+
+    now = datetime.utcnow()
+    rows = []
+    for index, data in candidates:
+        if data['customer_id'] not in existing:
+            results[index] = {'index': index, 'status': 'error', 'error': "Customer not found"}
+            continue
+        row = {
+            'id': str(uuid.uuid4()),
+            'customer_id': data['customer_id'],
+            'type': data['type'],
+            'notes': data['notes'],
+            'created_at': now
+        }
+        rows.append((index, row))
+
+    if rows:
+        try:
+            db.session.execute(Interaction.__table__.insert(), [row for _, row in rows])
+            db.session.commit()
+            for index, row in rows:
+                results[index] = {'index': index, 'status': 'created', 'id': row['id']}
+        except Exception:
+            # A customer was deleted between the check and the insert, so
+            # fall back to row-by-row inserts to report each failure
+            db.session.rollback()
+            for index, row in rows:
+                try:
+                    db.session.execute(Interaction.__table__.insert(), row)
+                    db.session.commit()
+                    results[index] = {'index': index, 'status': 'created', 'id': row['id']}
+                except IntegrityError:
+                    db.session.rollback()
+                    results[index] = {'index': index, 'status': 'error', 'error': "Customer not found"}
+                except Exception as e:
+                    db.session.rollback()
+                    results[index] = {'index': index, 'status': 'error', 'error': str(e)}
+
+    created_for = set()
+    for index, row in rows:
+        if results[index]['status'] == 'created':
+            created_for.add(row['customer_id'])
+    if created_for:
+        change_events.notify()
+    return [results[index] for index, _, _ in chunk], created_for
+
+@bp.route('/api/interactions/batch', methods=['POST'])
+def batch_create_interactions():
+    try:
+        results = []
+        customer_ids = set()
+        try:
+            for chunk in chunked(iter_bulk_items(), BULK_CHUNK_SIZE):
+                chunk_results, created_for = import_interaction_chunk(chunk)
+                results.extend(chunk_results)
+                customer_ids |= created_for
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        created = sum(1 for result in results if result['status'] == 'created')
+        if created:
+            invalidate_responses(*(f'customer:{customer_id}' for customer_id in customer_ids), 'reports')
+        return jsonify({
+            'created': created,
+            'failed': len(results) - created,
+            'results': results
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+# Change log endpoints
+CHANGES_DEFAULT_LIMIT = 100
+CHANGES_MAX_LIMIT = 1000
+
+@bp.route('/api/changes', methods=['GET'])
+def get_changes():
+    try:
+        since = request.args.get('since', 0, type=int)
+        limit = request.args.get('limit', CHANGES_DEFAULT_LIMIT, type=int)
+        if limit < 1 or limit > CHANGES_MAX_LIMIT:
+            return jsonify({"error": f"limit must be between 1 and {CHANGES_MAX_LIMIT}"}), 400
+        
+        # Fetch one extra row to find out whether more changes are waiting
+        changes = ChangeLog.query.filter(ChangeLog.seq > since).order_by(ChangeLog.seq).limit(limit + 1).all()
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        
+        return jsonify({
+            'changes': [change.to_dict() for change in changes],
+            'next_since': changes[-1].seq if changes else since,
+            'has_more': has_more
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Event endpoints
+EVENT_BATCH_SIZE = 500  # change_log rows read per poll
+CHANGE_EVENT_SUFFIXES = {'insert': 'created', 'update': 'updated', 'delete': 'deleted'}
+
+@bp.route('/api/events', methods=['GET'])
+def stream_events():
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id') or ''
+    heartbeat = current_app.config['EVENT_HEARTBEAT']
+    poll_interval = min(current_app.config['EVENT_POLL_INTERVAL'], heartbeat)
+    latest_seq = db.session.query(db.func.max(ChangeLog.seq)).scalar() or 0
+    
+    def generate():
+        yield 'retry: 3000\n\n'
+        seq = int(last_event_id) if last_event_id.isdigit() else None
+        if seq is None or seq > latest_seq:
+            if last_event_id:
+                # The id is not a change_log seq of this database, so the client must reload
+                yield f"id: {latest_seq}\nevent: reset\ndata: {{}}\n\n"
+            seq = latest_seq
+        
+        idle_since = time.monotonic()
+        while True:
+            seen = change_events.last_seq
+            changes = (
+                ChangeLog.query.filter(ChangeLog.seq > seq)
+                .order_by(ChangeLog.seq)
+                .limit(EVENT_BATCH_SIZE)
+                .all()
+            )
+            db.session.rollback()  # end the read so the next poll sees newer commits
+            for change in changes:
+                event_type = f"{change.table_name}.{CHANGE_EVENT_SUFFIXES[change.operation]}"
+                yield f"id: {change.seq}\nevent: {event_type}\ndata: {change.data or '{}'}\n\n"
+            if changes:
+                seq = changes[-1].seq
+                idle_since = time.monotonic()
+                if len(changes) == EVENT_BATCH_SIZE:
+                    continue
+            elif time.monotonic() - idle_since >= heartbeat:
+                yield ': keep-alive\n\n'
+                idle_since = time.monotonic()
+            # Writes in this process wake the stream at once; other workers' are found by polling
+            change_events.wait(seen, poll_interval)
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    return response
+
+# Webhooks
+WEBHOOK_EVENTS = [
+    'customer.created', 'customer.updated', 'customer.deleted',
+    'interaction.created', 'interaction.updated', 'interaction.deleted',
+]
+
+def change_event(change):
+    """Shape a change_log row as a webhook event"""
+    return {
+        'id': change.seq,
+        'type': f"{change.table_name}.{CHANGE_EVENT_SUFFIXES[change.operation]}",
+        'data': json.loads(change.data) if change.data else None,
+        'occurred_at': change.changed_at.isoformat()
+    }
+
+def webhook_retry_delay(failures, base, maximum):
+    """Seconds to wait after `failures` consecutive failures: base * 2^(failures - 1), capped at maximum"""
+    # Clamp the exponent so a long-dead endpoint cannot overflow the float multiply
+    return min(base * 2 ** min(failures - 1, 32), maximum)
+
+def database_is_shared():
+    """An in-memory SQLite database is private to one connection, so background threads cannot use it"""
+    return db.engine.url.database not in (None, '', ':memory:')
+
+class WebhookDispatcher:
+    """Delivers change log events to webhook subscriptions from background threads.
+    
+    The dispatcher thread wakes when this process notifies change_events,
+    or every WEBHOOK_POLL_INTERVAL seconds to pick up writes from other
+    processes and due retries, and hands each subscription with pending
+    events to a worker pool. A worker leases the subscription row while it
+    delivers, so each endpoint receives its events in order and only once,
+    even with several worker processes. A failed batch is retried after
+    WEBHOOK_RETRY_BASE * 2^(failures - 1) seconds, up to WEBHOOK_RETRY_MAX.
+    """
+    
+    SCAN_LIMIT = 1000  # change_log rows examined per batch
+    
+    def __init__(self, app):
+        self.app = app
+        self.owner = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._executor = None
+        self._in_flight = set()
+        self._stopping = threading.Event()
+        self._sessions = threading.local()
+        self.delivered = 0
+        self.failed = 0
+    
+    def ensure_started(self):
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            self._stopping.clear()
+            self._in_flight = set()
+            self._executor = ThreadPoolExecutor(max_workers=self.app.config['WEBHOOK_WORKERS'], thread_name_prefix='webhook')
+            self._thread = threading.Thread(target=self._run, name='webhook-dispatcher', daemon=True)
+            self._thread.start()
+    
+    def stop(self, timeout=30):
+        """Stop dispatching and wait for deliveries in progress to finish"""
+        with self._lock:
+            thread, executor = self._thread, self._executor
+            if thread is None or self._pid != os.getpid():
+                return
+            self._stopping.set()
+            self._thread = None
+        thread.join(timeout)
+        executor.shutdown(wait=True)
+    
+    def stats(self):
+        return {'delivered': self.delivered, 'failed': self.failed}
+    
+    def _run(self):
+        seen = change_events.last_seq
+        while not self._stopping.is_set():
+            try:
+                with self.app.app_context():
+                    due = self._due_subscriptions() if database_is_shared() else []
+                for subscription_id in due:
+                    with self._lock:
+                        if subscription_id in self._in_flight:
+                            continue
+                        self._in_flight.add(subscription_id)
+                    self._executor.submit(self._deliver, subscription_id)
+            except Exception as e:
+                self.app.logger.error("Webhook dispatcher error: %s", e)
+            
+            change_events.wait(seen, self.app.config['WEBHOOK_POLL_INTERVAL'])
+            seen = change_events.last_seq
+    
+    def _due_subscriptions(self):
+        now = datetime.utcnow()
+        max_seq = db.session.query(db.func.max(ChangeLog.seq)).scalar() or 0
+        return [subscription_id for (subscription_id,) in db.session.query(WebhookSubscription.id).filter(
+            WebhookSubscription.active.is_(True),
+            WebhookSubscription.last_seq < max_seq,
+            db.or_(WebhookSubscription.next_attempt_at.is_(None), WebhookSubscription.next_attempt_at <= now),
+            db.or_(WebhookSubscription.lease_until.is_(None), WebhookSubscription.lease_until < now)
+        )]
+    
+    def _lease_until(self):
+        return datetime.utcnow() + timedelta(seconds=self.app.config['WEBHOOK_TIMEOUT'] * 4 + 30)
+    
+    def _deliver(self, subscription_id):
+        try:
+            with self.app.app_context():
+                # Atomically take the lease, so only one process delivers to an endpoint
+                claimed = WebhookSubscription.query.filter(
+                    WebhookSubscription.id == subscription_id,
+                    db.or_(WebhookSubscription.lease_until.is_(None), WebhookSubscription.lease_until < datetime.utcnow())
+                ).update({'lease_owner': self.owner, 'lease_until': self._lease_until()}, synchronize_session=False)
+                db.session.commit()
+                if not claimed:
+                    return
+                try:
+                    while not self._stopping.is_set() and self._deliver_batch(subscription_id):
+                        pass
+                finally:
+                    db.session.rollback()
+                    WebhookSubscription.query.filter_by(id=subscription_id, lease_owner=self.owner).update(
+                        {'lease_owner': None, 'lease_until': None}, synchronize_session=False
+                    )
+                    db.session.commit()
+        except Exception as e:
+            self.app.logger.error("Webhook delivery to %s failed: %s", subscription_id, e)
+        finally:
+            with self._lock:
+                self._in_flight.discard(subscription_id)
+    
+    def _deliver_batch(self, subscription_id):
+        """POST the next batch of events to one subscription and return whether more are pending"""
+        subscription = WebhookSubscription.query.get(subscription_id)
+        if subscription is None or not subscription.active:
+            return False
+        
+        wanted = set(subscription.events.split(','))
+        changes = (
+            ChangeLog.query.filter(ChangeLog.seq > subscription.last_seq)
+            .order_by(ChangeLog.seq).limit(self.SCAN_LIMIT).all()
+        )
+        if not changes:
+            return False
+        
+        batch = []
+        through = subscription.last_seq
+        for change in changes:
+            event = change_event(change)
+            if '*' in wanted or event['type'] in wanted:
+                if len(batch) >= self.app.config['WEBHOOK_BATCH_SIZE']:
+                    break
+                batch.append(event)
+            through = change.seq
+        more = through < changes[-1].seq or len(changes) == self.SCAN_LIMIT
+        
+        error = self._post(subscription, batch) if batch else None
+        if error is None:
+            subscription.last_seq = through
+            subscription.failures = 0
+            subscription.next_attempt_at = None
+            subscription.last_error = None
+            subscription.lease_until = self._lease_until()
+            self.delivered += len(batch)
+        else:
+            subscription.failures += 1
+            delay = webhook_retry_delay(subscription.failures, self.app.config['WEBHOOK_RETRY_BASE'], self.app.config['WEBHOOK_RETRY_MAX'])
+            subscription.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+            subscription.last_error = error[:500]
+            self.failed += 1
+            more = False
+        db.session.commit()
+        return more
+    
+    def _post(self, subscription, batch):
+        """Send one batch and return an error message, or None on a 2xx response"""
+        body = json.dumps({'subscription_id': subscription.id, 'events': batch})
+        headers = {'Content-Type': 'application/json'}
+        if subscription.secret:
+            signature = hmac.new(subscription.secret.encode(), body.encode(), hashlib.sha256).hexdigest()
+            headers['X-Onix-Signature'] = f'sha256={signature}'
+        
+        import requests  # only needed once a webhook fires, so kept out of worker startup
+        
+        session = getattr(self._sessions, 'session', None)
+        if session is None:
+            session = self._sessions.session = requests.Session()
+        try:
+            response = session.post(subscription.url, data=body, headers=headers, timeout=self.app.config['WEBHOOK_TIMEOUT'])
+        except requests.RequestException as e:
+            return str(e)
+        if not 200 <= response.status_code < 300:
+            return f"HTTP {response.status_code}"
+        return None
+
+webhook_dispatcher = app_extension('webhook_dispatcher')
+
+@bp.before_app_request
+def start_webhook_dispatcher():
+    if current_app.config['WEBHOOK_DISPATCHER']:
+        webhook_dispatcher.ensure_started()
+
+@bp.route('/api/webhooks', methods=['POST'])
+def create_webhook():
+    try:
+        data = request.get_json(silent=True) or {}
+        url = data.get('url')
+        if not isinstance(url, str) or not url.startswith(('http://', 'https://')):
+            return jsonify({"error": "url must be an http:// or https:// URL"}), 400
+        events = data.get('events', ['*'])
+        if (not isinstance(events, list) or not events or not all(isinstance(event, str) for event in events)
+                or not (events == ['*'] or set(events) <= set(WEBHOOK_EVENTS))):
+            return jsonify({"error": f"events must be [\"*\"] or a list of {', '.join(WEBHOOK_EVENTS)}"}), 400
+        secret = data.get('secret')
+        if secret is not None and not isinstance(secret, str):
+            return jsonify({"error": "secret must be a string"}), 400
+        
+        # Subscriptions receive changes made after they are created
+        subscription = WebhookSubscription(
+            id=str(uuid.uuid4()),
+            url=url,
+            events=','.join(events),
+            secret=secret,
+            last_seq=db.session.query(db.func.max(ChangeLog.seq)).scalar() or 0
+        )
+        db.session.add(subscription)
+        db.session.commit()
+        return jsonify(subscription.to_dict()), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/webhooks', methods=['GET'])
+def get_webhooks():
+    try:
+        subscriptions = WebhookSubscription.query.order_by(WebhookSubscription.created_at).all()
+        return jsonify([subscription.to_dict() for subscription in subscriptions])
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/webhooks/<subscription_id>', methods=['DELETE'])
+def delete_webhook(subscription_id):
+    try:
+        subscription = WebhookSubscription.query.get(subscription_id)
+        if not subscription:
+            return jsonify({"error": "Webhook not found"}), 404
+        db.session.delete(subscription)
+        db.session.commit()
+        return jsonify({"message": "Webhook deleted successfully"})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+# Cache endpoints
+@bp.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify({
+        'customers': customer_cache.stats(),
+        'responses': response_cache.stats() if response_cache.backend else None
+    })
+
+# Report endpoints
+@bp.route('/api/reports/summary', methods=['GET'])
+@conditional('customer', 'interaction')
+@cached_response('reports')
+def get_reports_summary():
+    try:
+        recent_limit = min(max(request.args.get('recent', 10, type=int), 0), 100)
+        companies_limit = min(max(request.args.get('companies', 5, type=int), 0), 100)
+        
+        # Counts come from the trigger-maintained report_counter table
+        counters = {}
+        for dimension, key, count in (
+            db.session.query(ReportCounter.dimension, ReportCounter.key, ReportCounter.count)
+            .filter(ReportCounter.dimension.in_(['total', 'customer_status', 'interaction_type']), ReportCounter.count > 0)
+        ):
+            counters.setdefault(dimension, {})[key] = count
+        totals = counters.get('total', {})
+        
+        top_companies = (
+            db.session.query(ReportCounter.key, ReportCounter.count)
+            .filter(ReportCounter.dimension == 'company', ReportCounter.count > 0)
+            .order_by(ReportCounter.count.desc(), ReportCounter.key)
+            .limit(companies_limit)
+            .all()
+        )
+        
+        recent_rows = (
+            db.session.query(Interaction, Customer.first_name, Customer.last_name)
+            .join(Customer, Interaction.customer_id == Customer.id)
+            .order_by(Interaction.created_at.desc())
+            .limit(recent_limit)
+            .all()
+        )
+        recent_activity = []
+        for interaction, first_name, last_name in recent_rows:
+            activity = interaction.to_dict()
+            activity['customer'] = f"{first_name} {last_name}"
+            recent_activity.append(activity)
+        
+        return jsonify({
+            'total_customers': totals.get('customers', 0),
+            'total_interactions': totals.get('interactions', 0),
+            'status_counts': counters.get('customer_status', {}),
+            'interaction_counts': counters.get('interaction_type', {}),
+            'top_companies': [{'company': company, 'count': count} for company, count in top_companies],
+            'recent_activity': recent_activity
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+ACTIVITY_STEPS = {'day': timedelta(days=1), 'week': timedelta(weeks=1)}
+ACTIVITY_DEFAULT_BUCKETS = {'day': 30, 'week': 12}
+ACTIVITY_MAX_BUCKETS = 1000
+
+def bucket_start(day, granularity):
+    """Return the first day of the rollup bucket containing day"""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    return day
+
+@bp.route('/api/reports/activity', methods=['GET'])
+@conditional('customer', 'interaction')
+@cached_response('reports')
+def get_reports_activity():
+    try:
+        granularity = request.args.get('granularity', 'day')
+        if granularity not in ACTIVITY_STEPS:
+            return jsonify({"error": f"granularity must be one of {', '.join(ACTIVITY_STEPS)}"}), 400
+        step = ACTIVITY_STEPS[granularity]
+        
+        try:
+            end = date.fromisoformat(request.args['to']) if request.args.get('to') else datetime.utcnow().date()
+            start = (date.fromisoformat(request.args['from']) if request.args.get('from')
+                     else end - step * (ACTIVITY_DEFAULT_BUCKETS[granularity] - 1))
+        except ValueError:
+            return jsonify({"error": "from and to must be ISO 8601 dates (YYYY-MM-DD)"}), 400
+        start, end = bucket_start(start, granularity), bucket_start(end, granularity)
+        if start > end:
+            return jsonify({"error": "from must not be after to"}), 400
+        if (end - start) // step + 1 > ACTIVITY_MAX_BUCKETS:
+            return jsonify({"error": f"at most {ACTIVITY_MAX_BUCKETS} buckets can be requested"}), 400
+        
+        # Zero-filled buckets, so charts get a point for every period
+        buckets = OrderedDict()
+        current = start
+        while current <= end:
+            buckets[current.isoformat()] = {'bucket': current.isoformat(), 'total': 0, 'by_type': {}, 'by_status': {}}
+            current += step
+        
+        rows = (
+            db.session.query(InteractionRollup.bucket, InteractionRollup.dimension, InteractionRollup.key, InteractionRollup.count)
+            .filter(
+                InteractionRollup.granularity == granularity,
+                InteractionRollup.bucket.between(start.isoformat(), end.isoformat()),
+                InteractionRollup.count > 0
+            )
+        )
+        for bucket, dimension, key, count in rows:
+            entry = buckets[bucket]
+            if dimension == 'type':
+                entry['by_type'][key] = count
+                entry['total'] += count
+            else:
+                entry['by_status'][key] = count
+        
+        return jsonify({
+            'granularity': granularity,
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'buckets': list(buckets.values())
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Search endpoints. snippet() marks matches with control characters that
+# cannot appear in typed text, so the stored text can be HTML-escaped
+# before the marks become <mark> tags.
+SEARCH_QUERIES = {
+    'customers': """
+        SELECT 'customer' AS kind, c.id AS id, c.id AS customer_id,
+               c.first_name, c.last_name, c.email, c.company, c.status,
+               NULL AS interaction_type, c.created_at,
+               snippet(customer_fts, -1, char(2), char(3), '…', 12) AS snippet,
+               customer_fts.rank AS rank
+        FROM customer_fts
+        JOIN customer c ON c.rowid = customer_fts.rowid
+        WHERE customer_fts MATCH :query
+    """,
+    'interactions': """
+        SELECT 'interaction' AS kind, i.id AS id, i.customer_id,
+               c.first_name, c.last_name, c.email, c.company, c.status,
+               i.type AS interaction_type, i.created_at,
+               snippet(interaction_fts, 0, char(2), char(3), '…', 12) AS snippet,
+               interaction_fts.rank AS rank
+        FROM interaction_fts
+        JOIN interaction i ON i.rowid = interaction_fts.rowid
+        JOIN customer c ON c.id = i.customer_id
+        WHERE interaction_fts MATCH :query
+    """
+}
+
+def highlight_snippet(snippet):
+    """HTML-escape an FTS5 snippet and turn its match markers into <mark> tags"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace('\x02', '<mark>').replace('\x03', '</mark>')
+
+def build_match_query(text):
+    """Turn free text into an FTS5 query matching every term as a prefix"""
+    terms = [term.replace('"', '""') for term in text.split()]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+@bp.route('/api/search', methods=['GET'])
+def search():
+    try:
+        text = request.args.get('q', '').strip()
+        if not text:
+            return jsonify({"error": "q is required"}), 400
+        
+        search_type = request.args.get('type', 'all')
+        if search_type == 'all':
+            sources = list(SEARCH_QUERIES.values())
+        elif search_type in SEARCH_QUERIES:
+            sources = [SEARCH_QUERIES[search_type]]
+        else:
+            return jsonify({"error": "type must be one of all, customers, interactions"}), 400
+        
+        limit = request.args.get('limit', 20, type=int)
+        offset = request.args.get('offset', 0, type=int)
+        if limit < 1 or limit > 100 or offset < 0:
+            return jsonify({"error": "limit must be between 1 and 100 and offset must not be negative"}), 400
+        
+        sql = ' UNION ALL '.join(sources) + ' ORDER BY rank LIMIT :limit OFFSET :offset'
+        statement = db.text(sql).columns(created_at=db.DateTime)
+        rows = db.session.execute(statement, {
+            'query': build_match_query(text),
+            'limit': limit + 1,
+            'offset': offset
+        }).mappings().all()
+        
+        results = []
+        for row in rows[:limit]:
+            result = {
+                'type': row['kind'],
+                'id': row['id'],
+                'customer_id': row['customer_id'],
+                'customer': f"{row['first_name']} {row['last_name']}",
+                'first_name': row['first_name'],
+                'last_name': row['last_name'],
+                'email': row['email'],
+                'company': row['company'],
+                'status': row['status'],
+                'created_at': row['created_at'].isoformat() if row['created_at'] else None,
+                'snippet': highlight_snippet(row['snippet']),
+                'rank': row['rank']
+            }
+            if row['kind'] == 'interaction':
+                result['interaction_type'] = row['interaction_type']
+            results.append(result)
+        
+        return jsonify({
+            'query': text,
+            'results': results,
+            'next_offset': offset + limit if len(rows) > limit else None
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Export endpoints
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+def serialize_export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def stream_export(query, columns, export_format):
+    """Yield the rows of query as NDJSON or CSV text, EXPORT_BATCH_SIZE rows at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == 'csv' else None
+    if writer:
+        writer.writerow(columns)
+    
+    rows_in_buffer = 0
+    for row in query.yield_per(EXPORT_BATCH_SIZE):
+        values = [serialize_export_value(value) for value in row]
+        if writer:
+            writer.writerow(values)
+        else:
+            buffer.write(json.dumps(dict(zip(columns, values))))
+            buffer.write('\n')
+        
+        rows_in_buffer += 1
+        if rows_in_buffer >= EXPORT_BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows_in_buffer = 0
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def export_response(model, order_by, name):
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    table_columns = list(model.__table__.columns)
+    columns = [column.name for column in table_columns]
+    query = db.session.query(*table_columns).order_by(*order_by).execution_options(stream_results=True)
+    
+    response = Response(
+        stream_with_context(stream_export(query, columns, export_format)),
+        mimetype=EXPORT_FORMATS[export_format]
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename={name}.{export_format}'
+    return response
+
+@bp.route('/api/export/customers', methods=['GET'])
+def export_customers():
+    try:
+        return export_response(Customer, [Customer.created_at, Customer.id], 'customers')
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/export/interactions', methods=['GET'])
+def export_interactions():
+    try:
+        return export_response(Interaction, [Interaction.created_at, Interaction.id], 'interactions')
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def create_app(config=None):
+    """Build the application. Nothing touches the database until the first request or CLI command."""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    if config:
+        app.config.update(config)
+    
+    db.init_app(app)
+    configure_sqlite_engine(app)
+    api.init_app(app)
+    app.register_blueprint(bp)
+    
+    # Caches, metrics and background workers belong to this app; the module
+    # level names are proxies to the current app's instances
+    writer = InteractionWriter(app)
+    dispatcher = WebhookDispatcher(app)
+    app.extensions['onix'] = {
+        'customer_cache': LRUCache(app.config['CUSTOMER_CACHE_SIZE'], app.config['CUSTOMER_CACHE_TTL']),
+        'response_cache': ResponseCache(app),
+        'request_metrics': RequestMetrics(),
+        'interaction_writer': writer,
+        'webhook_dispatcher': dispatcher,
+    }
+    atexit.register(writer.stop)
+    atexit.register(dispatcher.stop)
+    return app
+
+app = create_app()
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
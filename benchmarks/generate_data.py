@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic data generator for Onix CRM.
+
+Fills a database with N customers and M interactions per customer. The
+same seed always produces the same ids, names, companies and timestamps,
+so benchmark runs against generated data are comparable.
+
+    python benchmarks/generate_data.py --database /tmp/onix-bench.db --customers 40000 --interactions 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIRST_NAMES = ['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda',
+               'David', 'Elizabeth', 'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+              'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Wilson', 'Anderson', 'Thomas', 'Taylor']
+COMPANY_WORDS = ['Global', 'Tech', 'Acme', 'Innovate', 'Systems', 'Dynamics', 'Partners', 'Labs',
+                 'Solutions', 'Networks', 'Industries', 'Digital']
+STATUSES = ['lead', 'prospect', 'customer']
+INTERACTION_TYPES = ['call', 'email', 'meeting']
+NOTE_PHRASES = ['Discussed pricing', 'Followed up on renewal', 'Demoed new product features',
+                'Sent contract draft', 'Reviewed support tickets', 'Scheduled onboarding',
+                'Answered integration questions', 'Negotiated discount', 'Introduced account manager']
+
+# Fixed origin so timestamps do not depend on when the generator runs
+EPOCH = datetime(2024, 1, 1)
+
+def use_database(path):
+    """Point the app at a SQLite file; must be called before the app is imported"""
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.abspath(path)}"
+
+def generate(customers, interactions_per_customer, seed=42, batch_size=5000, companies=None):
+    """Insert customers and interactions into the database the app is configured for.
+
+    Returns the generated customer ids.
+    """
+    from app import app, db, init_db, Customer, Interaction
+
+    rng = random.Random(seed)
+    company_names = [
+        f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_WORDS)} {i}"
+        for i in range(companies or max(1, customers // 20))
+    ]
+    customer_ids = []
+
+    with app.app_context():
+        init_db()
+        customer_rows = []
+        interaction_rows = []
+
+        def flush():
+            # Customers first so the interaction foreign keys resolve
+            if customer_rows:
+                db.session.execute(Customer.__table__.insert(), customer_rows)
+            if interaction_rows:
+                db.session.execute(Interaction.__table__.insert(), interaction_rows)
+            db.session.commit()
+            customer_rows.clear()
+            interaction_rows.clear()
+
+        for i in range(customers):
+            customer_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            created_at = EPOCH + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+            customer_ids.append(customer_id)
+            customer_rows.append({
+                'id': customer_id,
+                'first_name': rng.choice(FIRST_NAMES),
+                'last_name': rng.choice(LAST_NAMES),
+                'email': f"customer{i}.{seed}@example.com",
+                'company': rng.choice(company_names),
+                'status': rng.choice(STATUSES),
+                'created_at': created_at,
+                'updated_at': created_at
+            })
+
+            for _ in range(interactions_per_customer):
+                interaction_rows.append({
+                    'id': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                    'customer_id': customer_id,
+                    'type': rng.choice(INTERACTION_TYPES),
+                    'notes': f"{rng.choice(NOTE_PHRASES)} with {rng.choice(FIRST_NAMES)}",
+                    'created_at': created_at + timedelta(seconds=rng.randrange(90 * 24 * 3600))
+                })
+
+            if len(customer_rows) >= batch_size or len(interaction_rows) >= batch_size:
+                flush()
+
+        flush()
+
+    return customer_ids
+
+def main():
+    parser = argparse.ArgumentParser(description='Fill an Onix database with deterministic synthetic data')
+    parser.add_argument('--database', required=True, help='SQLite file to fill (created if missing)')
+    parser.add_argument('--customers', type=int, default=10000, help='Number of customers')
+    parser.add_argument('--interactions', type=int, default=5, help='Interactions per customer')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    use_database(args.database)
+    started = time.perf_counter()
+    generate(args.customers, args.interactions, seed=args.seed)
+    elapsed = time.perf_counter() - started
+
+    print(f"Generated {args.customers} customers and {args.customers * args.interactions} "
+          f"interactions in {elapsed:.1f}s ({args.database})")
+
+if __name__ == '__main__':
+    main()
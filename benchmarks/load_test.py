@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Load test for the Onix CRM API.
+
+Worker threads replay a weighted mix of list, detail, create, interaction
+and report requests for a fixed duration and the script reports
+throughput and p50/p95/p99 latency per endpoint. Results can be saved as
+a baseline and later runs compared against it to catch regressions.
+
+Against a running server:
+
+    python benchmarks/load_test.py --url http://localhost:5000 --workers 8 --duration 30
+
+Against a server started on a generated database:
+
+    python benchmarks/generate_data.py --database /tmp/onix-bench.db --customers 40000
+    python benchmarks/load_test.py --database /tmp/onix-bench.db --start-server --output baseline.json
+    python benchmarks/load_test.py --database /tmp/onix-bench.db --start-server --compare baseline.json
+
+Without --url or --start-server the requests go through Flask's test
+client in this process, which measures the application without the
+network stack.
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_data import use_database
+from stats import percentile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (operation, weight) pairs; weights are relative
+DEFAULT_MIX = [
+    ('list', 30),
+    ('detail', 30),
+    ('create', 10),
+    ('interaction', 20),
+    ('report', 10),
+]
+
+class HTTPTarget:
+    """Sends requests to a running server, one keep-alive session per worker"""
+
+    def __init__(self, base_url):
+        import requests
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+
+    def get(self, path, params=None):
+        return self.session.get(self.base_url + path, params=params).status_code
+
+    def get_json(self, path, params=None):
+        return self.session.get(self.base_url + path, params=params).json()
+
+    def post(self, path, payload):
+        return self.session.post(self.base_url + path, json=payload).status_code
+
+class InProcessTarget:
+    """Sends requests through the Flask test client in this process"""
+
+    def __init__(self):
+        from app import app
+        self.client = app.test_client()
+
+    def get(self, path, params=None):
+        return self.client.get(path, query_string=params).status_code
+
+    def get_json(self, path, params=None):
+        return self.client.get(path, query_string=params).get_json()
+
+    def post(self, path, payload):
+        return self.client.post(path, json=payload).status_code
+
+def run_operation(target, operation, customer_ids, rng):
+    """Issue one request of the given kind and return its status code"""
+    if operation == 'list':
+        params = {'limit': 50}
+        if rng.random() < 0.3:
+            params['status'] = rng.choice(['lead', 'prospect', 'customer'])
+        return target.get('/api/customers', params)
+    if operation == 'detail':
+        customer_id = rng.choice(customer_ids)
+        params = {'include': 'interactions'} if rng.random() < 0.5 else None
+        return target.get(f'/api/customers/{customer_id}', params)
+    if operation == 'create':
+        unique = uuid.uuid4().hex
+        return target.post('/api/customers', {
+            'first_name': 'Load',
+            'last_name': 'Test',
+            'email': f'load-{unique}@example.com',
+            'company': 'Load Test Inc',
+            'status': 'lead'
+        })
+    if operation == 'interaction':
+        return target.post('/api/interactions', {
+            'customer_id': rng.choice(customer_ids),
+            'type': rng.choice(['call', 'email', 'meeting']),
+            'notes': 'Load test interaction'
+        })
+    if operation == 'report':
+        return target.get('/api/reports/summary')
+    raise ValueError(f"unknown operation {operation}")
+
+def run_load(make_target, workers, duration, mix=DEFAULT_MIX, seed=1):
+    """Run the mix from `workers` threads for `duration` seconds and summarise it"""
+    customer_ids = [row['id'] for row in make_target().get_json(
+        '/api/customers', {'all': 'true', 'fields': 'id'}
+    )]
+    if not customer_ids:
+        raise SystemExit('The database has no customers; run generate_data.py first')
+
+    operations = [operation for operation, _ in mix]
+    weights = [weight for _, weight in mix]
+    stop = threading.Event()
+    samples = [[] for _ in range(workers)]
+
+    def worker(slot):
+        target = make_target()
+        rng = random.Random(seed + slot)
+        local = samples[slot]
+        while not stop.is_set():
+            operation = rng.choices(operations, weights)[0]
+            start = time.perf_counter()
+            try:
+                status = run_operation(target, operation, customer_ids, rng)
+            except Exception:
+                status = None
+            local.append((operation, time.perf_counter() - start, status))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return summarise([sample for per_worker in samples for sample in per_worker], elapsed, workers)
+
+def summarise(samples, elapsed, workers):
+    endpoints = {}
+    for operation in sorted({operation for operation, _, _ in samples}):
+        latencies = [latency for op, latency, _ in samples if op == operation]
+        errors = sum(1 for op, _, status in samples
+                     if op == operation and (status is None or status >= 400))
+        endpoints[operation] = {
+            'requests': len(latencies),
+            'errors': errors,
+            'requests_per_sec': len(latencies) / elapsed,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p95_ms': percentile(latencies, 95) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+        }
+    latencies = [latency for _, latency, _ in samples]
+    return {
+        'workers': workers,
+        'duration': elapsed,
+        'requests': len(samples),
+        'requests_per_sec': len(samples) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'endpoints': endpoints,
+    }
+
+def print_results(results):
+    print(f"{'endpoint':<14}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    rows = list(results['endpoints'].items()) + [('total', dict(results, errors=sum(
+        endpoint['errors'] for endpoint in results['endpoints'].values()
+    )))]
+    for name, result in rows:
+        print(f"{name:<14}{result['requests']:>10}{result['errors']:>8}{result['requests_per_sec']:>10.0f}"
+              f"{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}")
+
+def compare_results(baseline, results, tolerance):
+    """Return a list of regressions: p95 latency or throughput worse than baseline by more than tolerance"""
+    regressions = []
+    for name, current in results['endpoints'].items():
+        previous = baseline['endpoints'].get(name)
+        if not previous:
+            continue
+        if previous['p95_ms'] and current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']:.2f} ms -> {current['p95_ms']:.2f} ms")
+        if current['requests_per_sec'] < previous['requests_per_sec'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['requests_per_sec']:.0f} req/s -> "
+                               f"{current['requests_per_sec']:.0f} req/s")
+    return regressions
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(port):
+    """Start the app in a subprocess with the threaded dev server and wait until it answers"""
+    import requests
+    code = f"from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)"
+    process = subprocess.Popen([sys.executable, '-c', code], cwd=REPO_ROOT, env=os.environ.copy(),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit('The server exited during startup')
+        try:
+            requests.get(f'http://127.0.0.1:{port}/metrics', timeout=1)
+            return process
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit('The server did not start within 60 seconds')
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the Onix CRM API with a weighted request mix')
+    parser.add_argument('--url', help='Base URL of a running server')
+    parser.add_argument('--database', help='SQLite file to use for --start-server or the in-process client')
+    parser.add_argument('--start-server', action='store_true', help='Start the app on a free port for the run')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent worker threads')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for the request mix')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--compare', help='Baseline results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed fractional regression before --compare fails (default 0.2)')
+    args = parser.parse_args()
+
+    if args.database:
+        use_database(args.database)
+
+    server = None
+    base_url = args.url
+    if args.start_server:
+        port = free_port()
+        server = start_server(port)
+        base_url = f"http://127.0.0.1:{port}"
+    try:
+        if base_url:
+            make_target = lambda: HTTPTarget(base_url)
+        else:
+            make_target = InProcessTarget
+        results = run_load(make_target, args.workers, args.duration, seed=args.seed)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, results, args.tolerance)
+        if regressions:
+            print('\nRegressions against baseline:')
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print('\nNo regressions against baseline')
+
+if __name__ == '__main__':
+    main()
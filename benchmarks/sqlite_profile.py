@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark SQLite write throughput and read latency under concurrent load
+for each of the pragma profiles in app.SQLITE_PROFILES.
+
+Every writer thread inserts customers one commit at a time, the same way
+create_customer() does, while reader threads run the customer list query
+and record how long each read takes.
+
+    python benchmarks/sqlite_profile.py --writers 4 --readers 4 --duration 5
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import SQLITE_PROFILES, apply_sqlite_pragmas
+from stats import percentile
+
+SCHEMA = """
+CREATE TABLE customer (
+    id VARCHAR(36) NOT NULL PRIMARY KEY,
+    first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL,
+    email VARCHAR(100) NOT NULL UNIQUE,
+    company VARCHAR(100),
+    status VARCHAR(20),
+    created_at DATETIME,
+    updated_at DATETIME
+);
+CREATE INDEX ix_customer_created_at_id ON customer (created_at, id);
+"""
+
+def connect(path, pragmas):
+    connection = sqlite3.connect(path, timeout=30)
+    apply_sqlite_pragmas(connection, pragmas)
+    return connection
+
+def run_profile(profile, writers, readers, duration, seed_rows):
+    pragmas = SQLITE_PROFILES[profile]
+    directory = tempfile.mkdtemp(prefix='onix-bench-')
+    path = os.path.join(directory, 'bench.db')
+    
+    setup = connect(path, pragmas)
+    setup.executescript(SCHEMA)
+    setup.executemany(
+        "INSERT INTO customer VALUES (?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))",
+        [(str(uuid.uuid4()), 'Seed', str(i), f'seed{i}@example.com', 'Seed Corp', 'lead')
+         for i in range(seed_rows)]
+    )
+    setup.commit()
+    setup.close()
+    
+    stop = threading.Event()
+    write_counts = [0] * writers
+    read_latencies = [[] for _ in range(readers)]
+    errors = []
+    
+    def writer(slot):
+        connection = connect(path, pragmas)
+        try:
+            while not stop.is_set():
+                customer_id = str(uuid.uuid4())
+                connection.execute(
+                    "INSERT INTO customer VALUES (?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))",
+                    (customer_id, 'Bench', 'Writer', f'{customer_id}@example.com', 'Bench Corp', 'lead')
+                )
+                connection.commit()
+                write_counts[slot] += 1
+        except sqlite3.Error as e:
+            errors.append(f"writer: {e}")
+        finally:
+            connection.close()
+    
+    def reader(slot):
+        connection = connect(path, pragmas)
+        try:
+            while not stop.is_set():
+                start = time.perf_counter()
+                connection.execute(
+                    "SELECT * FROM customer ORDER BY created_at, id LIMIT 50"
+                ).fetchall()
+                read_latencies[slot].append(time.perf_counter() - start)
+        except sqlite3.Error as e:
+            errors.append(f"reader: {e}")
+        finally:
+            connection.close()
+    
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    shutil.rmtree(directory, ignore_errors=True)
+    
+    latencies = [latency for per_thread in read_latencies for latency in per_thread]
+    return {
+        'profile': profile,
+        'writes_per_sec': sum(write_counts) / elapsed,
+        'reads_per_sec': len(latencies) / elapsed,
+        'read_p50_ms': percentile(latencies, 50) * 1000,
+        'read_p95_ms': percentile(latencies, 95) * 1000,
+        'read_p99_ms': percentile(latencies, 99) * 1000,
+        'read_mean_ms': (statistics.mean(latencies) * 1000) if latencies else 0.0,
+        'errors': len(errors),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare SQLite pragma profiles under concurrent load')
+    parser.add_argument('--profiles', nargs='+', default=list(SQLITE_PROFILES), choices=list(SQLITE_PROFILES))
+    parser.add_argument('--writers', type=int, default=4, help='Concurrent writer threads')
+    parser.add_argument('--readers', type=int, default=4, help='Concurrent reader threads')
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds to run each profile')
+    parser.add_argument('--seed-rows', type=int, default=10000, help='Customers inserted before the run')
+    args = parser.parse_args()
+    
+    print(f"{'profile':<12}{'writes/s':>10}{'reads/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for profile in args.profiles:
+        result = run_profile(profile, args.writers, args.readers, args.duration, args.seed_rows)
+        print(f"{result['profile']:<12}{result['writes_per_sec']:>10.0f}{result['reads_per_sec']:>10.0f}"
+              f"{result['read_p50_ms']:>9.2f}{result['read_p95_ms']:>9.2f}{result['read_p99_ms']:>9.2f}"
+              f"{result['errors']:>8}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Measure how long a fresh worker takes from importing the app to answering
+its first request. Every gunicorn worker pays this when the app is not
+preloaded, and again whenever a worker is recycled.
+
+Each run starts a new interpreter that imports the app and sends one
+request through the test client, timing the import and the request:
+
+    python benchmarks/startup_time.py --database /tmp/onix-bench.db --runs 10
+
+With --gunicorn each run instead starts a one-worker gunicorn server and
+times launch to first response:
+
+    python benchmarks/startup_time.py --database /tmp/onix-bench.db --gunicorn
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_data import use_database
+from stats import percentile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IN_PROCESS_CODE = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+status = app.app.test_client().get({path!r}).status_code
+done = time.perf_counter()
+print(json.dumps({{'import': imported - start, 'first_request': done - imported, 'status': status}}))
+"""
+
+def run_in_process(path):
+    output = subprocess.run(
+        [sys.executable, '-c', IN_PROCESS_CODE.format(path=path)],
+        cwd=REPO_ROOT, env=os.environ.copy(), capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result['total'] = result['import'] + result['first_request']
+    return result
+
+def run_gunicorn(path):
+    import requests
+    from load_test import free_port
+
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--workers', '1', '--bind', f'127.0.0.1:{port}', 'app:app'],
+        cwd=REPO_ROOT, env=os.environ.copy(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            if process.poll() is not None:
+                raise SystemExit('gunicorn exited during startup')
+            try:
+                status = requests.get(f'http://127.0.0.1:{port}{path}', timeout=10).status_code
+                return {'total': time.perf_counter() - start, 'status': status}
+            except requests.ConnectionError:
+                time.sleep(0.005)
+        raise SystemExit('gunicorn did not answer within 60 seconds')
+    finally:
+        process.terminate()
+        process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure import-to-first-request time for a fresh worker')
+    parser.add_argument('--database', help='SQLite file the app should use')
+    parser.add_argument('--path', default='/api/customers', help='Path of the first request')
+    parser.add_argument('--runs', type=int, default=10, help='Fresh workers to start')
+    parser.add_argument('--gunicorn', action='store_true', help='Time a one-worker gunicorn server instead')
+    args = parser.parse_args()
+
+    if args.database:
+        use_database(args.database)
+
+    run = run_gunicorn if args.gunicorn else run_in_process
+    results = [run(args.path) for _ in range(args.runs)]
+    if any(result['status'] != 200 for result in results):
+        raise SystemExit(f"{args.path} did not return 200: {sorted({result['status'] for result in results})}")
+
+    print(f"{'phase':<16}{'p50 ms':>9}{'p95 ms':>9}")
+    for phase in ('import', 'first_request', 'total'):
+        if phase in results[0]:
+            samples = [result[phase] for result in results]
+            print(f"{phase:<16}{percentile(samples, 50) * 1000:>9.1f}{percentile(samples, 95) * 1000:>9.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+"""
+Summary statistics shared by the benchmark scripts.
+"""
+
+def percentile(values, pct):
+    """Return the nearest-rank pct percentile of values, or 0.0 when empty"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
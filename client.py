@@ -2,14 +2,95 @@
 """
 Command-line client for the Enterprise CRM API.
 """
+import os
 import sys
 import json
+import time
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import argparse
 import textwrap
 
 BASE_URL = "http://localhost:5000/api"
+VALIDATOR_CACHE_PATH = os.environ.get('ONIX_CLIENT_CACHE', os.path.expanduser('~/.onix_client_cache.json'))
+VALIDATOR_CACHE_SIZE = 200
+DEFAULT_CONCURRENCY = 8
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.3  # seconds, doubled on each retry
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# One session per thread: each keeps its connection alive between requests,
+# and bulk commands reuse the pool's worker threads
+_sessions = threading.local()
+
+def get_session():
+    """Return this thread's keep-alive session, creating it on first use"""
+    session = getattr(_sessions, 'session', None)
+    if session is None:
+        # Connection failures are retried for every method; status retries
+        # only for idempotent ones, so a POST is never sent twice
+        retry = Retry(
+            total=MAX_RETRIES,
+            backoff_factor=RETRY_BACKOFF,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS']),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _sessions.session = session
+    return session
+
+def load_validator_cache():
+    try:
+        with open(VALIDATOR_CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_validator_cache(cache):
+    # Keep only the most recently stored entries
+    entries = list(cache.items())[-VALIDATOR_CACHE_SIZE:]
+    try:
+        with open(VALIDATOR_CACHE_PATH, 'w') as f:
+            json.dump(dict(entries), f)
+    except OSError:
+        pass
+
+def conditional_get(url, params=None):
+    """GET a JSON resource, revalidating any cached copy with its ETag and Last-Modified"""
+    key = requests.Request('GET', url, params=params).prepare().url
+    cache = load_validator_cache()
+    entry = cache.get(key)
+    
+    headers = {}
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+    
+    response = get_session().get(url, params=params, headers=headers)
+    if response.status_code == 304 and entry:
+        return entry['body']
+    response.raise_for_status()
+    
+    body = response.json()
+    if response.headers.get('ETag') or response.headers.get('Last-Modified'):
+        cache.pop(key, None)
+        cache[key] = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'body': body
+        }
+        save_validator_cache(cache)
+    return body
 
 def format_customer(customer):
     """Format a customer record for display"""
@@ -35,38 +116,45 @@ Notes: {textwrap.fill(interaction['notes'], width=60)}
 Created: {created_at.strftime('%Y-%m-%d %H:%M:%S')}
 """
 
-def list_customers():
+def iter_customers(page_size=100):
+    """Yield every customer, walking the paginated customer list one page at a time"""
+    params = {'limit': page_size}
+    while True:
+        page = conditional_get(f"{BASE_URL}/customers", params=params)
+        
+        yield from page['customers']
+        
+        if not page['next_cursor']:
+            return
+        params['after'] = page['next_cursor']
+
+def list_customers(page_size=100):
     """List all customers"""
     try:
-        response = requests.get(f"{BASE_URL}/customers")
-        response.raise_for_status()
-        customers = response.json()
+        count = 0
+        for count, customer in enumerate(iter_customers(page_size), 1):
+            print(f"Customer {count}:")
+            print(format_customer(customer))
         
-        if not customers:
+        if count == 0:
             print("No customers found.")
-            return
-        
-        print(f"Found {len(customers)} customers:\n")
-        for i, customer in enumerate(customers, 1):
-            print(f"Customer {i}:")
-            print(format_customer(customer))
+        else:
+            print(f"Found {count} customers.")
     except requests.exceptions.RequestException as e:
         print(f"Error: {e}")
 
 def get_customer(customer_id):
     """Get details for a specific customer"""
     try:
-        response = requests.get(f"{BASE_URL}/customers/{customer_id}")
-        response.raise_for_status()
-        customer = response.json()
+        customer = conditional_get(
+            f"{BASE_URL}/customers/{customer_id}",
+            params={'include': 'interactions'}
+        )
         
         print("Customer details:")
         print(format_customer(customer))
         
-        # Also get interactions
-        interactions_response = requests.get(f"{BASE_URL}/customers/{customer_id}/interactions")
-        interactions_response.raise_for_status()
-        interactions = interactions_response.json()
+        interactions = customer['interactions']
         
         if interactions:
             print(f"Customer has {len(interactions)} interactions:")
@@ -89,7 +177,7 @@ def create_customer(first_name, last_name, email, company, status):
     }
     
     try:
-        response = requests.post(
+        response = get_session().post(
             f"{BASE_URL}/customers",
             json=customer_data
         )
@@ -113,14 +201,15 @@ def add_interaction(customer_id, interaction_type, notes):
     }
     
     try:
-        response = requests.post(
+        response = get_session().post(
             f"{BASE_URL}/interactions",
             json=interaction_data
         )
         
-        if response.status_code == 201:
+        # 202 means the server queued the write (INTERACTION_WRITE_MODE=async)
+        if response.status_code in (201, 202):
             interaction = response.json()
-            print("Interaction added successfully:")
+            print("Interaction added successfully:" if response.status_code == 201 else "Interaction queued:")
             print(format_interaction(interaction))
         else:
             error_data = response.json()
@@ -128,10 +217,168 @@ def add_interaction(customer_id, interaction_type, notes):
     except requests.exceptions.RequestException as e:
         print(f"Error: {e}")
 
+def import_customers(path):
+    """Import customers in bulk from a JSON array file or an NDJSON file"""
+    try:
+        if path.endswith(('.ndjson', '.jsonl')):
+            # Stream the file so large imports are never held in memory
+            with open(path, 'rb') as f:
+                response = get_session().post(
+                    f"{BASE_URL}/customers/bulk",
+                    data=f,
+                    headers={'Content-Type': 'application/x-ndjson'}
+                )
+        else:
+            with open(path) as f:
+                customers = json.load(f)
+            response = get_session().post(f"{BASE_URL}/customers/bulk", json=customers)
+        
+        if response.status_code != 200:
+            error_data = response.json()
+            print(f"Error: {error_data.get('error', 'Unknown error')}")
+            return
+        
+        summary = response.json()
+        print(f"Imported {summary['created']} customers, {summary['failed']} failed.")
+        for result in summary['results']:
+            if result['status'] == 'error':
+                print(f"  Record {result['index']}: {result['error']}")
+    except (OSError, ValueError) as e:
+        print(f"Error reading {path}: {e}")
+    except requests.exceptions.RequestException as e:
+        print(f"Error: {e}")
+
+def read_records(path):
+    """Yield records from a JSON array file or, for .ndjson/.jsonl, one JSON object per line"""
+    if path.endswith(('.ndjson', '.jsonl')):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path) as f:
+            yield from json.load(f)
+
+def read_ids(path):
+    """Yield the non-blank lines of a file, one customer ID per line"""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield line.strip()
+
+def run_concurrently(func, items, concurrency=DEFAULT_CONCURRENCY):
+    """Call func on every item from a bounded thread pool.
+
+    At most 2 * concurrency items are in flight, so large input files are
+    never read into memory at once. Yields (item, result, error) in
+    completion order, where error is the exception func raised or None.
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = {}
+
+        def submit_more():
+            while len(pending) < concurrency * 2:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+                pending[executor.submit(func, item)] = item
+
+        submit_more()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                yield item, (None if error else future.result()), error
+            submit_more()
+
+def print_throughput(action, succeeded, failed, elapsed):
+    total = succeeded + failed
+    rate = total / elapsed if elapsed else 0.0
+    print(f"{action} {succeeded} of {total} ({failed} failed) in {elapsed:.2f}s, {rate:.1f} requests/s.")
+
+def post_interaction(interaction):
+    response = get_session().post(f"{BASE_URL}/interactions", json=interaction)
+    if response.status_code not in (201, 202):
+        raise RuntimeError(response.json().get('error', f"HTTP {response.status_code}"))
+    return response.json()
+
+def add_interactions(path, concurrency=DEFAULT_CONCURRENCY):
+    """Add interactions from a JSON array or NDJSON file, several requests at a time"""
+    succeeded = failed = 0
+    started = time.perf_counter()
+    try:
+        for interaction, _, error in run_concurrently(post_interaction, read_records(path), concurrency):
+            if error:
+                failed += 1
+                print(f"  Interaction for {interaction.get('customer_id')}: {error}")
+            else:
+                succeeded += 1
+    except (OSError, ValueError) as e:
+        print(f"Error reading {path}: {e}")
+    print_throughput('Added', succeeded, failed, time.perf_counter() - started)
+
+def fetch_customer(customer_id):
+    response = get_session().get(f"{BASE_URL}/customers/{customer_id}")
+    if response.status_code != 200:
+        raise RuntimeError(response.json().get('error', f"HTTP {response.status_code}"))
+    return response.json()
+
+def get_customers(path, concurrency=DEFAULT_CONCURRENCY, output=None):
+    """Fetch the customers listed in a file of IDs, several requests at a time"""
+    succeeded = failed = 0
+    started = time.perf_counter()
+    out = None
+    try:
+        out = open(output, 'w') if output else None
+        for customer_id, customer, error in run_concurrently(fetch_customer, read_ids(path), concurrency):
+            if error:
+                failed += 1
+                print(f"  Customer {customer_id}: {error}")
+                continue
+            succeeded += 1
+            if out:
+                out.write(json.dumps(customer) + '\n')
+            else:
+                print(format_customer(customer))
+    except OSError as e:
+        print(f"Error: {e}")
+    finally:
+        if out:
+            out.close()
+    print_throughput('Fetched', succeeded, failed, time.perf_counter() - started)
+
+def export_data(resource, export_format, output):
+    """Stream an export of customers or interactions to a file"""
+    try:
+        with get_session().get(
+            f"{BASE_URL}/export/{resource}",
+            params={'format': export_format},
+            stream=True
+        ) as response:
+            if response.status_code != 200:
+                error_data = response.json()
+                print(f"Error: {error_data.get('error', 'Unknown error')}")
+                return
+            
+            written = 0
+            with open(output, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    f.write(chunk)
+                    written += len(chunk)
+        
+        print(f"Exported {resource} to {output} ({written} bytes).")
+    except OSError as e:
+        print(f"Error writing {output}: {e}")
+    except requests.exceptions.RequestException as e:
+        print(f"Error: {e}")
+
 def delete_customer(customer_id):
     """Delete a customer"""
     try:
-        response = requests.delete(f"{BASE_URL}/customers/{customer_id}")
+        response = get_session().delete(f"{BASE_URL}/customers/{customer_id}")
         
         if response.status_code == 200:
             print(f"Customer {customer_id} deleted successfully.")
@@ -146,7 +393,8 @@ def main():
     subparsers = parser.add_subparsers(dest='command', help='Command to run')
     
     # List customers command
-    subparsers.add_parser('list-customers', help='List all customers')
+    list_customers_parser = subparsers.add_parser('list-customers', help='List all customers')
+    list_customers_parser.add_argument('--page-size', type=int, default=100, help='Customers fetched per request')
     
     # Get customer command
     get_customer_parser = subparsers.add_parser('get-customer', help='Get customer details')
@@ -166,6 +414,27 @@ def main():
     add_interaction_parser.add_argument('type', choices=['call', 'email', 'meeting'], help='Interaction type')
     add_interaction_parser.add_argument('notes', help='Interaction notes')
     
+    # Import customers command
+    import_customers_parser = subparsers.add_parser('import-customers', help='Import customers from a JSON array or NDJSON file')
+    import_customers_parser.add_argument('file', help='Path to a .json, .ndjson or .jsonl file')
+    
+    # Bulk add interactions command
+    add_interactions_parser = subparsers.add_parser('add-interactions', help='Add interactions concurrently from a JSON array or NDJSON file')
+    add_interactions_parser.add_argument('file', help='Path to a .json, .ndjson or .jsonl file of {customer_id, type, notes} objects')
+    add_interactions_parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Requests in flight at once')
+    
+    # Bulk get customers command
+    get_customers_parser = subparsers.add_parser('get-customers', help='Fetch customers concurrently from a file of IDs')
+    get_customers_parser.add_argument('file', help='Path to a file with one customer ID per line')
+    get_customers_parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Requests in flight at once')
+    get_customers_parser.add_argument('--output', help='Write the customers as NDJSON to this file instead of printing them')
+    
+    # Export command
+    export_parser = subparsers.add_parser('export', help='Export customers or interactions to a file')
+    export_parser.add_argument('resource', choices=['customers', 'interactions'], help='What to export')
+    export_parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson', help='Export format')
+    export_parser.add_argument('--output', help='Output file (default: <resource>.<format>)')
+    
     # Delete customer command
     delete_customer_parser = subparsers.add_parser('delete-customer', help='Delete a customer')
     delete_customer_parser.add_argument('customer_id', help='Customer ID')
@@ -173,7 +442,7 @@ def main():
     args = parser.parse_args()
     
     if args.command == 'list-customers':
-        list_customers()
+        list_customers(args.page_size)
     elif args.command == 'get-customer':
         get_customer(args.customer_id)
     elif args.command == 'create-customer':
@@ -190,6 +459,18 @@ def main():
             args.type,
             args.notes
         )
+    elif args.command == 'import-customers':
+        import_customers(args.file)
+    elif args.command == 'add-interactions':
+        add_interactions(args.file, args.concurrency)
+    elif args.command == 'get-customers':
+        get_customers(args.file, args.concurrency, args.output)
+    elif args.command == 'export':
+        export_data(
+            args.resource,
+            args.format,
+            args.output or f"{args.resource}.{args.format}"
+        )
     elif args.command == 'delete-customer':
         delete_customer(args.customer_id)
     else:
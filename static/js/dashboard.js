@@ -0,0 +1,706 @@
+let currentCustomerId = null;
+
+// Load all data when the page loads
+window.onload = function() {
+    loadCustomers();
+    loadCustomersTable();
+    loadReportsData();
+    connectChangeEvents();
+
+    document.getElementById('dashboard-search').addEventListener('input', debounce(refreshCustomerList, SEARCH_DEBOUNCE_MS));
+    document.getElementById('dashboard-status-filter').addEventListener('change', refreshCustomerList);
+    document.getElementById('customer-search').addEventListener('input', debounce(refreshCustomersTable, SEARCH_DEBOUNCE_MS));
+    document.getElementById('status-filter').addEventListener('change', refreshCustomersTable);
+};
+
+function switchMainView(viewId) {
+    // Hide all main views
+    document.querySelectorAll('.main-view').forEach(view => {
+        view.classList.remove('active');
+    });
+
+    // Deactivate all navigation links
+    document.querySelectorAll('#nav-dashboard, #nav-customers, #nav-reports').forEach(nav => {
+        nav.style.borderBottom = 'none';
+    });
+
+    // Activate the selected view and navigation link
+    document.getElementById(`main-${viewId}`).classList.add('active');
+    document.getElementById(`nav-${viewId}`).style.borderBottom = '3px solid white';
+
+    // Customer lists are kept current by the change feed, so they are
+    // only reloaded while it is disconnected
+    if (viewId === 'customers' && !liveUpdates) {
+        loadCustomersTable();
+    } else if (viewId === 'reports') {
+        loadReportsData();
+    } else if (viewId === 'dashboard' && !liveUpdates) {
+        loadCustomers();
+    }
+}
+
+function switchTab(tabId) {
+    // Hide all tab contents
+    document.querySelectorAll('.tab-content').forEach(content => {
+        content.classList.remove('active');
+    });
+
+    // Deactivate all tabs
+    document.querySelectorAll('.tab').forEach(tab => {
+        tab.classList.remove('active');
+    });
+
+    // Activate the selected tab and content
+    document.getElementById(tabId).classList.add('active');
+    document.querySelector(`.tab[onclick="switchTab('${tabId}')"]`).classList.add('active');
+}
+
+const CUSTOMER_PAGE_SIZE = 100;
+let customerListGeneration = 0;
+let customersTableGeneration = 0;
+
+const CUSTOMER_CARD_FIELDS = 'id,first_name,last_name,email,company,status';
+const CUSTOMER_ROW_FIELDS = 'id,first_name,last_name,email,company,status,created_at';
+
+// Customer reads use cache: 'no-cache' so the browser always
+// revalidates its copy with If-None-Match and reuses it on a 304.
+
+// Walk the paginated customer list, handing each page to onPage.
+// params holds extra query parameters such as status and fields.
+// Walking stops early if onPage returns false.
+function fetchCustomerPages(onPage, params, after) {
+    const query = new URLSearchParams({...params, limit: CUSTOMER_PAGE_SIZE});
+    if (after) query.set('after', after);
+
+    return fetch(`/api/customers?${query}`, {cache: 'no-cache'})
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) throw new Error(data.error);
+            if (onPage(data.customers) === false) return;
+            if (data.next_cursor) return fetchCustomerPages(onPage, params, data.next_cursor);
+        });
+}
+
+function customerListParams(statusFilterId, fields) {
+    const params = {fields: fields};
+    const status = document.getElementById(statusFilterId).value;
+    if (status !== 'all') params.status = status;
+    return params;
+}
+
+function matchesStatusFilter(customer, statusFilterId) {
+    const status = document.getElementById(statusFilterId).value;
+    return status === 'all' || customer.status === status;
+}
+
+function refreshCustomerList() {
+    const query = document.getElementById('dashboard-search').value.trim();
+    query ? searchCustomerList(query) : loadCustomers();
+}
+
+function refreshCustomersTable() {
+    const query = document.getElementById('customer-search').value.trim();
+    query ? searchCustomersTable(query) : loadCustomersTable();
+}
+
+function createCustomerCard(customer, snippet) {
+    const card = document.createElement('div');
+    card.className = 'card customer-card';
+    card.dataset.customerId = customer.id;
+    card.onclick = () => openCustomerModal(customer.id);
+
+    const statusClass = `status-${customer.status}`;
+
+    card.innerHTML = `
+        <p class="customer-name">${customer.first_name} ${customer.last_name}</p>
+        <p class="customer-email">${customer.email}</p>
+        <p class="customer-company">${customer.company}</p>
+        <span class="status ${statusClass}">${customer.status}</span>
+        ${snippet ? `<p class="customer-email" style="margin-top: 8px;">${snippet}</p>` : ''}
+    `;
+
+    return card;
+}
+
+function createCustomerRow(customer) {
+    const row = document.createElement('tr');
+    row.dataset.customerId = customer.id;
+    row.style.borderBottom = '1px solid var(--servicenow-border)';
+
+    row.innerHTML = `
+        <td style="padding: 10px;">${customer.first_name} ${customer.last_name}</td>
+        <td style="padding: 10px;">${customer.email}</td>
+        <td style="padding: 10px;">${customer.company || '-'}</td>
+        <td style="padding: 10px;"><span class="status status-${customer.status}">${customer.status}</span></td>
+        <td style="padding: 10px;">${new Date(customer.created_at).toLocaleDateString()}</td>
+        <td style="padding: 10px; text-align: center;">
+            <button onclick="openCustomerModal('${customer.id}')" style="background-color: transparent; color: var(--servicenow-blue); border: none; cursor: pointer;">View</button>
+        </td>
+    `;
+
+    return row;
+}
+
+const SEARCH_DEBOUNCE_MS = 250;
+
+function debounce(fn, delay) {
+    let timer = null;
+    return (...args) => {
+        clearTimeout(timer);
+        timer = setTimeout(() => fn(...args), delay);
+    };
+}
+
+function fetchSearchResults(query, type) {
+    return fetch(`/api/search?type=${type}&limit=50&q=${encodeURIComponent(query)}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) throw new Error(data.error);
+            return data.results;
+        });
+}
+
+function searchCustomerList(query) {
+    const generation = ++customerListGeneration;
+    const customerList = document.getElementById('customerList');
+
+    fetchSearchResults(query, 'all')
+        .then(results => {
+            if (generation !== customerListGeneration) return;
+            customerList.innerHTML = '';
+
+
+            // Interaction matches are shown on their customer's card
+            const seen = new Set();
+            results.filter(result => matchesStatusFilter(result, 'dashboard-status-filter')).forEach(result => {
+                if (seen.has(result.customer_id)) return;
+                seen.add(result.customer_id);
+                customerList.appendChild(createCustomerCard(
+                    {...result, id: result.customer_id},
+                    result.snippet
+                ));
+            });
+
+            if (seen.size === 0) {
+                customerList.innerHTML = '<p style="color: var(--servicenow-dark-gray);">No matching customers</p>';
+            }
+        })
+        .catch(error => {
+            customerList.innerHTML = `<p class="error">Error searching customers: ${error.message}</p>`;
+        });
+}
+
+function searchCustomersTable(query) {
+    const generation = ++customersTableGeneration;
+    const tableBody = document.getElementById('customers-table-body');
+
+    fetchSearchResults(query, 'customers')
+        .then(results => {
+            if (generation !== customersTableGeneration) return;
+            tableBody.innerHTML = '';
+            results = results.filter(result => matchesStatusFilter(result, 'status-filter'));
+
+            if (results.length === 0) {
+                tableBody.innerHTML = `<tr><td colspan="6" style="text-align: center; padding: 20px;">No matching customers</td></tr>`;
+                return;
+            }
+
+            results.forEach(result => tableBody.appendChild(createCustomerRow(result)));
+        })
+        .catch(error => {
+            tableBody.innerHTML = 
+                `<tr><td colspan="6" style="text-align: center; padding: 20px;">Error searching customers: ${error.message}</td></tr>`;
+        });
+}
+
+function loadCustomers() {
+    const generation = ++customerListGeneration;
+    const customerList = document.getElementById('customerList');
+    let cleared = false;
+
+    fetchCustomerPages(customers => {
+        // A newer reload has started, abandon this one
+        if (generation !== customerListGeneration) return false;
+
+        if (!cleared) {
+            customerList.innerHTML = '';
+            cleared = true;
+        }
+
+        customers.forEach(customer => appendOrReplace(customerList, createCustomerCard(customer)));
+    }, customerListParams('dashboard-status-filter', CUSTOMER_CARD_FIELDS))
+    .catch(error => {
+        customerList.innerHTML = 
+            `<p class="error">Error loading customers: ${error.message}</p>`;
+    });
+}
+
+function openCustomerModal(customerId) {
+    currentCustomerId = customerId;
+    document.getElementById('customerModal').style.display = 'block';
+
+    // Fetch customer details together with their interactions
+    fetch(`/api/customers/${customerId}?include=interactions`, {cache: 'no-cache'})
+        .then(response => response.json())
+        .then(customer => {
+            document.getElementById('customerDetails').innerHTML = `
+                <div style="display: flex; align-items: center; margin-bottom: 15px;">
+                    <div style="width: 40px; height: 40px; border-radius: 50%; background-color: var(--servicenow-light-blue); color: white; display: flex; align-items: center; justify-content: center; margin-right: 15px; font-size: 18px;">
+                        ${customer.first_name.charAt(0)}${customer.last_name.charAt(0)}
+                    </div>
+                    <div>
+                        <h3 style="margin: 0; font-weight: 500; color: var(--servicenow-dark-blue);">${customer.first_name} ${customer.last_name}</h3>
+                        <p style="margin: 3px 0 0 0; color: var(--servicenow-dark-gray);">${customer.company}</p>
+                    </div>
+                </div>
+                <div style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 15px; margin-bottom: 20px;">
+                    <div class="card" style="margin-bottom: 0;">
+                        <p style="margin: 0 0 5px 0; color: var(--servicenow-dark-gray); font-size: 12px;">Email</p>
+                        <p style="margin: 0; font-weight: 500;">${customer.email}</p>
+                    </div>
+                    <div class="card" style="margin-bottom: 0;">
+                        <p style="margin: 0 0 5px 0; color: var(--servicenow-dark-gray); font-size: 12px;">Status</p>
+                        <p style="margin: 0;"><span class="status status-${customer.status}">${customer.status}</span></p>
+                    </div>
+                    <div class="card" style="margin-bottom: 0;">
+                        <p style="margin: 0 0 5px 0; color: var(--servicenow-dark-gray); font-size: 12px;">Created</p>
+                        <p style="margin: 0; font-weight: 500;">${new Date(customer.created_at).toLocaleDateString()}</p>
+                    </div>
+                    <div class="card" style="margin-bottom: 0;">
+                        <p style="margin: 0 0 5px 0; color: var(--servicenow-dark-gray); font-size: 12px;">Last Updated</p>
+                        <p style="margin: 0; font-weight: 500;">${new Date(customer.updated_at).toLocaleDateString()}</p>
+                    </div>
+                </div>
+            `;
+
+            renderInteractions(customer.interactions);
+        });
+
+    // Hide the interaction form by default
+    document.getElementById('addInteractionForm').style.display = 'none';
+    document.getElementById('customerModal').style.display = 'block';
+}
+
+function loadInteractions(customerId) {
+    fetch(`/api/customers/${customerId}/interactions`, {cache: 'no-cache'})
+        .then(response => response.json())
+        .then(interactions => {
+            if (interactions.error) {
+                document.getElementById('customerInteractions').innerHTML = `<p class="error">${interactions.error}</p>`;
+                return;
+            }
+
+            renderInteractions(interactions);
+        })
+        .catch(error => {
+            document.getElementById('customerInteractions').innerHTML = 
+                `<p class="error">Error loading interactions: ${error.message}</p>`;
+        });
+}
+
+function renderInteractions(interactions) {
+    const interactionsList = document.getElementById('customerInteractions');
+
+    if (interactions.length === 0) {
+        interactionsList.innerHTML = '<div style="padding: 15px; text-align: center; color: var(--servicenow-dark-gray);">No interactions recorded yet.</div>';
+        return;
+    }
+
+    interactionsList.innerHTML = '';
+
+    interactions.forEach(interaction => {
+        const item = document.createElement('div');
+        item.className = 'interaction-item';
+
+        // Get icon based on interaction type
+        let icon = '📞'; // default phone icon
+        if (interaction.type === 'email') icon = '✉️';
+        if (interaction.type === 'meeting') icon = '👥';
+
+        item.innerHTML = `
+            <div style="display: flex; align-items: flex-start;">
+                <div style="font-size: 18px; margin-right: 10px;">${icon}</div>
+                <div style="flex: 1;">
+                    <p class="interaction-type">${interaction.type}</p>
+                    <p style="margin: 5px 0;">${interaction.notes}</p>
+                    <p class="interaction-date">${new Date(interaction.created_at).toLocaleString()}</p>
+                </div>
+            </div>
+        `;
+        interactionsList.appendChild(item);
+    });
+}
+
+function toggleAddInteraction() {
+    const form = document.getElementById('addInteractionForm');
+    form.style.display = form.style.display === 'none' ? 'block' : 'none';
+}
+
+function cancelAddInteraction() {
+    document.getElementById('addInteractionForm').style.display = 'none';
+    document.getElementById('interactionNotes').value = '';
+    document.getElementById('interactionType').selectedIndex = 0;
+}
+
+function editCustomer() {
+    // This would be implemented in a real application
+    alert('Edit customer functionality would be implemented here');
+}
+
+function closeCustomerModal() {
+    document.getElementById('customerModal').style.display = 'none';
+    currentCustomerId = null;
+}
+
+function deleteCustomer() {
+    if (!currentCustomerId) return;
+
+    if (confirm('Are you sure you want to delete this customer? This action cannot be undone.')) {
+        fetch(`/api/customers/${currentCustomerId}`, {
+            method: 'DELETE'
+        })
+        .then(response => {
+            if (response.ok) {
+                alert('Customer deleted successfully');
+                closeCustomerModal();
+                if (!liveUpdates) loadCustomers(); // Refresh the customer list
+            } else {
+                return response.json().then(data => {
+                    throw new Error(data.error || 'Failed to delete customer');
+                });
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            alert('Error: ' + error.message);
+        });
+    }
+}
+
+function addInteraction() {
+    const type = document.getElementById('interactionType').value;
+    const notes = document.getElementById('interactionNotes').value;
+
+    if (!notes.trim()) {
+        alert('Please enter interaction notes');
+        return;
+    }
+
+    fetch('/api/interactions', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({
+            customer_id: currentCustomerId,
+            type: type,
+            notes: notes
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.error) {
+            alert(`Error: ${data.error}`);
+            return;
+        }
+
+        // Clear the form
+        document.getElementById('interactionNotes').value = '';
+
+        // Reload interactions unless the change feed will
+        if (!liveUpdates) loadInteractions(currentCustomerId);
+    })
+    .catch(error => {
+        alert(`Error adding interaction: ${error.message}`);
+    });
+}
+
+function openNewCustomerModal() {
+    document.getElementById('newCustomerModal').style.display = 'block';
+    document.getElementById('newCustomerError').textContent = '';
+
+    // Clear the form
+    document.getElementById('firstName').value = '';
+    document.getElementById('lastName').value = '';
+    document.getElementById('email').value = '';
+    document.getElementById('company').value = '';
+    document.getElementById('status').value = 'lead';
+}
+
+function closeNewCustomerModal() {
+    document.getElementById('newCustomerModal').style.display = 'none';
+}
+
+function createCustomer() {
+    const firstName = document.getElementById('firstName').value;
+    const lastName = document.getElementById('lastName').value;
+    const email = document.getElementById('email').value;
+    const company = document.getElementById('company').value;
+    const status = document.getElementById('status').value;
+
+    // Simple validation
+    if (!firstName || !lastName || !email) {
+        document.getElementById('newCustomerError').textContent = 'Please fill in all required fields';
+        return;
+    }
+
+    fetch('/api/customers', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({
+            first_name: firstName,
+            last_name: lastName,
+            email: email,
+            company: company,
+            status: status
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.error) {
+            document.getElementById('newCustomerError').textContent = data.error;
+            return;
+        }
+
+        // Close the modal; the change feed adds the new customer
+        closeNewCustomerModal();
+        if (!liveUpdates) loadCustomers();
+    })
+    .catch(error => {
+        document.getElementById('newCustomerError').textContent = `Error: ${error.message}`;
+    });
+}
+// Function to load customers table for the Customers view
+function loadCustomersTable() {
+    const generation = ++customersTableGeneration;
+    const tableBody = document.getElementById('customers-table-body');
+    let rowCount = 0;
+
+    fetchCustomerPages(customers => {
+        // A newer reload has started, abandon this one
+        if (generation !== customersTableGeneration) return false;
+
+        if (rowCount === 0) {
+            tableBody.innerHTML = '';
+        }
+
+        customers.forEach(customer => {
+            appendOrReplace(tableBody, createCustomerRow(customer));
+            rowCount++;
+        });
+    }, customerListParams('status-filter', CUSTOMER_ROW_FIELDS))
+    .then(() => {
+        if (generation === customersTableGeneration && rowCount === 0) {
+            tableBody.innerHTML = `<tr><td colspan="6" style="text-align: center; padding: 20px;">No customers found</td></tr>`;
+        }
+    })
+    .catch(error => {
+        tableBody.innerHTML = 
+            `<tr><td colspan="6" style="text-align: center; padding: 20px;">Error loading customers: ${error.message}</td></tr>`;
+    });
+}
+
+// Change feed. Customer and interaction events from /api/events are
+// applied to the lists already on the page instead of reloading them.
+// The browser reconnects on its own and resumes from the last event id;
+// a reset event means events were missed and the lists must be reloaded.
+let liveUpdates = false;
+
+function connectChangeEvents() {
+    if (!window.EventSource) return;
+
+    const source = new EventSource('/api/events');
+    source.onopen = () => { liveUpdates = true; };
+    source.onerror = () => { liveUpdates = false; };
+
+    source.addEventListener('customer.created', event => applyCustomerEvent(JSON.parse(event.data), false));
+    source.addEventListener('customer.updated', event => applyCustomerEvent(JSON.parse(event.data), false));
+    source.addEventListener('customer.deleted', event => applyCustomerEvent(JSON.parse(event.data), true));
+    source.addEventListener('interaction.created', event => {
+        const interaction = JSON.parse(event.data);
+        if (interaction.customer_id === currentCustomerId) loadInteractions(currentCustomerId);
+    });
+    source.addEventListener('reset', () => {
+        refreshCustomerList();
+        refreshCustomersTable();
+    });
+}
+
+function applyCustomerEvent(customer, deleted) {
+    applyCustomerDelta(document.getElementById('customerList'), 'dashboard-search', 'dashboard-status-filter',
+                       customer, deleted, createCustomerCard);
+    applyCustomerDelta(document.getElementById('customers-table-body'), 'customer-search', 'status-filter',
+                       customer, deleted, createCustomerRow);
+
+    if (customer.id === currentCustomerId) {
+        deleted ? closeCustomerModal() : openCustomerModal(customer.id);
+    }
+}
+
+function applyCustomerDelta(container, searchId, statusFilterId, customer, deleted, createElement) {
+    // Search results are left alone until the query changes
+    if (document.getElementById(searchId).value.trim()) return;
+
+    const existing = container.querySelector(`[data-customer-id="${customer.id}"]`);
+    if (deleted || !matchesStatusFilter(customer, statusFilterId)) {
+        if (existing) existing.remove();
+        return;
+    }
+    appendOrReplace(container, createElement(customer));
+}
+
+// Replace the element for the same customer if it is already listed,
+// otherwise append it, dropping any "no customers" placeholder
+function appendOrReplace(container, element) {
+    const existing = container.querySelector(`[data-customer-id="${element.dataset.customerId}"]`);
+    if (existing) {
+        existing.replaceWith(element);
+        return;
+    }
+    container.querySelectorAll(':scope > :not([data-customer-id])').forEach(placeholder => placeholder.remove());
+    container.appendChild(element);
+}
+
+// Function to load reports data
+function loadReportsData() {
+    fetch('/api/reports/summary')
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) return;
+
+            const prospectCount = data.status_counts.prospect || 0;
+            const leadCount = data.status_counts.lead || 0;
+            const customerCount = data.status_counts.customer || 0;
+
+            document.getElementById('prospect-count').textContent = prospectCount;
+            document.getElementById('lead-count').textContent = leadCount;
+            document.getElementById('customer-count').textContent = customerCount;
+
+            // Update chart heights based on counts
+            const maxHeight = 180;
+            const maxCount = Math.max(prospectCount, leadCount, customerCount) || 1;
+
+            const prospectHeight = (prospectCount / maxCount) * maxHeight;
+            const leadHeight = (leadCount / maxCount) * maxHeight;
+            const customerHeight = (customerCount / maxCount) * maxHeight;
+
+            document.querySelector('#main-reports .card:first-child div div:nth-child(1) div').style.height = `${prospectHeight}px`;
+            document.querySelector('#main-reports .card:first-child div div:nth-child(2) div').style.height = `${leadHeight}px`;
+            document.querySelector('#main-reports .card:first-child div div:nth-child(3) div').style.height = `${customerHeight}px`;
+
+            const callCount = data.interaction_counts.call || 0;
+            const emailCount = data.interaction_counts.email || 0;
+            const meetingCount = data.interaction_counts.meeting || 0;
+
+            document.getElementById('call-count').textContent = callCount;
+            document.getElementById('email-count').textContent = emailCount;
+            document.getElementById('meeting-count').textContent = meetingCount;
+
+            const maxInteractionCount = Math.max(callCount, emailCount, meetingCount) || 1;
+
+            const callHeight = (callCount / maxInteractionCount) * maxHeight;
+            const emailHeight = (emailCount / maxInteractionCount) * maxHeight;
+            const meetingHeight = (meetingCount / maxInteractionCount) * maxHeight;
+
+            document.querySelector('#main-reports .card:nth-child(2) div div:nth-child(1) div').style.height = `${callHeight}px`;
+            document.querySelector('#main-reports .card:nth-child(2) div div:nth-child(2) div').style.height = `${emailHeight}px`;
+            document.querySelector('#main-reports .card:nth-child(2) div div:nth-child(3) div').style.height = `${meetingHeight}px`;
+
+            renderTopCompanies(data.top_companies);
+            renderRecentActivity(data.recent_activity);
+            loadActivityTrend();
+        })
+        .catch(error => {
+            document.getElementById('recent-activity').innerHTML = 
+                `<p class="error">Error loading reports: ${error.message}</p>`;
+        });
+}
+
+function loadActivityTrend() {
+    const granularity = document.getElementById('activity-granularity').value;
+    fetch(`/api/reports/activity?granularity=${granularity}`, {cache: 'no-cache'})
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) return;
+            renderActivityTrend(data.buckets);
+        });
+}
+
+function renderActivityTrend(buckets) {
+    const trendEl = document.getElementById('activity-trend');
+    trendEl.innerHTML = '';
+
+    const maxHeight = 140;
+    const maxTotal = Math.max(...buckets.map(bucket => bucket.total)) || 1;
+
+    buckets.forEach(bucket => {
+        const bar = document.createElement('div');
+        bar.style.flex = '1';
+        bar.style.backgroundColor = 'var(--servicenow-light-blue)';
+        bar.style.height = `${(bucket.total / maxTotal) * maxHeight}px`;
+        bar.style.minHeight = '1px';
+        bar.title = `${bucket.bucket}: ${bucket.total} interaction${bucket.total === 1 ? '' : 's'}`;
+        trendEl.appendChild(bar);
+    });
+}
+
+function renderTopCompanies(topCompanies) {
+    const topCompaniesEl = document.getElementById('top-companies');
+    topCompaniesEl.innerHTML = '';
+
+    if (topCompanies.length === 0) {
+        topCompaniesEl.innerHTML = '<p style="text-align: center; color: var(--servicenow-dark-gray);">No company data available</p>';
+        return;
+    }
+
+    topCompanies.forEach(({company, count}) => {
+        const item = document.createElement('div');
+        item.style.padding = '10px';
+        item.style.borderBottom = '1px solid var(--servicenow-border)';
+        item.style.display = 'flex';
+        item.style.justifyContent = 'space-between';
+
+        item.innerHTML = `
+            <span>${company}</span>
+            <span style="font-weight: 500;">${count} customer${count > 1 ? 's' : ''}</span>
+        `;
+
+        topCompaniesEl.appendChild(item);
+    });
+}
+
+function renderRecentActivity(recentActivity) {
+    const recentActivityEl = document.getElementById('recent-activity');
+    recentActivityEl.innerHTML = '';
+
+    if (recentActivity.length === 0) {
+        recentActivityEl.innerHTML = '<p style="text-align: center; color: var(--servicenow-dark-gray);">No recent activity</p>';
+        return;
+    }
+
+    recentActivity.forEach(activity => {
+        const item = document.createElement('div');
+        item.style.padding = '10px';
+        item.style.borderBottom = '1px solid var(--servicenow-border)';
+
+        // Get icon based on interaction type
+        let icon = '📞'; // default phone icon
+        if (activity.type === 'email') icon = '✉️';
+        if (activity.type === 'meeting') icon = '👥';
+
+        item.innerHTML = `
+            <div style="display: flex; align-items: flex-start;">
+                <div style="font-size: 18px; margin-right: 10px;">${icon}</div>
+                <div>
+                    <p style="margin: 0; font-weight: 500;">${activity.customer}</p>
+                    <p style="margin: 5px 0 0 0;">${activity.notes}</p>
+                    <p style="margin: 5px 0 0 0; font-size: 12px; color: var(--servicenow-dark-gray);">${new Date(activity.created_at).toLocaleString()}</p>
+                </div>
+            </div>
+        `;
+
+        recentActivityEl.appendChild(item);
+    });
+}
@@ -1,11 +1,25 @@
 import pytest
+import sqlalchemy
 import json
-from app import app, db, Customer, Interaction
+import base64
+import gzip
+import re
+import sqlite3
+import threading
+import time
+import client as onix_client
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from werkzeug.serving import make_server
+from app import create_app, db, Customer, Interaction, datetime_text, init_db, run_migrations, MIGRATIONS, SQLiteCacheBackend, ReportCounter, webhook_retry_delay
 
 @pytest.fixture
-def client():
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+def app():
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'AUTO_INIT_DB': False  # tests create the schema themselves
+    })
     
     with app.app_context():
         db.create_all()
@@ -22,26 +36,163 @@ def client():
         db.session.add(test_customer)
         db.session.commit()
     
-    with app.test_client() as client:
-        yield client
+    yield app
     
     with app.app_context():
         db.drop_all()
 
+@pytest.fixture
+def client(app):
+    with app.test_client() as client:
+        yield client
+
 def test_home_page(client):
     """Test that the home page loads correctly"""
     response = client.get('/')
     assert response.status_code == 200
     assert b"Onyx CRM" in response.data
 
+def test_dashboard_assets(client):
+    """Test that the dashboard references hashed, precompressed, long-cached assets"""
+    html = client.get('/').get_data(as_text=True)
+    script_url = re.search(r'src="(/assets/js/dashboard\.[0-9a-f]+\.js)"', html).group(1)
+    
+    response = client.get(script_url, headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'immutable' in response.headers['Cache-Control']
+    assert b'function loadCustomers' in gzip.decompress(response.data)
+    
+    revalidated = client.get(script_url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+    assert client.get('/assets/js/dashboard.0000.js').status_code == 404
+
+def test_json_compression(client):
+    """Test gzip compression of JSON responses above the size threshold"""
+    records = [
+        {'first_name': 'Gzip', 'last_name': str(i), 'email': f'gzip{i}@example.com'}
+        for i in range(20)
+    ]
+    client.post('/api/customers/bulk', data=json.dumps(records), content_type='application/json')
+    
+    response = client.get('/api/customers', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len(json.loads(gzip.decompress(response.data))['customers']) == 21
+    
+    response = client.get('/api/customers')
+    assert 'Content-Encoding' not in response.headers
+    
+    response = client.get('/api/customers/test-customer-id', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
 def test_get_customers(client):
     """Test getting all customers"""
     response = client.get('/api/customers')
     data = response.get_json()
     assert response.status_code == 200
-    assert len(data) == 1
+    assert len(data['customers']) == 1
+    assert data['customers'][0]['email'] == 'test@example.com'
+    assert data['next_cursor'] is None
+
+def test_get_customers_pagination(client):
+    """Test walking the customer list with keyset pagination"""
+    for i in range(4):
+        client.post(
+            '/api/customers',
+            data=json.dumps({
+                'first_name': f'Page{i}',
+                'last_name': 'User',
+                'email': f'page{i}@example.com'
+            }),
+            content_type='application/json'
+        )
+    
+    seen = []
+    url = '/api/customers?limit=2'
+    while url:
+        response = client.get(url)
+        data = response.get_json()
+        assert response.status_code == 200
+        assert len(data['customers']) <= 2
+        seen.extend(customer['id'] for customer in data['customers'])
+        url = f"/api/customers?limit=2&after={data['next_cursor']}" if data['next_cursor'] else None
+    
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+def test_get_customers_all_opt_in(client):
+    """Test the explicit opt-in for the unpaginated customer list"""
+    response = client.get('/api/customers?all=true')
+    data = response.get_json()
+    assert response.status_code == 200
+    assert isinstance(data, list)
     assert data[0]['email'] == 'test@example.com'
 
+def test_get_customers_invalid_cursor(client):
+    """Test that malformed pagination parameters are rejected"""
+    assert client.get('/api/customers?after=not-a-cursor').status_code == 400
+    
+    # Well-formed cursors whose values are not scalars are rejected too
+    for position in (['email', ['x'], 'id'], ['email', {'x': 1}, 'id'], ['email', 'x', ['id']], ['email', None, 'id']):
+        cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+        response = client.get(f'/api/customers?sort=email&after={cursor}')
+        assert response.status_code == 400
+        assert response.get_json() == {'error': 'Invalid cursor'}
+    assert client.get('/api/customers?limit=0').status_code == 400
+
+def test_get_customers_filter_sort_fields(client):
+    """Test filtering, sorting and field projection on the customer list"""
+    records = [
+        {'first_name': 'Alice', 'last_name': 'Zed', 'email': 'alice@example.com', 'company': 'Acme', 'status': 'lead'},
+        {'first_name': 'Bob', 'last_name': 'Young', 'email': 'bob@example.com', 'company': 'Acme', 'status': 'prospect'},
+        {'first_name': 'Carol', 'last_name': 'Xu', 'email': 'carol@example.com', 'status': 'lead'}
+    ]
+    client.post('/api/customers/bulk', data=json.dumps(records), content_type='application/json')
+    
+    response = client.get('/api/customers?status=lead&fields=email,status')
+    data = response.get_json()
+    assert response.status_code == 200
+    assert sorted(customer['email'] for customer in data['customers']) == ['alice@example.com', 'carol@example.com']
+    assert all(set(customer) == {'email', 'status'} for customer in data['customers'])
+    
+    data = client.get('/api/customers?company=Acme&fields=first_name').get_json()
+    assert sorted(customer['first_name'] for customer in data['customers']) == ['Alice', 'Bob']
+    
+    # Sorted keyset pagination walks every row exactly once
+    names = []
+    url = '/api/customers?sort=-last_name&limit=1&fields=last_name'
+    while url:
+        data = client.get(url).get_json()
+        names.extend(customer['last_name'] for customer in data['customers'])
+        url = f"/api/customers?sort=-last_name&limit=1&fields=last_name&after={data['next_cursor']}" if data['next_cursor'] else None
+    assert names == ['Zed', 'Young', 'Xu', 'User']
+    
+    data = client.get('/api/customers?sort=company&all=true&fields=email').get_json()
+    assert [customer['email'] for customer in data][-1] == 'test@example.com'
+    
+    assert client.get('/api/customers?created_after=2000-01-01T00:00:00').get_json()['customers']
+    assert client.get('/api/customers?created_after=yesterday').status_code == 400
+    assert client.get('/api/customers?fields=password').status_code == 400
+    assert client.get('/api/customers?sort=notes').status_code == 400
+
+def test_get_customers_columnar(client):
+    """Test the columnar list format and that it matches the row format"""
+    client.post('/api/interactions', json={'customer_id': 'test-customer-id', 'type': 'call', 'notes': 'Columnar'})
+    rows = client.get('/api/customers').get_json()['customers']
+    
+    data = client.get('/api/customers?format=columnar').get_json()
+    assert data['customers'] == {field: [row[field] for row in rows] for field in rows[0]}
+    assert datetime.fromisoformat(data['customers']['created_at'][0])
+    
+    data = client.get('/api/customers?format=columnar&all=true&fields=id,email&status=nobody').get_json()
+    assert data == {'id': [], 'email': []}
+    
+    data = client.get('/api/customers/test-customer-id/interactions?format=columnar').get_json()
+    assert data['notes'] == ['Columnar']
+    assert data['created_at'] == [row['created_at'] for row in client.get('/api/customers/test-customer-id/interactions').get_json()]
+    
+    assert client.get('/api/customers?format=xml').status_code == 400
+
 def test_get_customer(client):
     """Test getting a single customer"""
     response = client.get('/api/customers/test-customer-id')
@@ -50,6 +201,33 @@ def test_get_customer(client):
     assert data['first_name'] == 'Test'
     assert data['last_name'] == 'User'
 
+def test_get_customer_include_interactions(client):
+    """Test embedding a customer's latest interactions in the customer response"""
+    for notes in ['First', 'Second', 'Third']:
+        client.post(
+            '/api/interactions',
+            data=json.dumps({'customer_id': 'test-customer-id', 'type': 'call', 'notes': notes}),
+            content_type='application/json'
+        )
+    
+    response = client.get('/api/customers/test-customer-id?include=interactions')
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data['email'] == 'test@example.com'
+    assert [interaction['notes'] for interaction in data['interactions']] == ['Third', 'Second', 'First']
+    
+    data = client.get('/api/customers/test-customer-id?include=interactions&interactions_limit=2').get_json()
+    assert [interaction['notes'] for interaction in data['interactions']] == ['Third', 'Second']
+    
+    assert client.get('/api/customers/nonexistent-id?include=interactions').status_code == 404
+    assert client.get('/api/customers/test-customer-id?include=orders').status_code == 400
+
+def test_get_customer_include_no_interactions(client):
+    """Test embedding interactions for a customer that has none"""
+    data = client.get('/api/customers/test-customer-id?include=interactions').get_json()
+    assert data['interactions'] == []
+    assert client.get('/api/customers/nonexistent-id/interactions').status_code == 404
+
 def test_get_nonexistent_customer(client):
     """Test getting a customer that doesn't exist"""
     response = client.get('/api/customers/nonexistent-id')
@@ -80,7 +258,7 @@ def test_create_customer(client):
     
     # Verify customer was added to database
     get_response = client.get('/api/customers')
-    customers = get_response.get_json()
+    customers = get_response.get_json()['customers']
     assert len(customers) == 2
 
 def test_create_customer_duplicate_email(client):
@@ -195,3 +373,864 @@ def test_get_customer_interactions(client):
     
     assert response.status_code == 200
     assert len(interactions) >= 1  # There might be more from other tests
+
+def test_reports_summary(client):
+    """Test the aggregated reports summary endpoint"""
+    for interaction_type in ['call', 'call', 'meeting']:
+        client.post(
+            '/api/interactions',
+            data=json.dumps({
+                'customer_id': 'test-customer-id',
+                'type': interaction_type,
+                'notes': f'{interaction_type} notes'
+            }),
+            content_type='application/json'
+        )
+    
+    response = client.get('/api/reports/summary?recent=2')
+    data = response.get_json()
+    
+    assert response.status_code == 200
+    assert data['total_customers'] == 1
+    assert data['total_interactions'] == 3
+    assert data['status_counts'] == {'customer': 1}
+    assert data['interaction_counts'] == {'call': 2, 'meeting': 1}
+    assert data['top_companies'] == [{'company': 'Test Company', 'count': 1}]
+    assert len(data['recent_activity']) == 2
+    assert data['recent_activity'][0]['customer'] == 'Test User'
+
+def test_report_counters_follow_writes(app, client):
+    """Test that report counters track creates, updates and deletes, and can be rebuilt"""
+    created = client.post('/api/customers', json={
+        'first_name': 'Count', 'last_name': 'Me', 'email': 'count@example.com', 'company': 'Test Company', 'status': 'lead'
+    }).get_json()
+    client.post('/api/interactions', json={'customer_id': created['id'], 'type': 'email', 'notes': 'Counted'})
+    client.put(f"/api/customers/{created['id']}", json={'status': 'prospect', 'company': 'Other Co'})
+    
+    data = client.get('/api/reports/summary').get_json()
+    assert data['total_customers'] == 2
+    assert data['status_counts'] == {'customer': 1, 'prospect': 1}
+    assert data['interaction_counts'] == {'email': 1}
+    assert data['top_companies'] == [{'company': 'Other Co', 'count': 1}, {'company': 'Test Company', 'count': 1}]
+    
+    client.delete(f"/api/customers/{created['id']}")
+    data = client.get('/api/reports/summary').get_json()
+    assert data['total_customers'] == 1
+    assert data['total_interactions'] == 0
+    assert data['status_counts'] == {'customer': 1}
+    
+    # Simulate drift and repair it with the CLI command
+    with app.app_context():
+        ReportCounter.query.filter_by(dimension='total', key='customers').update({'count': 99})
+        db.session.commit()
+    result = app.test_cli_runner().invoke(args=['rebuild-report-counters'])
+    assert 'Rebuilt' in result.output
+    with app.app_context():
+        assert ReportCounter.query.filter_by(dimension='total', key='customers').one().count == 1
+
+def test_reports_activity(app, client):
+    """Test daily and weekly activity rollups and the trend endpoint"""
+    with app.app_context():
+        db.session.add_all([
+            Interaction(id='rollup-1', customer_id='test-customer-id', type='call', notes='Mon', created_at=datetime(2024, 3, 4, 9)),
+            Interaction(id='rollup-2', customer_id='test-customer-id', type='email', notes='Mon', created_at=datetime(2024, 3, 4, 17)),
+            Interaction(id='rollup-3', customer_id='test-customer-id', type='call', notes='Sun', created_at=datetime(2024, 3, 10, 12)),
+        ])
+        db.session.commit()
+    
+    data = client.get('/api/reports/activity?granularity=day&from=2024-03-04&to=2024-03-10').get_json()
+    assert [bucket['total'] for bucket in data['buckets']] == [2, 0, 0, 0, 0, 0, 1]
+    assert data['buckets'][0]['by_type'] == {'call': 1, 'email': 1}
+    assert data['buckets'][0]['by_status'] == {'customer': 2}
+    
+    # Week buckets start on Monday, and a status change moves existing activity
+    client.put('/api/customers/test-customer-id', json={'status': 'prospect'})
+    data = client.get('/api/reports/activity?granularity=week&from=2024-03-06&to=2024-03-11').get_json()
+    assert data['from'] == '2024-03-04'
+    assert [(bucket['bucket'], bucket['total']) for bucket in data['buckets']] == [('2024-03-04', 3), ('2024-03-11', 0)]
+    assert data['buckets'][0]['by_status'] == {'prospect': 3}
+    
+    assert client.get('/api/reports/activity?granularity=month').status_code == 400
+    assert client.get('/api/reports/activity?from=2024-03-10&to=2024-03-01').status_code == 400
+    assert client.get('/api/reports/activity?from=yesterday').status_code == 400
+
+def test_run_migrations(app, client):
+    """Test that migrations are recorded once and create the secondary indexes"""
+    with app.app_context():
+        applied = run_migrations()
+        assert applied == [version for version, _, _ in MIGRATIONS]
+        assert run_migrations() == []
+        
+        index_names = {
+            row[0] for row in db.session.execute(
+                db.text("SELECT name FROM sqlite_master WHERE type = 'index'")
+            )
+        }
+        assert 'ix_interaction_customer_id_created_at' in index_names
+        assert 'ix_customer_status_created_at' in index_names
+
+def test_lazy_database_init(tmp_path):
+    """Test that creating the app leaves the database alone until the first request"""
+    path = tmp_path / 'lazy.db'
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{path}", 'WEBHOOK_DISPATCHER': False})
+    assert not path.exists()
+    
+    with app.test_client() as client:
+        assert client.get('/api/customers').get_json()['customers'] == []
+    with app.app_context():
+        assert run_migrations() == []
+    
+    runner = app.test_cli_runner()
+    assert 'Loaded sample data' in runner.invoke(args=['load-sample-data']).output
+    assert 'already has customers' in runner.invoke(args=['load-sample-data']).output
+    with app.app_context():
+        assert Customer.query.count() == 3
+        db.drop_all()
+
+def test_concurrent_database_init(tmp_path):
+    """Test that workers initialising a new database at once neither fail nor repeat migrations"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'race.db'}", 'WEBHOOK_DISPATCHER': False})
+    barrier = threading.Barrier(4)
+    results = []
+    
+    def worker():
+        with app.app_context():
+            barrier.wait()
+            try:
+                results.append(init_db())
+            except Exception as e:
+                results.append(e)
+    
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert sorted(results, key=len) == [[], [], [], [version for version, _, _ in MIGRATIONS]]
+    with app.app_context():
+        db.drop_all()
+
+def test_sqlite_pragmas_applied(app, client):
+    """Test that the configured SQLite profile is applied to new connections"""
+    with app.app_context():
+        assert db.session.execute(db.text('PRAGMA foreign_keys')).scalar() == 1
+        assert db.session.execute(db.text('PRAGMA busy_timeout')).scalar() == 5000
+
+def test_sqlite_pragmas_per_app():
+    """Test that each app's engine gets its own profile, and other engines need no app context"""
+    tuned = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:', 'SQLITE_PRAGMAS': {'cache_size': -1234}})
+    plain = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:', 'SQLITE_PROFILE': 'default'})
+    with tuned.app_context():
+        assert db.session.execute(db.text('PRAGMA cache_size')).scalar() == -1234
+    with plain.app_context():
+        assert db.session.execute(db.text('PRAGMA cache_size')).scalar() == -2000
+    
+    with sqlalchemy.create_engine('sqlite://').connect() as connection:
+        assert connection.execute(db.text('PRAGMA cache_size')).scalar() == -2000
+
+def test_bulk_create_customers(client):
+    """Test bulk importing customers from a JSON array with per-row results"""
+    records = [
+        {'first_name': 'Bulk', 'last_name': 'One', 'email': 'bulk1@example.com'},
+        {'first_name': 'Bulk', 'last_name': 'Two', 'email': 'test@example.com'},
+        {'first_name': 'Bulk', 'last_name': 'Three'},
+        {'first_name': 'Bulk', 'last_name': 'Four', 'email': 'bulk1@example.com'},
+        {'first_name': 'Bulk', 'last_name': 'Five', 'email': 'bulk5@example.com', 'status': 'customer'}
+    ]
+    
+    response = client.post(
+        '/api/customers/bulk',
+        data=json.dumps(records),
+        content_type='application/json'
+    )
+    
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data['created'] == 2
+    assert data['failed'] == 3
+    assert [result['status'] for result in data['results']] == ['created', 'error', 'error', 'error', 'created']
+    assert 'already exists' in data['results'][1]['error']
+    assert data['results'][2]['error'] == 'email is required'
+    
+    customer = client.get(f"/api/customers/{data['results'][4]['id']}").get_json()
+    assert customer['status'] == 'customer'
+    
+    # Non-string values are per-record errors, not a failed request
+    response = client.post('/api/customers/bulk', json=[
+        {'first_name': 'Bulk', 'last_name': 'List', 'email': ['bulk6@example.com']},
+        {'first_name': 'Bulk', 'last_name': 'Dict', 'email': {'address': 'bulk7@example.com'}},
+        {'first_name': 'Bulk', 'last_name': 'Seven', 'email': 'bulk7@example.com'}
+    ])
+    assert response.status_code == 200
+    assert [result.get('error') for result in response.get_json()['results']] == ['email must be a string', 'email must be a string', None]
+
+def test_bulk_create_customers_ndjson(client):
+    """Test bulk importing customers from an NDJSON stream"""
+    body = '\n'.join([
+        json.dumps({'first_name': 'Nd', 'last_name': 'One', 'email': 'nd1@example.com'}),
+        'not json',
+        json.dumps({'first_name': 'Nd', 'last_name': 'Two', 'email': 'nd2@example.com'})
+    ])
+    
+    response = client.post('/api/customers/bulk', data=body, content_type='application/x-ndjson')
+    
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data['created'] == 2
+    assert data['results'][1]['status'] == 'error'
+    assert client.get('/api/customers?all=true').get_json()[-1]['email'] in ('nd1@example.com', 'nd2@example.com')
+
+def test_batch_create_interactions(client):
+    """Test batch interaction ingestion with per-item results"""
+    client.get('/api/customers/test-customer-id/interactions')
+    records = [
+        {'customer_id': 'test-customer-id', 'type': 'call', 'notes': 'Batch one'},
+        {'customer_id': 'missing-customer', 'type': 'call', 'notes': 'Nobody home'},
+        {'customer_id': 'test-customer-id', 'type': 'email'},
+        {'customer_id': 'test-customer-id', 'type': 'meeting', 'notes': 'Batch two'}
+    ]
+
+    response = client.post(
+        '/api/interactions/batch',
+        data=json.dumps(records),
+        content_type='application/json'
+    )
+
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data['created'] == 2
+    assert data['failed'] == 2
+    assert [result['status'] for result in data['results']] == ['created', 'error', 'error', 'created']
+    assert data['results'][1]['error'] == 'Customer not found'
+    assert data['results'][2]['error'] == 'notes is required'
+
+    # The cached interaction list for the customer was invalidated
+    interactions = client.get('/api/customers/test-customer-id/interactions').get_json()
+    assert sorted(interaction['notes'] for interaction in interactions) == ['Batch one', 'Batch two']
+
+    # Non-string values are per-item errors, not a failed request
+    response = client.post('/api/interactions/batch', json=[
+        {'customer_id': ['test-customer-id'], 'type': 'call', 'notes': 'Listed id'},
+        {'customer_id': 'test-customer-id', 'type': 'call', 'notes': {'text': 'Nested notes'}},
+        {'customer_id': 'test-customer-id', 'type': 'call', 'notes': 'Batch three'}
+    ])
+    assert response.status_code == 200
+    assert [result.get('error') for result in response.get_json()['results']] == [
+        'customer_id must be a string', 'notes must be a string', None
+    ]
+
+    response = client.post('/api/interactions/batch', json={'customer_id': 'test-customer-id'})
+    assert response.status_code == 400
+
+def test_write_behind_interactions(tmp_path, monkeypatch):
+    """Test queued interaction writes in async and group-commit modes"""
+    # The writer thread needs a database file; each thread would get its own :memory: database
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'write_behind.db'}", 'WEBHOOK_DISPATCHER': False})
+    try:
+        with app.app_context():
+            db.create_all()
+            db.session.add(Customer(id='queued-customer', first_name='Queued', last_name='User', email='queued@example.com'))
+            db.session.commit()
+        
+        with app.test_client() as client:
+            app.config['INTERACTION_WRITE_MODE'] = 'async'
+            response = client.post('/api/interactions', json={
+                'customer_id': 'queued-customer', 'type': 'call', 'notes': 'Queued call'
+            })
+            assert response.status_code == 202
+            interaction_id = response.get_json()['id']
+            
+            app.extensions['onix']['interaction_writer'].flush()
+            interactions = client.get('/api/customers/queued-customer/interactions').get_json()
+            assert [interaction['id'] for interaction in interactions] == [interaction_id]
+            
+            app.config['INTERACTION_WRITE_MODE'] = 'group'
+            response = client.post('/api/interactions', json={
+                'customer_id': 'queued-customer', 'type': 'email', 'notes': 'Grouped email'
+            })
+            assert response.status_code == 201
+            assert len(client.get('/api/customers/queued-customer/interactions').get_json()) == 2
+            
+            response = client.post('/api/interactions', json={
+                'customer_id': 'missing-customer', 'type': 'email', 'notes': 'Nobody home'
+            })
+            assert response.status_code == 404
+            
+            # A failure after the commit must neither hang the request nor stop the writer
+            def broken_invalidate(*namespaces):
+                raise sqlite3.OperationalError('database is locked')
+            monkeypatch.setattr('app.invalidate_responses', broken_invalidate)
+            for notes in ('After a cache failure', 'Writer still running'):
+                response = client.post('/api/interactions', json={
+                    'customer_id': 'queued-customer', 'type': 'call', 'notes': notes
+                })
+                assert response.status_code == 201
+        
+        writer = app.extensions['onix']['interaction_writer']
+        writer.stop()
+        assert writer.stats()['written'] >= 2
+    finally:
+        with app.app_context():
+            db.drop_all()
+
+def test_changes_feed(app, client):
+    """Test incremental sync through the append-only change log"""
+    since = client.get('/api/changes').get_json()['next_since']
+    
+    created = client.post('/api/customers', json={
+        'first_name': 'Change', 'last_name': 'Log', 'email': 'changes@example.com'
+    }).get_json()
+    client.put(f"/api/customers/{created['id']}", json={'company': 'Synced Co'})
+    client.post('/api/interactions', json={'customer_id': created['id'], 'type': 'call', 'notes': 'Logged'})
+    client.delete(f"/api/customers/{created['id']}")
+    
+    first = client.get(f'/api/changes?since={since}&limit=3').get_json()
+    assert first['has_more'] is True
+    rest = client.get(f"/api/changes?since={first['next_since']}&limit=3").get_json()
+    assert rest['has_more'] is False
+    
+    changes = first['changes'] + rest['changes']
+    assert [(change['table'], change['operation']) for change in changes] == [
+        ('customer', 'insert'), ('customer', 'update'), ('interaction', 'insert'),
+        ('interaction', 'delete'), ('customer', 'delete')
+    ]
+    assert [change['seq'] for change in changes] == sorted(change['seq'] for change in changes)
+    assert changes[1]['data']['company'] == 'Synced Co'
+    assert changes[1]['data']['created_at'] == created['created_at']
+    assert changes[4]['id'] == created['id']
+    
+    # Whole-second datetimes in change data match the API, without a zero fraction
+    with app.app_context():
+        db.session.add(Customer(id='whole-second', first_name='Whole', last_name='Second', email='whole@example.com',
+                                created_at=datetime(2024, 1, 1, 9, 0), updated_at=datetime(2024, 1, 1, 9, 0)))
+        db.session.commit()
+    whole = client.get(f"/api/changes?since={rest['next_since']}").get_json()['changes'][0]['data']
+    assert whole['created_at'] == whole['updated_at'] == '2024-01-01T09:00:00'
+    assert whole == client.get('/api/customers/whole-second').get_json()
+    
+    # Change times carry the stored milliseconds, in the API's isoformat() form
+    with app.app_context():
+        stored = db.session.execute(db.text('SELECT changed_at FROM change_log WHERE seq = :seq'), {'seq': changes[0]['seq']}).scalar()
+    assert changes[0]['changed_at'] == datetime.fromisoformat(stored).isoformat()
+    assert changes[0]['changed_at'][:23] == stored.replace(' ', 'T')[:23]
+    
+    assert client.get('/api/changes?limit=0').status_code == 400
+
+def read_events(response, count):
+    """Read count SSE events (skipping comments) from a streaming response"""
+    events = []
+    for chunk in response.response:
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if chunk.startswith(('retry:', ':')):
+            continue
+        fields = dict(line.split(': ', 1) for line in chunk.strip().split('\n'))
+        events.append(fields)
+        if len(events) == count:
+            break
+    response.close()
+    return events
+
+def test_event_stream(app, client):
+    """Test the SSE change feed, Last-Event-ID resume and writes from other workers"""
+    app.config['EVENT_HEARTBEAT'] = 0.05
+    app.config['EVENT_POLL_INTERVAL'] = 0.01
+    since = client.get('/api/changes').get_json()['next_since']
+    created = client.post('/api/customers', json={
+        'first_name': 'Event', 'last_name': 'Source', 'email': 'events@example.com'
+    }).get_json()
+    client.put(f"/api/customers/{created['id']}", json={'status': 'prospect'})
+    client.post('/api/interactions', json={'customer_id': created['id'], 'type': 'call', 'notes': 'Streamed'})
+    client.delete(f"/api/customers/{created['id']}")
+    
+    # Resume from just before the customer was created
+    response = client.get('/api/events', headers={'Last-Event-ID': str(since)}, buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    events = read_events(response, 5)
+    assert [event['event'] for event in events] == [
+        'customer.created', 'customer.updated', 'interaction.created', 'interaction.deleted', 'customer.deleted'
+    ]
+    assert json.loads(events[1]['data'])['status'] == 'prospect'
+    assert json.loads(events[-1]['data'])['id'] == created['id']
+    assert events[-1]['id'] == str(client.get('/api/changes').get_json()['next_since'])
+    
+    # A write that bypasses this process's notifications, as another worker's would, is polled for
+    response = client.get('/api/events', buffered=False)
+    assert next(iter(response.response)).startswith(b'retry:')
+    with app.app_context():
+        db.session.add(Customer(id='other-worker', first_name='Other', last_name='Worker', email='other@example.com'))
+        db.session.commit()
+    event = read_events(response, 1)[0]
+    assert event['event'] == 'customer.created'
+    assert json.loads(event['data'])['id'] == 'other-worker'
+    
+    # An id from before the change log, or from another database, asks the client to reload
+    for stale in ('a1b2c3d4-12', '999999'):
+        response = client.get('/api/events', headers={'Last-Event-ID': stale}, buffered=False)
+        assert read_events(response, 1)[0]['event'] == 'reset'
+
+def test_webhook_retry_delay():
+    """Test that webhook backoff doubles, is capped, and survives very long failure streaks"""
+    assert [webhook_retry_delay(failures, 1.0, 300) for failures in (1, 2, 3, 9, 10)] == [1.0, 2.0, 4.0, 256.0, 300]
+    assert webhook_retry_delay(5000, 1.0, 300) == 300
+
+def test_webhook_delivery(tmp_path):
+    """Test batched, ordered webhook delivery with retry after a failed POST"""
+    received = []
+    
+    class Receiver(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            received.append((body, self.headers.get('X-Onix-Signature')))
+            # Fail the first delivery so the batch has to be retried
+            self.send_response(503 if len(received) == 1 else 204)
+            self.end_headers()
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Receiver)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    # The dispatcher threads need a database file; each thread would get its own :memory: database
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'webhooks.db'}",
+        'WEBHOOK_RETRY_BASE': 0.05,
+        'WEBHOOK_POLL_INTERVAL': 0.05
+    })
+    try:
+        with app.app_context():
+            db.create_all()
+        
+        with app.test_client() as client:
+            assert client.post('/api/webhooks', json={'url': 'ftp://example.com'}).status_code == 400
+            assert client.post('/api/webhooks', json={
+                'url': 'http://example.com', 'events': ['customer.exploded']
+            }).status_code == 400
+            for invalid in ({'events': [['customer.created']]}, {'events': [{'type': 'customer.created'}]},
+                            {'secret': 12345}, {'secret': {'key': 'value'}}):
+                assert client.post('/api/webhooks', json={'url': 'http://example.com', **invalid}).status_code == 400
+            assert client.get('/api/webhooks').get_json() == []
+            
+            response = client.post('/api/webhooks', json={
+                'url': f'http://127.0.0.1:{server.server_port}/hook',
+                'events': ['customer.created'],
+                'secret': 'shh'
+            })
+            assert response.status_code == 201
+            subscription = response.get_json()
+            assert 'secret' not in subscription
+            
+            results = client.post('/api/customers/bulk', json=[
+                {'first_name': 'Hook', 'last_name': str(i), 'email': f'hook{i}@example.com'} for i in range(250)
+            ]).get_json()['results']
+            # Updates are not subscribed to and must be skipped
+            client.put(f"/api/customers/{results[0]['id']}", json={'status': 'prospect'})
+            
+            deadline = time.time() + 10
+            while time.time() < deadline and sum(len(body['events']) for body, _ in received[1:]) < 250:
+                time.sleep(0.05)
+            
+            delivered = [event for body, _ in received[1:] for event in body['events']]
+            assert len(delivered) == 250
+            assert {event['type'] for event in delivered} == {'customer.created'}
+            assert [event['id'] for event in delivered] == sorted(event['id'] for event in delivered)
+            # The failed batch was retried with the same events, and batching kept the POST count low
+            assert received[0][0]['events'] == received[1][0]['events']
+            assert len(received) <= 5
+            assert all(signature.startswith('sha256=') for _, signature in received)
+            
+            status = client.get('/api/webhooks').get_json()[0]
+            assert status['failures'] == 0
+            assert client.delete(f"/api/webhooks/{subscription['id']}").status_code == 200
+        
+        dispatcher = app.extensions['onix']['webhook_dispatcher']
+        dispatcher.stop()
+        assert dispatcher.stats()['delivered'] == 250
+    finally:
+        server.shutdown()
+        with app.app_context():
+            db.drop_all()
+
+def test_export_customers_ndjson(client):
+    """Test streaming the customer export as NDJSON"""
+    response = client.get('/api/export/customers')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])['email'] == 'test@example.com'
+
+def test_export_interactions_csv(client):
+    """Test streaming the interaction export as CSV"""
+    client.post(
+        '/api/interactions',
+        data=json.dumps({'customer_id': 'test-customer-id', 'type': 'call', 'notes': 'Exported, with a comma'}),
+        content_type='application/json'
+    )
+    
+    response = client.get('/api/export/interactions?format=csv')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0] == 'id,customer_id,type,notes,created_at'
+    assert '"Exported, with a comma"' in lines[1]
+    
+    assert client.get('/api/export/interactions?format=xml').status_code == 400
+
+def test_search(client):
+    """Test ranked full-text search over customers and interaction notes"""
+    client.post(
+        '/api/interactions',
+        data=json.dumps({'customer_id': 'test-customer-id', 'type': 'call', 'notes': 'Discussed renewal pricing'}),
+        content_type='application/json'
+    )
+    
+    response = client.get('/api/search?q=renew')
+    data = response.get_json()
+    assert response.status_code == 200
+    assert len(data['results']) == 1
+    assert data['results'][0]['type'] == 'interaction'
+    assert data['results'][0]['customer'] == 'Test User'
+    assert '<mark>renewal</mark>' in data['results'][0]['snippet']
+    
+    response = client.get('/api/search?q=test&type=customers')
+    data = response.get_json()
+    assert [result['id'] for result in data['results']] == ['test-customer-id']
+    
+    # Index stays in sync with updates and deletes
+    client.put(
+        '/api/customers/test-customer-id',
+        data=json.dumps({'company': 'Zyxwv Holdings'}),
+        content_type='application/json'
+    )
+    assert len(client.get('/api/search?q=zyxwv').get_json()['results']) == 1
+    client.delete('/api/customers/test-customer-id')
+    assert client.get('/api/search?q=zyxwv').get_json()['results'] == []
+    
+    assert client.get('/api/search').status_code == 400
+    assert client.get('/api/search?q="unbalanced').status_code == 200
+    
+    # Snippets are escaped, so stored markup cannot reach the dashboard as HTML
+    customer = client.post('/api/customers', json={
+        'first_name': '<b>Xsstest</b>', 'last_name': 'User', 'email': 'xss@example.com'
+    }).get_json()
+    client.post('/api/interactions', json={
+        'customer_id': customer['id'], 'type': 'note', 'notes': 'Pasted <script>alert(1)</script><img src=x onerror=alert(2)> xsstest'
+    })
+    snippets = {result['type']: result['snippet'] for result in client.get('/api/search?q=xsstest').get_json()['results']}
+    assert '&lt;b&gt;<mark>Xsstest</mark>&lt;/b&gt;' in snippets['customer']
+    assert '&lt;script&gt;alert(1)&lt;/script&gt;&lt;img src=x onerror=alert(2)&gt; <mark>xsstest</mark>' in snippets['interaction']
+    assert not any(tag in snippet for snippet in snippets.values() for tag in ('<script', '<img', '<b>'))
+
+def test_vacuum_rebuilds_search_index(tmp_path):
+    """Test that `flask vacuum` leaves search working even when base rowids move"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'vacuum.db'}", 'WEBHOOK_DISPATCHER': False})
+    with app.app_context():
+        init_db()
+        db.session.add(Customer(id='vacuumed', first_name='Quillon', last_name='Vacuumed', email='quillon@example.com'))
+        db.session.commit()
+        # Renumber the row without touching the indexed columns, as VACUUM may
+        db.session.execute(db.text("UPDATE customer SET rowid = rowid + 100 WHERE id = 'vacuumed'"))
+        db.session.commit()
+    
+    with app.test_client() as client:
+        assert client.get('/api/search?q=quillon').get_json()['results'] == []
+        assert 'rebuilt the search indexes' in app.test_cli_runner().invoke(args=['vacuum']).output
+        assert [result['id'] for result in client.get('/api/search?q=quillon').get_json()['results']] == ['vacuumed']
+    
+    with app.app_context():
+        db.drop_all()
+
+def test_conditional_requests(app, client):
+    """Test ETag and Last-Modified revalidation on read endpoints"""
+    # Last-Modified is only sent once the second of the latest write is over
+    assert 'Last-Modified' not in client.get('/api/customers').headers
+    with app.app_context():
+        db.session.execute(db.text("UPDATE table_version SET updated_at = datetime('now', '-1 minute')"))
+        db.session.commit()
+    
+    response = client.get('/api/customers/test-customer-id')
+    etag = response.headers['ETag']
+    last_modified = response.headers['Last-Modified']
+    assert response.status_code == 200
+    
+    response = client.get('/api/customers/test-customer-id', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    
+    response = client.get('/api/customers', headers={'If-Modified-Since': last_modified})
+    assert response.status_code == 304
+    
+    # Different query strings are different representations
+    assert client.get('/api/customers/test-customer-id?include=interactions', headers={'If-None-Match': etag}).status_code == 200
+    
+    client.post(
+        '/api/interactions',
+        data=json.dumps({'customer_id': 'test-customer-id', 'type': 'call', 'notes': 'Changes the validators'}),
+        content_type='application/json'
+    )
+    response = client.get('/api/customers/test-customer-id', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    
+    # Dates are not trusted during the second of the new write, and a stale ETag wins over any date
+    for headers in ({'If-Modified-Since': last_modified}, {'If-Modified-Since': last_modified, 'If-None-Match': etag}):
+        assert client.get('/api/customers/test-customer-id', headers=headers).status_code == 200
+
+def test_state_is_per_app():
+    """Test that caches, metrics and workers belong to the app that created them"""
+    first = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:', 'CUSTOMER_CACHE_SIZE': 5})
+    second = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+    for name in ('customer_cache', 'response_cache', 'request_metrics', 'interaction_writer', 'webhook_dispatcher'):
+        assert first.extensions['onix'][name] is not second.extensions['onix'][name]
+    assert first.extensions['onix']['interaction_writer'].app is first
+    assert first.extensions['onix']['webhook_dispatcher'].app is first
+    
+    # The module level names follow whichever app is current, not the newest one
+    with first.app_context():
+        db.create_all()
+        with first.test_client() as client:
+            assert client.get('/api/cache/stats').get_json()['customers']['maxsize'] == 5
+            client.get('/api/customers')
+        db.drop_all()
+    assert first.extensions['onix']['request_metrics'].requests
+    assert not second.extensions['onix']['request_metrics'].requests
+
+def test_customer_cache_follows_other_workers():
+    """Test that a write made by another worker is never served under a fresh ETag"""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'AUTO_INIT_DB': False,
+        'RESPONSE_CACHE_BACKEND': 'none'
+    })
+    with app.app_context():
+        db.create_all()
+        db.session.add(Customer(id='shared', first_name='Before', last_name='User', email='shared@example.com'))
+        db.session.commit()
+    
+    with app.test_client() as client:
+        assert client.get('/api/customers/shared').get_json()['first_name'] == 'Before'
+        
+        # Another worker's write bumps the shared table version but not this worker's cache
+        with app.app_context():
+            db.session.execute(db.text("UPDATE customer SET first_name = 'After' WHERE id = 'shared'"))
+            db.session.commit()
+        response = client.get('/api/customers/shared')
+        assert response.get_json()['first_name'] == 'After'
+    
+    with app.app_context():
+        db.drop_all()
+
+def test_customer_cache(client):
+    """Test that customer lookups are cached and invalidated by writes"""
+    before = client.get('/api/cache/stats').get_json()['customers']
+    
+    client.get('/api/customers/test-customer-id')
+    client.get('/api/customers/test-customer-id')
+    for notes in ['One', 'Two']:
+        response = client.post(
+            '/api/interactions',
+            data=json.dumps({'customer_id': 'test-customer-id', 'type': 'call', 'notes': notes}),
+            content_type='application/json'
+        )
+        assert response.status_code == 201
+    
+    # The second GET is answered by the response cache without a lookup. The
+    # GET keys its entry on the table version, so the first POST misses once
+    after = client.get('/api/cache/stats').get_json()['customers']
+    assert after['misses'] - before['misses'] == 2
+    assert after['hits'] - before['hits'] == 1
+    
+    client.put(
+        '/api/customers/test-customer-id',
+        data=json.dumps({'first_name': 'Renamed'}),
+        content_type='application/json'
+    )
+    assert client.get('/api/customers/test-customer-id').get_json()['first_name'] == 'Renamed'
+    
+    client.delete('/api/customers/test-customer-id')
+    assert client.get('/api/customers/test-customer-id').status_code == 404
+    response = client.post(
+        '/api/interactions',
+        data=json.dumps({'customer_id': 'test-customer-id', 'type': 'call', 'notes': 'Gone'}),
+        content_type='application/json'
+    )
+    assert response.status_code == 404
+
+def test_response_cache_invalidation(client):
+    """Test that cached responses are replaced once a write bumps their namespace"""
+    first = client.get('/api/reports/summary').get_json()
+    hits = client.get('/api/cache/stats').get_json()['responses']['hits']
+    assert client.get('/api/reports/summary').get_json() == first
+    assert client.get('/api/cache/stats').get_json()['responses']['hits'] == hits + 1
+    
+    client.post(
+        '/api/interactions',
+        data=json.dumps({'customer_id': 'test-customer-id', 'type': 'email', 'notes': 'Bumps reports'}),
+        content_type='application/json'
+    )
+    assert client.get('/api/reports/summary').get_json()['interaction_counts'] == {'email': 1}
+    assert len(client.get('/api/customers/test-customer-id/interactions').get_json()) == 1
+
+def test_response_cache_follows_other_workers(app, client):
+    """Test that the memory response cache drops entries once another worker writes"""
+    assert client.get('/api/reports/summary').get_json()['total_customers'] == 1
+    assert len(client.get('/api/customers').get_json()['customers']) == 1
+    
+    # Another worker's insert bumps the shared table versions but not this worker's namespaces
+    with app.app_context():
+        db.session.add(Customer(id='other-worker', first_name='Other', last_name='Worker', email='other@example.com'))
+        db.session.commit()
+    assert client.get('/api/reports/summary').get_json()['total_customers'] == 2
+    assert len(client.get('/api/customers').get_json()['customers']) == 2
+
+def test_sqlite_cache_backend_shared(tmp_path):
+    """Test that two SQLite cache backends on one file share entries and versions"""
+    path = str(tmp_path / 'cache.db')
+    worker_a = SQLiteCacheBackend(path, ttl=60)
+    worker_b = SQLiteCacheBackend(path, ttl=60)
+    
+    worker_a.set('customers:v0:/api/customers', b'[]')
+    assert worker_b.get('customers:v0:/api/customers') == b'[]'
+    
+    assert worker_b.version('customers') == 0
+    worker_a.bump('customers')
+    assert worker_b.version('customers') == 1
+    
+    expired = SQLiteCacheBackend(path, ttl=-1)
+    expired.set('reports:v0:/api/reports/summary', b'{}')
+    assert worker_a.get('reports:v0:/api/reports/summary') is None
+
+def test_query_timer_survives_errors(app):
+    """Test that a failed statement does not leave its start time on the connection"""
+    with app.app_context():
+        for _ in range(3):
+            with pytest.raises(sqlalchemy.exc.OperationalError):
+                db.session.execute(db.text('SELECT * FROM no_such_table'))
+            db.session.rollback()
+        assert not db.session.connection().info.get('query_start')
+        assert db.session.execute(db.text('SELECT 1')).scalar() == 1
+        assert not db.session.connection().info.get('query_start')
+
+def test_datetime_text_matches_to_dict(app):
+    """Test that SQL-formatted list timestamps equal Customer.to_dict() with and without microseconds"""
+    with app.app_context():
+        for customer_id, created_at in (('whole-second', datetime(2024, 1, 2, 9, 30)),
+                                        ('fractional', datetime(2024, 1, 2, 9, 30, 0, 120))):
+            db.session.add(Customer(id=customer_id, first_name='Time', last_name='Stamp',
+                                    email=f'{customer_id}@example.com', created_at=created_at))
+        db.session.commit()
+        
+        for customer in Customer.query.filter(Customer.id.in_(['whole-second', 'fractional'])):
+            text = db.session.query(datetime_text(Customer.created_at)).filter(Customer.id == customer.id).scalar()
+            assert text == customer.to_dict()['created_at']
+
+def test_metrics_and_server_timing(app, client):
+    """Test request timing, SQL counting and the Prometheus metrics endpoint"""
+    response = client.get('/api/customers/test-customer-id/interactions')
+    assert response.headers['Server-Timing'].startswith('app;dur=')
+    assert 'queries"' in response.headers['Server-Timing']
+    
+    app.config['N_PLUS_ONE_THRESHOLD'] = 0
+    client.get('/api/reports/summary?recent=3')
+    
+    response = client.get('/metrics')
+    text = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert 'onix_http_requests_total{method="GET",endpoint="get_customer_interactions",status="200"} 1' in text
+    assert 'onix_http_request_duration_seconds_count{method="GET",endpoint="get_customer_interactions"} 1' in text
+    assert 'onix_sql_queries_total{endpoint="get_reports_summary"}' in text
+    assert 'onix_n_plus_one_requests_total{endpoint="get_reports_summary"} 1' in text
+
+@pytest.fixture
+def live_server(tmp_path, monkeypatch):
+    """Serve a file-backed app over HTTP and point the command-line client at it"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'client.db'}", 'WEBHOOK_DISPATCHER': False})
+    with app.app_context():
+        db.create_all()
+        db.session.add(Customer(id='client-customer', first_name='Client', last_name='User', email='client@example.com'))
+        db.session.commit()
+    
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(onix_client, 'BASE_URL', f"http://127.0.0.1:{server.server_port}/api")
+    monkeypatch.setattr(onix_client, 'VALIDATOR_CACHE_PATH', str(tmp_path / 'validators.json'))
+    monkeypatch.setattr(onix_client, '_sessions', threading.local())
+    try:
+        yield app
+    finally:
+        server.shutdown()
+        app.extensions['onix']['interaction_writer'].stop()
+        with app.app_context():
+            db.drop_all()
+
+def test_client_post_interactions(live_server):
+    """Test that the client accepts both committed (201) and queued (202) interaction writes"""
+    interaction = {'customer_id': 'client-customer', 'type': 'call', 'notes': 'Direct'}
+    assert onix_client.post_interaction(interaction)['notes'] == 'Direct'
+    
+    live_server.config['INTERACTION_WRITE_MODE'] = 'async'
+    items = [{'customer_id': 'client-customer', 'type': 'email', 'notes': f'Queued {i}'} for i in range(10)]
+    items.append({'customer_id': 'missing-customer', 'type': 'email', 'notes': 'Nobody home'})
+    results = list(onix_client.run_concurrently(onix_client.post_interaction, items, concurrency=3))
+    
+    assert sorted(item['notes'] for item, _, _ in results) == sorted(item['notes'] for item in items)
+    errors = {item['customer_id']: str(error) for item, _, error in results if error}
+    assert errors == {'missing-customer': 'Customer not found'}
+    assert all(result['customer_id'] == 'client-customer' for _, result, error in results if not error)
+    
+    live_server.extensions['onix']['interaction_writer'].flush()
+    with live_server.app_context():
+        assert Interaction.query.count() == 11
+
+def test_client_conditional_get(live_server):
+    """Test that the client revalidates its cached copy and only re-downloads after a change"""
+    statuses = []
+    onix_client.get_session().hooks['response'].append(lambda response, *args, **kwargs: statuses.append(response.status_code))
+    url = f"{onix_client.BASE_URL}/customers/client-customer"
+    
+    first = onix_client.conditional_get(url)
+    assert onix_client.conditional_get(url) == first
+    assert statuses == [200, 304]
+    
+    onix_client.get_session().put(url, json={'company': 'Revalidated Inc.'})
+    assert onix_client.conditional_get(url)['company'] == 'Revalidated Inc.'
+    assert statuses[-1] == 200
+
+def test_client_retries(monkeypatch):
+    """Test that the client session retries idempotent requests on 503 but never repeats a POST"""
+    requests_seen = []
+    
+    class Flaky(BaseHTTPRequestHandler):
+        def respond(self):
+            requests_seen.append(self.command)
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            # Every other request fails, so a retried request succeeds
+            self.send_response(503 if len(requests_seen) % 2 else 200)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        
+        do_GET = do_POST = respond
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Flaky)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(onix_client, 'RETRY_BACKOFF', 0)
+    monkeypatch.setattr(onix_client, '_sessions', threading.local())
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/"
+        assert onix_client.get_session().get(url).status_code == 200
+        assert requests_seen == ['GET', 'GET']
+        
+        assert onix_client.get_session().post(url).status_code == 503
+        assert requests_seen == ['GET', 'GET', 'POST']
+    finally:
+        server.shutdown()